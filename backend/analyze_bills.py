@@ -0,0 +1,47 @@
+import os
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to the path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Import our app modules
+from app.database.connection import SessionLocal
+from app.database.init_db import check_database
+from app.services.openstates import openstates_service
+from app.services.batch_analysis import batch_analysis_service, BATCH_POLL_SECONDS
+
+# Pause between bill text downloads to stay under the OpenStates rate limit
+BILL_DELAY = float(os.getenv("FETCH_BILL_DELAY", "2"))
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Summarize and tag stored bills with Claude through the Message Batches API. "
+                    "Safe to interrupt: running it again resumes submitted batches."
+    )
+    parser.add_argument("--limit", type=int, default=0,
+                      help="Maximum number of bills to submit (use 0 for all pending bills)")
+    parser.add_argument("--no-wait", action="store_true",
+                      help="Submit and exit without waiting; a later run collects the results")
+    parser.add_argument("--poll-seconds", type=float, default=BATCH_POLL_SECONDS,
+                      help="Seconds between batch status checks")
+
+    args = parser.parse_args()
+
+    check_database()
+    db = SessionLocal()
+    try:
+        result = batch_analysis_service.run(
+            db, openstates_service.get_bill_text, limit=args.limit or None, wait=not args.no_wait,
+            delay=BILL_DELAY, poll_seconds=args.poll_seconds,
+        )
+        print(f"Submitted {result['submitted_bills']} bills; applied {result['applied_batches']} batches.")
+    finally:
+        db.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -6,15 +6,77 @@ import os
 # Use SQLite for simplicity in development
 # You can switch to PostgreSQL or another database in production
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./legispal.db")
+# Driver URL for the async engine; derived from DATABASE_URL unless set
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Connection pool settings for server databases such as PostgreSQL
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite: WAL lets API reads proceed while an ingest is writing; the busy
+# timeout makes a blocked writer wait instead of failing with "database is locked"
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def _engine_options(url: str) -> dict:
+    """create_engine arguments for a database URL"""
+    if _is_sqlite(url):
+        # SQLite connections are cheap and file-local, so the default pool is kept
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+
+def configure_sqlite(dbapi_connection, connection_record=None):
+    """Set the journal mode and tuned pragmas on each new SQLite connection"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    if SQLITE_JOURNAL_MODE == "WAL":
+        # Safe in WAL mode: a crash can't corrupt the database, only a power loss can drop the last commits
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")  # 64 MB page cache per connection
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # Read through a 256 MB memory map
+    cursor.close()
+
+
+def async_database_url(url: str) -> str:
+    """The async driver form of a database URL: aiosqlite for SQLite, asyncpg for PostgreSQL"""
+    scheme, _, rest = url.partition(":")
+    if scheme == "sqlite":
+        return f"sqlite+aiosqlite:{rest}"
+    if scheme in ("postgresql", "postgres", "postgresql+psycopg2"):
+        return f"postgresql+asyncpg:{rest}"
+    return url
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}  # Only needed for SQLite
-)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    event.listen(engine, "connect", configure_sqlite)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Created on first use, so the async drivers are only needed by code that uses them
+async_engine = None
+AsyncSessionLocal = None
+# Called with the async engine's sync_engine when it is created, e.g. to attach event listeners
+_async_engine_hooks = []
+
 # Create base class for models
 Base = declarative_base()
 
@@ -26,3 +88,32 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_async_engine():
+    """The async engine, sharing DATABASE_URL, pool settings and SQLite pragmas with the sync one"""
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+        url = ASYNC_DATABASE_URL or async_database_url(DATABASE_URL)
+        async_engine = create_async_engine(url, **_engine_options(url))
+        if _is_sqlite(url):
+            event.listen(async_engine.sync_engine, "connect", configure_sqlite)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        for hook in _async_engine_hooks:
+            hook(async_engine.sync_engine)
+    return async_engine
+
+
+def on_async_engine(hook):
+    """Call `hook` with the async engine's sync_engine once it exists, without creating it"""
+    _async_engine_hooks.append(hook)
+    if async_engine is not None:
+        hook(async_engine.sync_engine)
+
+
+async def get_async_db():
+    """Dependency for an async database session, for routes that must not block the event loop"""
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,7 +1,62 @@
-from .connection import engine, Base
-from .models import Bill, Keyword, ChatHistory
+import os
+from typing import TYPE_CHECKING
+from .connection import engine
+
+# Alembic is imported where it's used, so importing this module stays cheap
+if TYPE_CHECKING:
+    from alembic.config import Config
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ALEMBIC_INI = os.path.join(BACKEND_DIR, "alembic.ini")
+
+# Run pending migrations at startup instead of refusing to start; meant for
+# local development, since deployments should migrate as a separate step
+AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database is not at the latest migration"""
+
+
+def alembic_config() -> "Config":
+    """Alembic configuration for the app's database"""
+    from alembic.config import Config
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "migrations"))
+    # Keep the app's logging setup when migrating from inside the app
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def current_revision() -> str:
+    """The migration the database is at, or None if it has never been migrated"""
+    from alembic.runtime.migration import MigrationContext
+    with engine.connect() as conn:
+        return MigrationContext.configure(conn).get_current_revision()
+
+
+def head_revision() -> str:
+    """The latest migration"""
+    from alembic.script import ScriptDirectory
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
 
 def init_database():
-    """Create all database tables"""
-    Base.metadata.create_all(bind=engine)
-    print("Database initialized successfully.")
+    """Create or upgrade the database schema to the latest migration"""
+    from alembic import command
+    command.upgrade(alembic_config(), "head")
+    print(f"Database at revision {head_revision()}.")
+
+
+def check_database():
+    """Startup check that the schema is current; migrates instead if DB_AUTO_MIGRATE is set"""
+    current, head = current_revision(), head_revision()
+    if current == head:
+        return
+    if AUTO_MIGRATE:
+        init_database()
+        return
+    raise SchemaOutOfDate(
+        f"Database schema is at revision {current or 'none'}, expected {head}. "
+        f"Run `python init_db.py` (or `alembic upgrade head`) in backend/, or set DB_AUTO_MIGRATE=true."
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, ForeignKey, Table, DateTime, JSON
+from sqlalchemy import Column, String, Integer, Text, ForeignKey, Table, DateTime, JSON, Index, LargeBinary, Boolean, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .connection import Base
@@ -9,6 +9,9 @@ bill_keyword = Table(
     Base.metadata,
     Column("bill_id", String, ForeignKey("bills.id")),
     Column("keyword_id", Integer, ForeignKey("keywords.id")),
+    # Keywords of a bill, and bills with a keyword
+    Index("ix_bill_keyword_bill", "bill_id", "keyword_id"),
+    Index("ix_bill_keyword_keyword", "keyword_id", "bill_id"),
 )
 
 
@@ -16,17 +19,18 @@ class Bill(Base):
     """SQLAlchemy model for bills"""
     __tablename__ = "bills"
     
-    id = Column(String, primary_key=True, index=True)
-    title = Column(String, index=True)
-    identifier = Column(String, index=True)
+    id = Column(String, primary_key=True)
+    title = Column(String)
+    identifier = Column(String)
+    identifier_normalized = Column(String, nullable=True)  # e.g. "HB123" for "H.B. 123"
     classification = Column(JSON)  # Store as JSON array
     subject = Column(JSON, default=list())  # Store as JSON array
     abstract = Column(Text, default="No abstract available")
-    session = Column(String, index=True)
-    jurisdiction_name = Column(String, index=True)
-    jurisdiction_id = Column(String, index=True)
+    session = Column(String)
+    jurisdiction_name = Column(String)
+    jurisdiction_id = Column(String)
     primary_sponsor_name = Column(String, nullable=True)
-    primary_sponsor_id = Column(String, nullable=True, index=True)
+    primary_sponsor_id = Column(String, nullable=True)
     actions = Column(JSON, default=list())  # Store as JSON array
     documents = Column(JSON, default=list())  # Store as JSON array
     votes = Column(JSON, default=list())  # Store as JSON array
@@ -39,6 +43,20 @@ class Bill(Base):
     
     # Relationships
     keywords = relationship("Keyword", secondary=bill_keyword, back_populates="bills")
+    sponsorships = relationship("Sponsorship", back_populates="bill", order_by="Sponsorship.id")
+    
+    __table_args__ = (
+        # Exact identifier lookups, optionally narrowed by jurisdiction and session
+        Index("ix_bills_identifier_lookup", "identifier_normalized", "jurisdiction_id", "session"),
+        # Stored bill listings: filtered by jurisdiction and session, newest first
+        Index("ix_bills_jurisdiction_session_updated", "jurisdiction_id", "session", "updated_at"),
+        Index("ix_bills_session_updated", "session", "updated_at"),
+        # Unfiltered listings, and index refreshes since a watermark
+        Index("ix_bills_updated_at", "updated_at"),
+        # Bills still waiting for a summary, newest first
+        Index("ix_bills_unsummarized", "updated_at",
+              sqlite_where=text("summary IS NULL"), postgresql_where=text("summary IS NULL")),
+    )
     
     def to_dict(self):
         """Convert model to dictionary"""
@@ -66,6 +84,7 @@ class Bill(Base):
             "summary": self.summary,
             "ai_analysis": self.ai_analysis,
             "keywords": [k.name for k in self.keywords],
+            "sponsors": [s.to_dict() for s in self.sponsorships],
         }
 
 
@@ -73,7 +92,7 @@ class Keyword(Base):
     """SQLAlchemy model for keywords"""
     __tablename__ = "keywords"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, index=True)
     
     # Relationships
@@ -84,8 +103,183 @@ class ChatHistory(Base):
     """SQLAlchemy model for storing chat history"""
     __tablename__ = "chat_history"
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     bill_id = Column(String, ForeignKey("bills.id"), index=True)
     question = Column(Text)
     answer = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BillSignature(Base):
+    """SQLAlchemy model for MinHash signatures of bill text, used for similar-bill lookup"""
+    __tablename__ = "bill_signatures"
+    
+    bill_id = Column(String, ForeignKey("bills.id"), primary_key=True)
+    signature = Column(LargeBinary)  # num_perm little-endian uint32 values
+    shingle_count = Column(Integer)
+    updated_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class Sponsorship(Base):
+    """SQLAlchemy model for every sponsor and co-sponsor of a bill"""
+    __tablename__ = "sponsorships"
+    
+    id = Column(Integer, primary_key=True)
+    bill_id = Column(String, ForeignKey("bills.id"), index=True)
+    person_id = Column(String)  # OpenStates person ID, or "name:<name>" for unlinked sponsors
+    name = Column(String)
+    classification = Column(String, nullable=True)  # e.g. "primary", "cosponsor"
+    primary = Column(Boolean, default=False)
+    
+    # Relationships
+    bill = relationship("Bill", back_populates="sponsorships")
+    
+    __table_args__ = (
+        # All bills by a legislator, with their role, answered from the index alone
+        Index("ix_sponsorships_person_bill", "person_id", "bill_id", "primary", "classification"),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "name": self.name,
+            "id": self.person_id,
+            "classification": self.classification,
+            "primary": self.primary,
+        }
+
+
+class CoSponsorship(Base):
+    """SQLAlchemy model for the co-sponsorship graph, stored as adjacency lists
+
+    Each pair of legislators who sponsored a bill together has one row, with
+    the smaller key as person_id, counting the bills they share.
+    """
+    __tablename__ = "cosponsorships"
+    
+    person_id = Column(String, primary_key=True)
+    collaborator_id = Column(String, primary_key=True)
+    bill_count = Column(Integer, default=0)
+    
+    __table_args__ = (
+        # Top collaborators for a legislator, in order
+        Index("ix_cosponsorships_person_count", "person_id", "bill_count"),
+        Index("ix_cosponsorships_collaborator_count", "collaborator_id", "bill_count"),
+    )
+
+
+class AnalysisBatch(Base):
+    """SQLAlchemy model for a Message Batches API submission of bill analysis requests"""
+    __tablename__ = "analysis_batches"
+    
+    id = Column(String, primary_key=True)  # Local ID, assigned before submission
+    remote_id = Column(String, nullable=True, unique=True)  # Batch ID returned by the API
+    status = Column(String, index=True)  # "submitting", "in_progress" or "applied"
+    request_count = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    applied_at = Column(DateTime, nullable=True)
+    
+    # Relationships
+    requests = relationship("AnalysisRequest", back_populates="batch", cascade="all, delete-orphan")
+
+
+class AnalysisRequest(Base):
+    """SQLAlchemy model for one request in an analysis batch"""
+    __tablename__ = "analysis_requests"
+    
+    batch_id = Column(String, ForeignKey("analysis_batches.id"), primary_key=True)
+    custom_id = Column(String, primary_key=True)  # e.g. "summary-<hash of bill ID>"
+    bill_id = Column(String, ForeignKey("bills.id"))
+    kind = Column(String)  # "summary" or "keywords"
+    status = Column(String, default="submitted")  # "submitted", then the result type, e.g. "succeeded" or "errored"
+    
+    # Relationships
+    batch = relationship("AnalysisBatch", back_populates="requests")
+    
+    __table_args__ = (
+        # Failed attempts per bill, and bills in open batches, answered from the index alone
+        Index("ix_analysis_requests_kind_bill", "kind", "bill_id", "status"),
+        Index("ix_analysis_requests_batch_bill", "batch_id", "bill_id"),
+    )
+
+
+class BillChange(Base):
+    """SQLAlchemy model for the append-only log of changes found when bills are ingested
+
+    The autoincrementing ID is the change feed's cursor.
+    """
+    __tablename__ = "bill_changes"
+    
+    id = Column(Integer, primary_key=True)
+    bill_id = Column(String, ForeignKey("bills.id"))
+    kind = Column(String)  # "new_bill", "action", "vote" or "version"
+    detail = Column(JSON)  # The new action, vote or version; counts of each for a new bill
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # A bill's changes in order
+        Index("ix_bill_changes_bill", "bill_id", "id"),
+    )
+
+
+class Watch(Base):
+    """SQLAlchemy model for a watched bill or saved search"""
+    __tablename__ = "watches"
+    
+    id = Column(Integer, primary_key=True)
+    owner = Column(String)  # SHA-256 of the watcher's API key
+    bill_id = Column(String, nullable=True)  # Set for a watched bill, which need not be stored yet
+    query = Column(String, nullable=True)  # Set for a saved search: words that must all appear
+    jurisdiction_id = Column(String, nullable=True)  # Optional saved search filters
+    session = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # An owner's watches, and the watches on changed bills
+        Index("ix_watches_owner", "owner", "id"),
+        Index("ix_watches_bill", "bill_id", "owner"),
+    )
+    
+    def to_dict(self):
+        """Convert model to dictionary"""
+        return {
+            "id": self.id,
+            "bill_id": self.bill_id,
+            "query": self.query,
+            "jurisdiction": self.jurisdiction_id,
+            "session": self.session,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class WatchMatch(Base):
+    """SQLAlchemy model for a logged change that matched one of an owner's watches
+
+    Keyed by owner, then change, so an owner's feed is a range scan of the
+    primary key. A change matching several of an owner's watches is listed once.
+    """
+    __tablename__ = "watch_matches"
+    
+    owner = Column(String, primary_key=True)
+    change_id = Column(Integer, ForeignKey("bill_changes.id"), primary_key=True)
+    watch_id = Column(Integer)  # The first watch it matched; kept if that watch is deleted
+
+
+class ChangeWatermark(Base):
+    """SQLAlchemy model for how far a consumer of the change log has read"""
+    __tablename__ = "change_watermarks"
+    
+    name = Column(String, primary_key=True)
+    change_id = Column(Integer, default=0)
+
+
+class Jurisdiction(Base):
+    """SQLAlchemy model for OpenStates jurisdiction metadata, with its legislative sessions"""
+    __tablename__ = "jurisdictions"
+    
+    id = Column(String, primary_key=True)  # e.g. "ocd-jurisdiction/country:us/state:ca/government"
+    name = Column(String)
+    classification = Column(String)  # "state", "country", ...
+    url = Column(String, nullable=True)
+    sessions = Column(JSON, default=list())  # Legislative sessions as OpenStates lists them
+    fetched_at = Column(DateTime, default=datetime.utcnow)
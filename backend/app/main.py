@@ -1,11 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import os
+import logging
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Structured key=value logs from app modules; set LOG_LEVEL=DEBUG for sampled response previews
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
 # Create FastAPI application
 app = FastAPI(
     title="LegisPal API",
@@ -22,22 +27,95 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record per-route latency and SQL usage, and time every SQL statement
+from app.services.metrics import MetricsMiddleware, instrument_engine, render_metrics
+from app.database.connection import engine, on_async_engine
+
+app.add_middleware(MetricsMiddleware)
+instrument_engine(engine)
+on_async_engine(instrument_engine)
+
+# Trace requests, upstream calls and SQL statements when TRACE_EXPORTER is set
+from app.services.tracing import TracingMiddleware, trace_engine, flush_traces
+
+app.add_middleware(TracingMiddleware)
+trace_engine(engine)
+on_async_engine(trace_engine)
+
+# Bound the time each request may spend, including any upstream fallback
+from app.services.resilience import DeadlineMiddleware, openstates_breaker, claude_breaker, document_breakers
+from app.services.admission import claude_admission
+
+app.add_middleware(DeadlineMiddleware)
+
+# Opt-in per-request profiling, only installed when admin endpoints are enabled
+from app.services.profiling import ProfilingMiddleware, ADMIN_TOKEN
+
+if ADMIN_TOKEN:
+    app.add_middleware(ProfilingMiddleware)
+
 # Import database initialization
-from app.database.init_db import init_database
+from app.database.init_db import check_database
+from app.database.connection import SessionLocal
+from app.services.suggest import suggest_index
+from app.services.similarity import similarity_index
+from app.services.semantic import semantic_index
+from app.services.popularity import cache_warmer
+from app.services.jurisdictions import jurisdiction_metadata
+from app.services.diff import shutdown_pool
 
 # Initialize database on startup
 @app.on_event("startup")
 def startup_event():
-    init_database()
+    check_database()
+
+    # Build the in-memory typeahead and similar-bill indexes
+    db = SessionLocal()
+    try:
+        suggest_index.build(db)
+        similarity_index.build(db)
+        # Stored jurisdiction metadata only; OpenStates is called later if it is missing or stale
+        jurisdiction_metadata.load(db)
+    finally:
+        db.close()
+
+    # Map the offline-built semantic index, if one has been built
+    semantic_index.load()
+
+    # Pre-fetch text and analysis for recently updated bills, then for the most requested ones
+    cache_warmer.start()
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    cache_warmer.stop()
+    shutdown_pool()
+    flush_traces()
 
 # Import routers after app is created to avoid circular imports
-from app.routers import bills, chat
+from app.routers import bills, chat, analytics, legislators, admin, watchlist, jurisdictions
 
 # Include routers
 app.include_router(bills.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
+app.include_router(analytics.router, prefix="/api")
+app.include_router(legislators.router, prefix="/api")
+app.include_router(watchlist.router, prefix="/api")
+app.include_router(jurisdictions.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 @app.get("/")
 def read_root():
     """Root endpoint to verify the API is running"""
-    return {"message": "Welcome to LegisPal API", "status": "online"}
+    return {
+        "message": "Welcome to LegisPal API",
+        "status": "online",
+        "dependencies": [openstates_breaker.status(), claude_breaker.status(), *document_breakers.status()],
+        "admission": [claude_admission.status()],
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus-format metrics for this worker process"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
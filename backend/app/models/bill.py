@@ -15,6 +15,14 @@ class Sponsor(BaseModel):
     id: str
 
 
+class Sponsorship(BaseModel):
+    """Model for a sponsor or co-sponsor of a bill"""
+    name: str
+    id: Optional[str] = None
+    classification: Optional[str] = None
+    primary: bool = False
+
+
 class Action(BaseModel):
     """Model for legislative actions taken on a bill"""
     date: str
@@ -64,6 +72,7 @@ class BillCreate(BillBase):
     """Model for creating a new bill record"""
     abstract: str = "No abstract available"
     primary_sponsor: Optional[Sponsor] = None
+    sponsors: List[Sponsorship] = []
     actions: List[Action] = []
     documents: List[Document] = []
     votes: List[Vote] = []
@@ -94,3 +103,9 @@ class BillSearchParams(BaseModel):
     sponsor_id: Optional[str] = None
     page: int = 1
     per_page: int = 20
+
+
+class BillBatchRequest(BaseModel):
+    """Bills to look up in one request, optionally limited to some fields"""
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+    fields: Optional[List[str]] = None  # BillResponse fields to return; all of them if omitted
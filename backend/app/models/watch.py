@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class WatchCreate(BaseModel):
+    """A bill or saved search to watch; exactly one of bill_id and query is set"""
+    bill_id: Optional[str] = None
+    query: Optional[str] = Field(None, max_length=500)  # Words that must all appear in a bill
+    jurisdiction: Optional[str] = None  # Saved searches only: jurisdiction ID to match
+    session: Optional[str] = None  # Saved searches only: session to match
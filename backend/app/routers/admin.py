@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+from app.services.profiling import request_profiler, is_admin_token, ADMIN_TOKEN, MODES, ProfiledRoute
+from app.services.cache import bill_data_cache, bill_text_cache, analysis_cache
+from app.services.popularity import cache_warmer
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the ADMIN_TOKEN shared secret"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+# Create router
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)], route_class=ProfiledRoute)
+
+
+@router.get("/profiling", response_model=dict)
+def get_profiling_status():
+    """Show whether the profiler is armed for upcoming requests"""
+    return request_profiler.status()
+
+
+@router.post("/profiling", response_model=dict)
+def arm_profiling(
+    count: int = Query(1, ge=0, le=100, description="Number of upcoming requests to profile (0 disarms)"),
+    path_prefix: str = Query("/api/", description="Only profile requests whose path starts with this"),
+    mode: str = Query("cprofile", description=f"Profiler: {', '.join(MODES)}")
+):
+    """Profile the next matching requests"""
+    if mode not in MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid mode: {mode}")
+    request_profiler.arm(count, path_prefix, mode)
+    return request_profiler.status()
+
+
+@router.get("/profiles", response_model=dict)
+def list_profiles():
+    """List saved request profiles, newest first"""
+    return {"profiles": request_profiler.list_profiles()}
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """Download a saved profile (pstats or collapsed stacks)"""
+    path = request_profiler.profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, filename=name, media_type="application/octet-stream")
+
+
+@router.get("/cache", response_model=dict)
+def get_cache_status():
+    """Show cache sizes, the most requested bills and the cache warmer's last pass"""
+    return {
+        "caches": [cache.status() for cache in (bill_data_cache, bill_text_cache, analysis_cache)],
+        "warmer": cache_warmer.status(),
+    }
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.services.analytics import vote_analytics, parse_day, GROUP_FIELDS
+from app.database.connection import get_db
+from app.services.profiling import ProfiledRoute
+
+# Create router
+router = APIRouter(prefix="/analytics", tags=["analytics"], route_class=ProfiledRoute)
+
+
+@router.get("/votes", response_model=dict)
+def get_vote_analytics(
+    group_by: str = Query("jurisdiction,session", description="Comma-separated: jurisdiction, session, chamber"),
+    jurisdiction: Optional[str] = Query(None, description="Jurisdiction name (e.g., California)"),
+    session: Optional[str] = Query(None, description="Legislative session"),
+    chamber: Optional[str] = Query(None, description="Chamber (e.g., upper, lower)"),
+    since: Optional[str] = Query(None, description="Only votes on or after this date (YYYY-MM-DD)"),
+    until: Optional[str] = Query(None, description="Only votes on or before this date (YYYY-MM-DD)"),
+    parties: bool = Query(False, description="Include per-party yes/no/abstain totals"),
+    db: Session = Depends(get_db)
+):
+    """Pass rates, average margins and vote totals grouped by jurisdiction, session or chamber"""
+    fields = [field.strip() for field in group_by.split(",") if field.strip()]
+    invalid = [field for field in fields if field not in GROUP_FIELDS]
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid group_by field(s): {', '.join(invalid)}")
+    try:
+        parse_day(since)
+        parse_day(until)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid filter: {str(e)}")
+
+    try:
+        vote_analytics.refresh(db)
+        groups = vote_analytics.aggregate(
+            fields,
+            jurisdiction=jurisdiction,
+            session=session,
+            chamber=chamber,
+            since=since,
+            until=until,
+            include_parties=parties,
+        )
+        return {"group_by": fields, "groups": groups}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing vote analytics: {str(e)}")
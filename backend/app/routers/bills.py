@@ -1,24 +1,74 @@
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
-from sqlalchemy import or_
-from sqlalchemy.orm import Session
-from app.models.bill import BillResponse, BillSearchParams
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, selectinload
+from app.models.bill import BillBatchRequest, BillResponse, BillSearchParams
 from app.services.openstates import openstates_service
-from app.services.claude import claude_service
-from app.database.connection import get_db
+from app.services import bill_content, export
+from app.services.popularity import popularity
+from app.services.suggest import suggest_index
+from app.services.identifiers import normalize_identifier, looks_like_identifier
+from app.services.similarity import similarity_index
+from app.services.semantic import semantic_index, reciprocal_rank_fusion
+from app.services.metrics import record_cache
+from app.services.resilience import UPSTREAM_UNAVAILABLE, unavailable_status
+from app.database.connection import get_db, get_async_db
 from app.database.models import Bill, Keyword
+from app.services.profiling import ProfiledRoute
+
+logger = logging.getLogger(__name__)
+
+# Concurrent OpenStates requests for the bills a batch lookup didn't find stored
+BATCH_UPSTREAM_CONCURRENCY = int(os.getenv("BATCH_UPSTREAM_CONCURRENCY", "8"))
+
+# How each BillResponse field is read from a stored bill, and the columns it needs
+_STORED_FIELDS = {
+    "id": ((Bill.id,), lambda bill: bill.id),
+    "title": ((Bill.title,), lambda bill: bill.title),
+    "identifier": ((Bill.identifier,), lambda bill: bill.identifier),
+    "classification": ((Bill.classification,), lambda bill: bill.classification),
+    "subject": ((Bill.subject,), lambda bill: bill.subject),
+    "abstract": ((Bill.abstract,), lambda bill: bill.abstract),
+    "session": ((Bill.session,), lambda bill: bill.session),
+    "jurisdiction": ((Bill.jurisdiction_name, Bill.jurisdiction_id),
+                     lambda bill: {"name": bill.jurisdiction_name, "id": bill.jurisdiction_id}),
+    "primary_sponsor": ((Bill.primary_sponsor_name, Bill.primary_sponsor_id),
+                        lambda bill: {"name": bill.primary_sponsor_name, "id": bill.primary_sponsor_id}
+                        if bill.primary_sponsor_name else None),
+    "sponsors": ((), lambda bill: [s.to_dict() for s in bill.sponsorships]),
+    "actions": ((Bill.actions,), lambda bill: bill.actions),
+    "documents": ((Bill.documents,), lambda bill: bill.documents),
+    "votes": ((Bill.votes,), lambda bill: bill.votes),
+    "versions": ((Bill.versions,), lambda bill: bill.versions),
+    "updated_at": ((Bill.updated_at,), lambda bill: bill.updated_at.isoformat() if bill.updated_at else ""),
+    "keywords": ((), lambda bill: [k.name for k in bill.keywords]),
+    "summary": ((Bill.summary,), lambda bill: bill.summary or ""),
+    "ai_analysis": ((Bill.ai_analysis,), lambda bill: bill.ai_analysis),
+    "source": ((), lambda bill: "database"),
+}
 
 # Create router
-router = APIRouter(prefix="/bills", tags=["bills"])
+router = APIRouter(prefix="/bills", tags=["bills"], route_class=ProfiledRoute)
 
 
+# Routes that call OpenStates or sync services are plain functions, so FastAPI
+# runs them in its threadpool instead of blocking the event loop
 @router.get("/", response_model=dict)
-async def get_bills(
+def get_bills(
     jurisdiction: Optional[str] = Query(None, description="Jurisdiction ID (e.g., state:ca)"),
     session: Optional[str] = Query(None, description="Legislative session (e.g., 2023-2024)"),
     subject: Optional[str] = Query(None, description="Bill subject"),
     page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(20, ge=1, le=100, description="Items per page")
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    db: Session = Depends(get_db)
 ):
     """Get a list of bills with optional filtering"""
     try:
@@ -35,122 +85,406 @@ async def get_bills(
         result = openstates_service.search_bills(search_params)
         
         return result
+    except UPSTREAM_UNAVAILABLE as e:
+        # Serve what we have stored while OpenStates is down or slow
+        logger.warning("bills_list_degraded error=%s", e)
+        return _stored_bills(db, jurisdiction, session, page, per_page)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching bills: {str(e)}")
 
 
+def _stored_bills(db: Session, jurisdiction: Optional[str], session: Optional[str], page: int, per_page: int) -> dict:
+    """A page of stored bills, most recently updated first, marked as possibly stale"""
+    query = db.query(Bill)
+    if jurisdiction:
+        # Resolve the substring match to whole jurisdiction IDs first, from the
+        # index alone, so the page itself can use the jurisdiction/session index
+        matching = [
+            jurisdiction_id for (jurisdiction_id,) in
+            db.query(Bill.jurisdiction_id).filter(Bill.jurisdiction_id.contains(jurisdiction)).distinct()
+        ]
+        query = query.filter(Bill.jurisdiction_id.in_(matching))
+    if session:
+        query = query.filter(Bill.session == session)
+    total = query.count()
+    bills = query.order_by(Bill.updated_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    return {
+        "results": [_search_result(bill) for bill in bills],
+        "pagination": {
+            "total_items": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": (total + per_page - 1) // per_page
+        },
+        "source": "database",
+        "stale": True
+    }
+
+
+def _search_result(bill: Bill) -> dict:
+    """Convert a database bill into the search result shape"""
+    return {
+        "id": bill.id,
+        "title": bill.title,
+        "identifier": bill.identifier,
+        "classification": bill.classification,
+        "subject": bill.subject,
+        "abstract": bill.abstract,
+        "session": bill.session,
+        "jurisdiction": {
+            "name": bill.jurisdiction_name,
+            "id": bill.jurisdiction_id
+        },
+        "from_organization": None,
+        "created_at": None,
+        "updated_at": bill.updated_at,
+        "primary_sponsor": {
+            "name": bill.primary_sponsor_name,
+            "id": bill.primary_sponsor_id
+        } if bill.primary_sponsor_name else None
+    }
+
+
+def _database_results(results: List[dict]) -> dict:
+    """Wrap database search results in the paginated response shape"""
+    return {
+        "results": results,
+        "pagination": {
+            "total_items": len(results),
+            "page": 1,
+            "per_page": 20,
+            "total_pages": 1
+        },
+        "source": "database"
+    }
+
+
+def _bills_in_order(db: Session, bill_ids: List[str], known: List[Bill]) -> List[Bill]:
+    """Load bills by ID in the given order, reusing any already-loaded bills"""
+    bills = {bill.id: bill for bill in known}
+    missing = [bill_id for bill_id in bill_ids if bill_id not in bills]
+    if missing:
+        for bill in db.query(Bill).filter(Bill.id.in_(missing)).all():
+            bills[bill.id] = bill
+    return [bills[bill_id] for bill_id in bill_ids if bill_id in bills]
+
+
+def _identifier_lookup(db: Session, query: str, jurisdiction: Optional[str], session: Optional[str]) -> List[Bill]:
+    """Bills whose identifier matches an identifier-shaped query exactly"""
+    lookup = db.query(Bill).filter(Bill.identifier_normalized == normalize_identifier(query))
+    if jurisdiction:
+        lookup = lookup.filter(Bill.jurisdiction_id == jurisdiction)
+    if session:
+        lookup = lookup.filter(Bill.session == session)
+    return lookup.limit(20).all()
+
+
 @router.get("/search", response_model=dict)
-async def search_bills(
+def search_bills(
     query: str = Query(..., description="Search query"),
+    jurisdiction: Optional[str] = Query(None, description="Jurisdiction ID to narrow identifier lookups"),
+    session: Optional[str] = Query(None, description="Legislative session to narrow identifier lookups"),
+    mode: str = Query("keyword", pattern="^(keyword|semantic|hybrid)$", description="Ranking: keyword, semantic or hybrid"),
     db: Session = Depends(get_db)
 ):
-    """Search for bills by keyword"""
+    """Search for bills by keyword, semantic similarity, or both"""
     try:
         # First try to search in our local database
         try:
+            # Identifier-shaped queries ("HB 123", "h.b. 123") use the exact lookup index
+            if looks_like_identifier(query):
+                db_bills = _identifier_lookup(db, query, jurisdiction, session)
+                record_cache("identifier_lookup", bool(db_bills))
+                if db_bills:
+                    return _database_results([_search_result(bill) for bill in db_bills])
+
+            # Semantic ranking needs the offline index; without it every mode is keyword search
+            semantic_index.refresh()
+            use_semantic = mode != "keyword" and semantic_index.available
+
             # Search in title and abstract (case insensitive)
-            db_bills = db.query(Bill).filter(
-                or_(
-                    Bill.title.ilike(f"%{query}%"),
-                    Bill.abstract.ilike(f"%{query}%"),
-                    Bill.identifier.ilike(f"%{query}%")
-                )
-            ).limit(20).all()
+            db_bills = []
+            if not (use_semantic and mode == "semantic"):
+                db_bills = db.query(Bill).filter(
+                    or_(
+                        Bill.title.ilike(f"%{query}%"),
+                        Bill.abstract.ilike(f"%{query}%"),
+                        Bill.identifier.ilike(f"%{query}%")
+                    )
+                ).limit(50 if use_semantic else 20).all()
+
+            # Rank by latent semantic similarity, merged with keyword matches in hybrid mode
+            if use_semantic:
+                semantic_ids = [bill_id for bill_id, _ in semantic_index.search(query, 50)]
+                if mode == "hybrid":
+                    ranked_ids = reciprocal_rank_fusion([[bill.id for bill in db_bills], semantic_ids])
+                else:
+                    ranked_ids = semantic_ids
+                db_bills = _bills_in_order(db, ranked_ids[:20], db_bills)
             
             # If we found bills in the database, return them
+            record_cache("search_db", bool(db_bills))
             if db_bills:
-                results = []
-                for bill in db_bills:
-                    results.append({
-                        "id": bill.id,
-                        "title": bill.title,
-                        "identifier": bill.identifier,
-                        "classification": bill.classification,
-                        "subject": bill.subject,
-                        "abstract": bill.abstract,
-                        "session": bill.session,
-                        "jurisdiction": {
-                            "name": bill.jurisdiction_name,
-                            "id": bill.jurisdiction_id
-                        },
-                        "from_organization": None,
-                        "created_at": None,
-                        "updated_at": bill.updated_at,
-                        "primary_sponsor": {
-                            "name": bill.primary_sponsor_name,
-                            "id": bill.primary_sponsor_id
-                        } if bill.primary_sponsor_name else None
-                    })
-                
-                return {
-                    "results": results,
-                    "pagination": {
-                        "total_items": len(results),
-                        "page": 1,
-                        "per_page": 20,
-                        "total_pages": 1
-                    },
-                    "source": "database"
-                }
+                return _database_results([_search_result(bill) for bill in db_bills])
         
         # If no results in database or database search fails, fall back to OpenStates API
         except Exception as db_error:
-            print(f"Database search error: {db_error}")
+            logger.warning("database_search_error error=%s", db_error)
             # Continue to OpenStates search
             pass
             
         # Fall back to OpenStates API
-        search_params = BillSearchParams(query=query)
+        search_params = BillSearchParams(query=query, jurisdiction=jurisdiction, session=session)
         result = openstates_service.search_bills(search_params)
         result["source"] = "openstates"
         return result
         
+    except UPSTREAM_UNAVAILABLE as e:
+        # The database had no matches and OpenStates can't be reached in time
+        logger.warning("search_fallback_unavailable error=%s", e)
+        results = _database_results([])
+        results["stale"] = True
+        return results
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error searching bills: {str(e)}")
 
 
-@router.get("/{bill_id}", response_model=BillResponse)
-async def get_bill(bill_id: str, db: Session = Depends(get_db)):
+@router.get("/suggest", response_model=dict)
+def suggest_bills(
+    q: str = Query(..., min_length=1, description="Prefix typed so far"),
+    limit: int = Query(10, ge=1, le=25, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db)
+):
+    """Typeahead suggestions for bill identifiers, titles and sponsors"""
+    try:
+        # Pick up newly ingested bills at most once per refresh interval
+        suggest_index.refresh(db)
+        return {"query": q, "suggestions": suggest_index.suggest(q, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching suggestions: {str(e)}")
+
+
+def _stored_bill_fields(bill: Bill, fields) -> Dict[str, Any]:
+    """The requested BillResponse fields of a stored bill"""
+    return {field: _STORED_FIELDS[field][1](bill) for field in fields}
+
+
+def _batch_query(fields: List[str]):
+    """One IN query for a batch, loading only the columns and relationships the fields need"""
+    columns = {column for field in fields for column in _STORED_FIELDS[field][0]}
+    query = select(Bill).options(load_only(*columns))
+    if "sponsors" in fields:
+        query = query.options(selectinload(Bill.sponsorships))
+    if "keywords" in fields:
+        query = query.options(selectinload(Bill.keywords))
+    return query
+
+
+async def _fetch_upstream(bill_id: str, fields: List[str], limit: asyncio.Semaphore) -> Dict[str, Any]:
+    """A bill that isn't stored, from OpenStates, in the same shape as a stored one"""
+    async with limit:
+        bill_data = await run_in_threadpool(bill_content.get_bill_data, bill_id)
+    bill_dict = openstates_service.transform_bill_data(bill_data).dict()
+    bill_dict["source"] = "openstates"
+    response = BillResponse(**bill_dict).dict()
+    return {field: response[field] for field in fields}
+
+
+@router.post("/batch", response_model=dict)
+async def get_bills_batch(request: BillBatchRequest, db: AsyncSession = Depends(get_async_db)):
+    """Get many bills by ID in one request, in the order requested
+
+    Stored bills are loaded with a single query; the rest are fetched from
+    OpenStates concurrently. Each result is null if the bill couldn't be
+    found, with the reason in `missing` or `errors`.
+    """
+    fields = request.fields or list(_STORED_FIELDS)
+    unknown = [field for field in fields if field not in _STORED_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    if "id" not in fields:
+        fields = ["id"] + fields
+
+    ids = list(dict.fromkeys(request.ids))
+    found: Dict[str, Dict[str, Any]] = {}
+    try:
+        rows = (await db.execute(_batch_query(fields).where(Bill.id.in_(ids)))).scalars().all()
+        found = {bill.id: _stored_bill_fields(bill, fields) for bill in rows}
+    except Exception as db_error:
+        logger.warning("database_batch_error bills=%s error=%s", len(ids), db_error)
+    for bill_id in ids:
+        record_cache("bill_db", bill_id in found)
+
+    misses = [bill_id for bill_id in ids if bill_id not in found]
+    limit = asyncio.Semaphore(BATCH_UPSTREAM_CONCURRENCY)
+    fetched = await asyncio.gather(*(_fetch_upstream(bill_id, fields, limit) for bill_id in misses),
+                                   return_exceptions=True)
+    missing, errors = [], {}
+    for bill_id, result in zip(misses, fetched):
+        if not isinstance(result, Exception):
+            found[bill_id] = result
+        elif getattr(getattr(result, "response", None), "status_code", None) == 404:
+            missing.append(bill_id)
+        else:
+            errors[bill_id] = str(result)
+
+    return {
+        "results": [found.get(bill_id) for bill_id in request.ids],
+        "missing": missing,
+        "errors": errors,
+    }
+
+
+@router.get("/export")
+def export_bills(
+    format: str = Query("jsonl", pattern="^(jsonl|parquet)$", description="gzip JSON lines or Parquet"),
+    jurisdiction: Optional[str] = Query(None, description="Exact jurisdiction ID"),
+    session: Optional[str] = Query(None, description="Legislative session"),
+    since: Optional[datetime] = Query(None, description="Only bills updated at or after this time"),
+):
+    """Stream every stored bill, with keywords and summaries, as gzip JSONL or Parquet
+
+    Bills are read in batches as the response is sent, so memory use doesn't
+    grow with the size of the export.
+    """
+    try:
+        body = export.encode(format, export.iter_bill_batches(jurisdiction, session, since))
+    except export.ExportUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    media_type, filename = export.FORMATS[format]
+    return StreamingResponse(body, media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+
+# Bill IDs look like "ocd-bill/<uuid>", so they are matched as paths; the
+# catch-all /{bill_id} route is declared last so these suffixes match first
+@router.get("/{bill_id:path}/text")
+def get_bill_text(bill_id: str):
+    """Get the full text of a bill"""
+    popularity.record(bill_id)
+    try:
+        text = bill_content.get_bill_text(bill_id)
+        return {"text": text}
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Bill text is unavailable: {str(e)}", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching bill text: {str(e)}")
+
+
+@router.get("/{bill_id:path}/versions", response_model=dict)
+def get_bill_versions(bill_id: str):
+    """List a bill's versions, numbered from 0 for the oldest"""
+    try:
+        return bill_content.get_bill_versions(bill_id)
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Bill versions are unavailable: {str(e)}", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching bill versions: {str(e)}")
+
+
+def _diff_lines(diff: Dict[str, Any]):
+    """The diff as JSON lines: a summary first, then one line per added, removed or changed section"""
+    yield json.dumps({key: value for key, value in diff.items() if key != "changes"}) + "\n"
+    for change in diff["changes"]:
+        yield json.dumps(change) + "\n"
+
+
+@router.get("/{bill_id:path}/diff")
+def get_bill_diff(
+    bill_id: str,
+    from_version: Optional[int] = Query(None, alias="from", ge=0, description="Older version number (default: the one before `to`)"),
+    to_version: Optional[int] = Query(None, alias="to", ge=0, description="Newer version number (default: the latest)"),
+):
+    """Section-by-section diff between two versions of a bill, streamed as JSON lines
+
+    Version numbers come from /versions. Diffs are cached per version pair,
+    and large bills are diffed in a process pool.
+    """
+    try:
+        diff = bill_content.get_version_diff(bill_id, from_version, to_version)
+    except bill_content.VersionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Bill versions are unavailable: {str(e)}", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error comparing bill versions: {str(e)}")
+    return StreamingResponse(_diff_lines(diff), media_type="application/x-ndjson")
+
+
+# Sync so that waiting for Claude capacity blocks a worker thread, not the event loop
+@router.get("/{bill_id:path}/analysis")
+def get_bill_analysis(bill_id: str):
+    """Get AI-generated analysis of a bill (summary and keywords)"""
+    popularity.record(bill_id)
+    try:
+        # Cached, or generated with Claude from the bill's cached text
+        return bill_content.get_bill_analysis(bill_id)
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Analysis is unavailable: {str(e)}", headers=headers)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error analyzing bill: {str(e)}")
+
+
+@router.get("/{bill_id:path}/similar", response_model=dict)
+def get_similar_bills(
+    bill_id: str,
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of similar bills"),
+    threshold: float = Query(0.5, ge=0.0, le=1.0, description="Minimum estimated text similarity"),
+    db: Session = Depends(get_db)
+):
+    """Find bills with near-duplicate text, e.g. model legislation copied across states"""
+    try:
+        similarity_index.refresh(db)
+        indexed = similarity_index.has(bill_id)
+        matches = similarity_index.similar(bill_id, limit, threshold) if indexed else []
+
+        # Load the matched bills in a single query
+        bills = {}
+        if matches:
+            ids = [match_id for match_id, _ in matches]
+            bills = {bill.id: bill for bill in db.query(Bill).filter(Bill.id.in_(ids)).all()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error finding similar bills: {str(e)}")
+
+    if not indexed:
+        raise HTTPException(status_code=404, detail=f"No indexed text for bill {bill_id}")
+
+    results = []
+    for match_id, score in matches:
+        if match_id in bills:
+            result = _search_result(bills[match_id])
+            result["similarity"] = round(score, 3)
+            results.append(result)
+
+    return {"bill_id": bill_id, "results": results}
+
+
+@router.get("/{bill_id:path}", response_model=BillResponse)
+async def get_bill(bill_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific bill by ID"""
+    popularity.record(bill_id)
     try:
         # First try to get the bill from our database
         try:
-            db_bill = db.query(Bill).filter(Bill.id == bill_id).first()
+            db_bill = (await db.execute(
+                select(Bill).options(selectinload(Bill.sponsorships)).where(Bill.id == bill_id)
+            )).scalar_one_or_none()
+            record_cache("bill_db", db_bill is not None)
             
             if db_bill:
-                # Convert database model to response model
-                return BillResponse(
-                    id=db_bill.id,
-                    title=db_bill.title,
-                    identifier=db_bill.identifier,
-                    classification=db_bill.classification,
-                    subject=db_bill.subject,
-                    abstract=db_bill.abstract,
-                    session=db_bill.session,
-                    jurisdiction={
-                        "name": db_bill.jurisdiction_name,
-                        "id": db_bill.jurisdiction_id
-                    },
-                    primary_sponsor={
-                        "name": db_bill.primary_sponsor_name,
-                        "id": db_bill.primary_sponsor_id
-                    } if db_bill.primary_sponsor_name else None,
-                    actions=db_bill.actions,
-                    documents=db_bill.documents,
-                    votes=db_bill.votes,
-                    versions=db_bill.versions,
-                    updated_at=db_bill.updated_at,
-                    summary=db_bill.summary,
-                    ai_analysis=db_bill.ai_analysis,
-                    source="database"
-                )
+                # Convert database model to response model; keywords aren't loaded here
+                return BillResponse(**_stored_bill_fields(db_bill, [f for f in _STORED_FIELDS if f != "keywords"]))
         except Exception as db_error:
-            print(f"Database bill fetch error: {db_error}")
+            logger.warning("database_bill_error bill_id=%s error=%s", bill_id, db_error)
             # Continue to OpenStates fallback
             pass
             
         # Fall back to OpenStates API
-        bill_data = openstates_service.get_bill(bill_id)
+        bill_data = await run_in_threadpool(bill_content.get_bill_data, bill_id)
         bill = openstates_service.transform_bill_data(bill_data)
         
         # Add source information
@@ -161,34 +495,9 @@ async def get_bill(bill_id: str, db: Session = Depends(get_db)):
         response = BillResponse(**bill_dict)
         
         return response
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Bill not stored locally and OpenStates is unavailable: {str(e)}",
+                            headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching bill: {str(e)}")
-
-
-@router.get("/{bill_id}/text")
-async def get_bill_text(bill_id: str):
-    """Get the full text of a bill"""
-    try:
-        text = openstates_service.get_bill_text(bill_id)
-        return {"text": text}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error fetching bill text: {str(e)}")
-
-
-@router.get("/{bill_id}/analysis")
-async def get_bill_analysis(bill_id: str):
-    """Get AI-generated analysis of a bill (summary and keywords)"""
-    try:
-        # Get bill data
-        bill_data = openstates_service.get_bill(bill_id)
-        bill = openstates_service.transform_bill_data(bill_data)
-        
-        # Get bill text
-        bill_text = openstates_service.get_bill_text(bill_id)
-        
-        # Generate analysis with Claude
-        analysis = claude_service.analyze_bill(bill_text, bill.title)
-        
-        return analysis
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error analyzing bill: {str(e)}")
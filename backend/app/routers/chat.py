@@ -2,10 +2,14 @@ from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel
 from app.services.openstates import openstates_service
 from app.services.claude import claude_service
+from app.services.bill_content import get_bill_data, get_bill_text
+from app.services.popularity import popularity
+from app.services.resilience import UPSTREAM_UNAVAILABLE, unavailable_status
+from app.services.profiling import ProfiledRoute
 from typing import Optional
 
 # Create router
-router = APIRouter(prefix="/chat", tags=["chat"])
+router = APIRouter(prefix="/chat", tags=["chat"], route_class=ProfiledRoute)
 
 
 class ChatRequest(BaseModel):
@@ -20,16 +24,18 @@ class ChatResponse(BaseModel):
     bill_title: Optional[str] = None
 
 
+# Sync so that waiting for Claude capacity blocks a worker thread, not the event loop
 @router.post("/", response_model=ChatResponse)
-async def chat_with_bill(request: ChatRequest = Body(...)):
+def chat_with_bill(request: ChatRequest = Body(...)):
     """Answer a question about a specific bill using Claude"""
+    popularity.record(request.bill_id)
     try:
         # Get bill data
-        bill_data = openstates_service.get_bill(request.bill_id)
+        bill_data = get_bill_data(request.bill_id)
         bill = openstates_service.transform_bill_data(bill_data)
         
         # Get bill text
-        bill_text = openstates_service.get_bill_text(request.bill_id)
+        bill_text = get_bill_text(request.bill_id)
         
         # Get answer from Claude
         answer = claude_service.chat_about_bill(
@@ -39,5 +45,8 @@ async def chat_with_bill(request: ChatRequest = Body(...)):
         )
         
         return ChatResponse(answer=answer, bill_title=bill.title)
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Chat is unavailable: {str(e)}", headers=headers)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat request: {str(e)}")
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.services.jurisdictions import jurisdiction_metadata
+from app.services.resilience import UPSTREAM_UNAVAILABLE, unavailable_status
+from app.database.connection import get_db
+from app.services.profiling import ProfiledRoute
+
+# Create router
+router = APIRouter(prefix="/jurisdictions", tags=["jurisdictions"], route_class=ProfiledRoute)
+
+
+def _ensure_metadata(db: Session):
+    """Load stored metadata when due; only calls OpenStates if nothing is stored yet"""
+    try:
+        jurisdiction_metadata.ensure(db)
+    except UPSTREAM_UNAVAILABLE as e:
+        status, headers = unavailable_status(e)
+        raise HTTPException(status_code=status, detail=f"Jurisdictions are unavailable: {str(e)}", headers=headers)
+
+
+@router.get("/", response_model=dict)
+def get_jurisdictions(
+    classification: Optional[str] = Query(None, description="Only this classification, e.g. state or country"),
+    db: Session = Depends(get_db)
+):
+    """Get every jurisdiction with its legislative sessions, from the metadata cache"""
+    _ensure_metadata(db)
+    try:
+        return {"jurisdictions": jurisdiction_metadata.all(classification), **jurisdiction_metadata.status()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching jurisdictions: {str(e)}")
+
+
+# Jurisdiction IDs look like "ocd-jurisdiction/country:us/state:ca/government", so they are matched as paths
+@router.get("/{jurisdiction:path}", response_model=dict)
+def get_jurisdiction(jurisdiction: str, db: Session = Depends(get_db)):
+    """Get one jurisdiction by ID, name or abbreviation, with its sessions"""
+    _ensure_metadata(db)
+    found = jurisdiction_metadata.find(jurisdiction)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Jurisdiction not found")
+    return found
@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.services.sponsors import legislator_bills, top_collaborators
+from app.database.connection import get_db
+from app.services.profiling import ProfiledRoute
+
+# Create router
+router = APIRouter(prefix="/legislators", tags=["legislators"], route_class=ProfiledRoute)
+
+
+# Person IDs look like "ocd-person/<uuid>", so they are matched as paths
+@router.get("/{person_id:path}/bills", response_model=dict)
+def get_legislator_bills(
+    person_id: str,
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    db: Session = Depends(get_db)
+):
+    """Get every bill a legislator sponsored or co-sponsored"""
+    try:
+        return legislator_bills(db, person_id, page, per_page)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching legislator bills: {str(e)}")
+
+
+@router.get("/{person_id:path}/collaborators", response_model=dict)
+def get_legislator_collaborators(
+    person_id: str,
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of collaborators"),
+    db: Session = Depends(get_db)
+):
+    """Get the legislators who most often co-sponsor bills with this one"""
+    try:
+        return {"id": person_id, "collaborators": top_collaborators(db, person_id, limit)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching collaborators: {str(e)}")
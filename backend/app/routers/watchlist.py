@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.models.watch import WatchCreate
+from app.services.watchlist import owner_key, change_feed, list_watches, add_watch, remove_watch
+from app.database.connection import get_db
+from app.services.profiling import ProfiledRoute
+
+
+def watch_owner(x_api_key: Optional[str] = Header(None)) -> str:
+    """The owner of the caller's watches, from their X-API-Key header"""
+    if not x_api_key:
+        raise HTTPException(status_code=401, detail="Watches are kept per API key; send an X-API-Key header")
+    return owner_key(x_api_key)
+
+
+# Create router
+router = APIRouter(tags=["watchlist"], route_class=ProfiledRoute)
+
+
+@router.get("/changes", response_model=dict)
+def get_changes(
+    since: int = Query(0, ge=0, description="Cursor returned by the previous call; 0 to start from the beginning"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of changes"),
+    x_api_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Get new bills, actions, votes and versions logged after a cursor
+
+    With an X-API-Key header, only the changes that matched that key's watches.
+    """
+    try:
+        return change_feed(db, since, limit, owner_key(x_api_key) if x_api_key else None)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching changes: {str(e)}")
+
+
+@router.get("/watches", response_model=dict)
+def get_watches(owner: str = Depends(watch_owner), db: Session = Depends(get_db)):
+    """List the caller's watched bills and saved searches"""
+    try:
+        return {"watches": list_watches(db, owner)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching watches: {str(e)}")
+
+
+@router.post("/watches", response_model=dict, status_code=201)
+def create_watch(request: WatchCreate, owner: str = Depends(watch_owner), db: Session = Depends(get_db)):
+    """Watch a bill, or save a search that is matched against every logged change"""
+    try:
+        watch = add_watch(db, owner, request.bill_id, request.query, request.jurisdiction, request.session)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating watch: {str(e)}")
+    return watch.to_dict()
+
+
+@router.delete("/watches/{watch_id}", status_code=204)
+def delete_watch(watch_id: int, owner: str = Depends(watch_owner), db: Session = Depends(get_db)):
+    """Stop watching a bill or saved search"""
+    try:
+        removed = remove_watch(db, owner, watch_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error deleting watch: {str(e)}")
+    if not removed:
+        raise HTTPException(status_code=404, detail="Watch not found")
@@ -0,0 +1,207 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+from app.services.metrics import Counter, Gauge, Histogram
+from app.services.resilience import Overloaded, deadline_remaining
+
+# Priorities: lower numbers are admitted first
+INTERACTIVE = 0
+BATCH = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BATCH: "batch"}
+
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4"))
+# Input plus output tokens allowed per minute; 0 disables the token budget
+CLAUDE_TOKENS_PER_MINUTE = int(os.getenv("CLAUDE_TOKENS_PER_MINUTE", "80000"))
+# Calls allowed to wait for a slot before new ones are rejected with 429
+CLAUDE_MAX_QUEUE = int(os.getenv("CLAUDE_MAX_QUEUE", "32"))
+# Longest a call waits for a slot; calls made while serving a request are also bounded by its deadline
+CLAUDE_QUEUE_TIMEOUT = float(os.getenv("CLAUDE_QUEUE_TIMEOUT", "30"))
+
+ADMISSION_WAIT = Histogram(
+    "legispal_admission_wait_seconds", "Time calls waited for admission", ["limiter", "priority"]
+)
+ADMISSION_SHED = Counter(
+    "legispal_admission_shed_total", "Calls rejected by admission control", ["limiter", "priority", "reason"]
+)
+ADMISSION_IN_FLIGHT = Gauge("legispal_admission_in_flight", "Calls currently admitted", ["limiter"])
+ADMISSION_QUEUED = Gauge("legispal_admission_queued", "Calls waiting for admission", ["limiter"])
+ADMISSION_LIMIT = Gauge("legispal_admission_concurrency_limit", "Current adaptive concurrency limit", ["limiter"])
+
+# How often a waiter re-checks the token budget while nothing is released
+_POLL_SECONDS = 0.25
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "event", "admitted")
+
+    def __init__(self, priority: int, tokens: int):
+        self.priority = priority
+        self.tokens = tokens
+        self.event = threading.Event()
+        self.admitted = False
+
+
+class Ticket:
+    """An admitted call; report its real token usage and outcome before it is released"""
+
+    __slots__ = ("priority", "reserved", "used", "rate_limited")
+
+    def __init__(self, priority: int, reserved: int):
+        self.priority = priority
+        self.reserved = reserved
+        self.used: Optional[int] = None
+        self.rate_limited = False
+
+
+class AdmissionController:
+    """Concurrency and tokens-per-minute limiter with a prioritized, bounded wait queue
+
+    Calls are admitted while fewer than `limit` are in flight and the token
+    bucket covers their estimated size; otherwise they wait in priority order
+    (FIFO within a priority) until a slot frees up or their timeout passes.
+    The concurrency limit adapts: it halves when the upstream rate-limits a
+    call and creeps back up by one per `limit` successes, so the service
+    settles just under the provider's real capacity.
+    """
+
+    def __init__(self, name: str, max_concurrency: int = CLAUDE_MAX_CONCURRENCY,
+                 tokens_per_minute: int = CLAUDE_TOKENS_PER_MINUTE, max_queue: int = CLAUDE_MAX_QUEUE,
+                 queue_timeout: float = CLAUDE_QUEUE_TIMEOUT):
+        self.name = name
+        self.max_concurrency = max(1, max_concurrency)
+        self.tokens_per_minute = tokens_per_minute
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.limit = float(self.max_concurrency)
+        self.in_flight = 0
+        self.tokens = float(tokens_per_minute)
+        self._refilled = time.monotonic()
+        self._waiters: List = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        ADMISSION_LIMIT.set(self.limit, limiter=name)
+
+    def _refill(self):
+        if self.tokens_per_minute <= 0:
+            return
+        now = time.monotonic()
+        self.tokens = min(self.tokens_per_minute, self.tokens + (now - self._refilled) * self.tokens_per_minute / 60)
+        self._refilled = now
+
+    def _fits(self, tokens: int) -> bool:
+        return self.in_flight < int(self.limit) and (self.tokens_per_minute <= 0 or self.tokens >= tokens)
+
+    def _take(self, tokens: int):
+        self.in_flight += 1
+        if self.tokens_per_minute > 0:
+            self.tokens -= tokens
+
+    def _dispatch(self):
+        """Admit waiters from the head of the queue while they fit; caller holds the lock"""
+        self._refill()
+        while self._waiters:
+            waiter = self._waiters[0][2]
+            if waiter.admitted:
+                heapq.heappop(self._waiters)
+                continue
+            if not self._fits(waiter.tokens):
+                break
+            heapq.heappop(self._waiters)
+            self._take(waiter.tokens)
+            waiter.admitted = True
+            waiter.event.set()
+        self._report()
+
+    def _report(self):
+        ADMISSION_IN_FLIGHT.set(self.in_flight, limiter=self.name)
+        ADMISSION_QUEUED.set(len(self._waiters), limiter=self.name)
+
+    def _retry_after(self) -> float:
+        """Rough seconds until the queue drains enough to accept a new call"""
+        return max(1.0, len(self._waiters) / max(1, int(self.limit)))
+
+    def _acquire(self, priority: int, tokens: int, timeout: Optional[float]) -> Ticket:
+        label = PRIORITY_NAMES.get(priority, str(priority))
+        if self.tokens_per_minute > 0:
+            tokens = min(tokens, self.tokens_per_minute)
+        started = time.monotonic()
+
+        with self._lock:
+            self._refill()
+            if not self._waiters and self._fits(tokens):
+                self._take(tokens)
+                self._report()
+                ADMISSION_WAIT.observe(0.0, limiter=self.name, priority=label)
+                return Ticket(priority, tokens)
+            if len(self._waiters) >= self.max_queue:
+                ADMISSION_SHED.inc(limiter=self.name, priority=label, reason="queue_full")
+                raise Overloaded(f"{self.name} is at capacity; try again shortly", 429, self._retry_after())
+            waiter = _Waiter(priority, tokens)
+            heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+            self._report()
+
+        if timeout is None:
+            timeout = self.queue_timeout
+        deadline = started + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                waiter.event.wait(min(remaining, _POLL_SECONDS))
+            with self._lock:
+                if not waiter.admitted:
+                    self._dispatch()
+                if waiter.admitted:
+                    ADMISSION_WAIT.observe(time.monotonic() - started, limiter=self.name, priority=label)
+                    return Ticket(priority, tokens)
+                if time.monotonic() >= deadline:
+                    self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+                    heapq.heapify(self._waiters)
+                    self._report()
+                    ADMISSION_SHED.inc(limiter=self.name, priority=label, reason="timeout")
+                    raise Overloaded(f"Timed out waiting for {self.name} capacity", 503, self._retry_after())
+
+    def _release(self, ticket: Ticket):
+        with self._lock:
+            self.in_flight -= 1
+            if self.tokens_per_minute > 0 and ticket.used is not None:
+                # Return the unused part of the reservation, or charge the overrun
+                self.tokens = min(self.tokens_per_minute, self.tokens + ticket.reserved - ticket.used)
+            if ticket.rate_limited:
+                self.limit = max(1.0, self.limit / 2)
+            elif ticket.used is not None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            ADMISSION_LIMIT.set(round(self.limit, 2), limiter=self.name)
+            self._dispatch()
+
+    @contextmanager
+    def admit(self, priority: int = INTERACTIVE, tokens: int = 0, timeout: Optional[float] = None):
+        """Wait for a slot and hold it for the with-block, raising Overloaded if shed
+
+        Inside an API request the wait is also capped by what is left of its deadline.
+        """
+        if timeout is None:
+            remaining = deadline_remaining()
+            if remaining is not None:
+                timeout = max(0.0, min(self.queue_timeout, remaining))
+        ticket = self._acquire(priority, tokens, timeout)
+        try:
+            yield ticket
+        finally:
+            self._release(ticket)
+
+    def status(self) -> dict:
+        return {
+            "limiter": self.name,
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "concurrency_limit": round(self.limit, 2),
+            "tokens_available": None if self.tokens_per_minute <= 0 else int(self.tokens),
+        }
+
+
+# Create a singleton instance
+claude_admission = AdmissionController("claude")
@@ -0,0 +1,434 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import Bill
+
+# On-disk columnar cache, reused across restarts while the bills table is unchanged
+ANALYTICS_CACHE_PATH = os.getenv("ANALYTICS_CACHE_PATH", "./vote_analytics.npz")
+
+GROUP_FIELDS = ("jurisdiction", "session", "chamber")
+
+# Vote options are folded into yes / no / abstain (anything else that isn't a vote)
+OPTIONS = ("yes", "no", "abstain")
+_OPTION_CODES = {"yes": 0, "yea": 0, "aye": 0, "no": 1, "nay": 1}
+
+
+def _option_code(option: Any) -> int:
+    """Map an OpenStates vote option to an index into OPTIONS"""
+    return _OPTION_CODES.get(str(option or "").lower(), 2)
+
+
+def _load_json(value: Any) -> Any:
+    """Decode JSON columns that were stored as an encoded string"""
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _vote_counts(vote: Dict[str, Any]) -> Tuple[int, int, int]:
+    """Read yes/no/abstain totals from either our dict shape or OpenStates' list of options"""
+    counts = vote.get("counts") or {}
+    totals = [0, 0, 0]
+    if isinstance(counts, dict):
+        for option, value in counts.items():
+            totals[_option_code(option)] += int(value or 0)
+    else:
+        for count in counts:
+            totals[_option_code(count.get("option"))] += int(count.get("value") or 0)
+    return totals[0], totals[1], totals[2]
+
+
+def parse_day(value: Optional[str]) -> Optional[np.datetime64]:
+    """A YYYY-MM-DD date filter as a day, or None if not given; raises ValueError if it isn't a date"""
+    return np.datetime64(value, "D") if value else None
+
+
+def _date_column(dates: List[str]) -> np.ndarray:
+    """Vote dates as a datetime64[D] column, with NaT for any that aren't real dates"""
+    try:
+        return np.array(dates, dtype="datetime64[D]")
+    except ValueError:
+        pass
+    column = np.empty(len(dates), dtype="datetime64[D]")
+    for i, value in enumerate(dates):
+        try:
+            column[i] = np.datetime64(value, "D")
+        except ValueError:
+            # e.g. "2023-13-45" or "2023-02-30" from upstream
+            column[i] = np.datetime64("NaT")
+    return column
+
+
+class _Codes:
+    """Assigns dense integer codes to category labels"""
+
+    def __init__(self, labels: Optional[List[str]] = None):
+        self.labels: List[str] = list(labels or [])
+        self._codes = {label: i for i, label in enumerate(self.labels)}
+
+    def code(self, label: Optional[str]) -> int:
+        label = label or ""
+        if label not in self._codes:
+            self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return self._codes[label]
+
+
+class VoteAnalytics:
+    """Columnar store of vote events for grouped aggregation
+
+    Each vote event is one row across parallel numpy arrays (bill, jurisdiction,
+    session, chamber, date, yes/no/abstain counts, passed), with categories
+    stored as integer codes. Per-party tallies, when the source data includes
+    individual votes, are kept as a second table keyed by vote row. Grouped
+    aggregates are computed with np.bincount over integer group keys rather than loops.
+    """
+
+    def __init__(self, cache_path: str = ANALYTICS_CACHE_PATH, refresh_interval: float = 300.0):
+        """Create an empty store"""
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self._columns: Dict[str, np.ndarray] = {}
+        self._labels: Dict[str, List[str]] = {}
+        self._cube: Dict[str, Any] = {}
+        self._fingerprint: Optional[str] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _current_fingerprint(db: Session) -> str:
+        """Cheap summary of the bills table used to tell whether the store is stale"""
+        count, latest = db.query(func.count(Bill.id), func.max(Bill.updated_at)).one()
+        return f"{count}:{latest.isoformat() if latest else ''}"
+
+    def _build(self, db: Session, fingerprint: str):
+        """Parse every bill's votes into columns"""
+        jurisdictions, sessions, chambers, parties = _Codes(), _Codes(), _Codes(), _Codes()
+        bills, jurisdiction, session, chamber, date = [], [], [], [], []
+        yes, no, abstain, passed = [], [], [], []
+        party_vote, party_code, party_option, party_count = [], [], [], []
+
+        bill_slot = 0
+        rows = db.query(Bill.jurisdiction_name, Bill.session, Bill.votes).yield_per(1000)
+        for jurisdiction_name, bill_session, votes in rows:
+            votes = _load_json(votes) or []
+            for vote in votes:
+                if not isinstance(vote, dict):
+                    continue
+                row = len(yes)
+                counts = _vote_counts(vote)
+                organization = vote.get("organization") or {}
+
+                bills.append(bill_slot)
+                jurisdiction.append(jurisdictions.code(jurisdiction_name))
+                session.append(sessions.code(bill_session))
+                chamber.append(chambers.code(vote.get("chamber") or organization.get("classification")))
+                raw_date = str(vote.get("date") or vote.get("start_date") or "")
+                date.append(raw_date[:10] if len(raw_date) >= 10 and raw_date[4] == "-" else "NaT")
+                yes.append(counts[0])
+                no.append(counts[1])
+                abstain.append(counts[2])
+                passed.append(str(vote.get("result", "")).lower() in ("pass", "passed"))
+
+                # Tally individual votes by party where the voter's party is known
+                tally: Dict[Tuple[int, int], int] = {}
+                for person_vote in vote.get("votes") or []:
+                    party = (person_vote.get("voter") or {}).get("party") or person_vote.get("party")
+                    if party:
+                        key = (parties.code(party), _option_code(person_vote.get("option")))
+                        tally[key] = tally.get(key, 0) + 1
+                for (code, option), count in tally.items():
+                    party_vote.append(row)
+                    party_code.append(code)
+                    party_option.append(option)
+                    party_count.append(count)
+            bill_slot += 1
+
+        columns = {
+            "bill": np.array(bills, dtype=np.int32),
+            "jurisdiction": np.array(jurisdiction, dtype=np.int32),
+            "session": np.array(session, dtype=np.int32),
+            "chamber": np.array(chamber, dtype=np.int32),
+            "date": _date_column(date),
+            "yes": np.array(yes, dtype=np.int32),
+            "no": np.array(no, dtype=np.int32),
+            "abstain": np.array(abstain, dtype=np.int32),
+            "passed": np.array(passed, dtype=bool),
+            "party_vote": np.array(party_vote, dtype=np.int32),
+            "party_code": np.array(party_code, dtype=np.int32),
+            "party_option": np.array(party_option, dtype=np.int8),
+            "party_count": np.array(party_count, dtype=np.int32),
+        }
+        labels = {
+            "jurisdiction": jurisdictions.labels,
+            "session": sessions.labels,
+            "chamber": chambers.labels,
+            "party": parties.labels,
+        }
+
+        cube = self._build_cube(columns, labels) if len(yes) else {}
+        with self._lock:
+            self._columns = columns
+            self._labels = labels
+            self._cube = cube
+            self._fingerprint = fingerprint
+
+        print(f"Vote analytics loaded {len(yes)} votes from {bill_slot} bills")
+        self._save()
+
+    def _save(self):
+        """Write the columns to the on-disk cache"""
+        if not self.cache_path:
+            return
+        try:
+            meta = json.dumps({"fingerprint": self._fingerprint, "labels": self._labels})
+            tmp_path = self.cache_path + ".tmp.npz"
+            np.savez(tmp_path, meta=np.array(meta), **self._columns)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write vote analytics cache: {e}")
+
+    def _load_cache(self, fingerprint: str) -> bool:
+        """Load the on-disk cache if it matches the current bills table"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with np.load(self.cache_path) as cached:
+                meta = json.loads(str(cached["meta"]))
+                if meta["fingerprint"] != fingerprint:
+                    return False
+                columns = {name: cached[name] for name in cached.files if name != "meta"}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Ignoring unreadable vote analytics cache: {e}")
+            return False
+
+        labels = meta["labels"]
+        cube = self._build_cube(columns, labels) if len(columns["yes"]) else {}
+        with self._lock:
+            self._columns = columns
+            self._labels = labels
+            self._cube = cube
+            self._fingerprint = fingerprint
+        return True
+
+    def refresh(self, db: Session, force: bool = False):
+        """Reload the columns if the bills table changed since they were built"""
+        now = time.monotonic()
+        if not force and self._fingerprint is not None and now - self._last_check < self.refresh_interval:
+            return
+        self._last_check = now
+
+        fingerprint = self._current_fingerprint(db)
+        if fingerprint == self._fingerprint:
+            return
+        if not self._load_cache(fingerprint):
+            self._build(db, fingerprint)
+
+    @staticmethod
+    def _factorize(codes: Dict[str, np.ndarray], group_by: List[str], labels, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Number groups densely from a mixed-radix key over the grouping columns
+
+        Returns the sorted distinct keys and each row's group number.
+        """
+        key = np.zeros(size, dtype=np.int64)
+        for field in group_by:
+            key = key * len(labels[field]) + codes[field]
+        present = np.nonzero(np.bincount(key))[0]
+        remap = np.zeros(present[-1] + 1, dtype=np.int64)
+        remap[present] = np.arange(len(present))
+        return present, remap[key]
+
+    @staticmethod
+    def _decode(present: np.ndarray, group_by: List[str], labels) -> np.ndarray:
+        """Recover each group's label codes from its mixed-radix key"""
+        unique_keys = np.zeros((len(present), len(group_by)), dtype=np.int64)
+        remainder = present.copy()
+        for i in range(len(group_by) - 1, -1, -1):
+            size = len(labels[group_by[i]])
+            unique_keys[:, i] = remainder % size
+            remainder //= size
+        return unique_keys
+
+    @staticmethod
+    def _row_measures(columns: Dict[str, np.ndarray], rows: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-vote values that are summed into group aggregates"""
+        yes = columns["yes"][rows].astype(np.int64)
+        no = columns["no"][rows].astype(np.int64)
+        decided = yes + no
+        return {
+            "votes": np.ones(len(rows)),
+            "passed": columns["passed"][rows],
+            "margin_sum": np.divide(yes - no, decided, out=np.zeros(len(rows)), where=decided > 0),
+            "margin_votes": decided > 0,
+            "yes": yes,
+            "no": no,
+            "abstain": columns["abstain"][rows],
+        }
+
+    @staticmethod
+    def _distinct_bills(bill: np.ndarray, group: np.ndarray, groups: int) -> np.ndarray:
+        """Count distinct bills per group
+
+        Rows are stored in bill order, so the stable (timsort) sort of
+        (bill, group) keys is close to linear.
+        """
+        pairs = np.sort(bill.astype(np.int64) * groups + group, kind="stable")
+        first = np.ones(len(pairs), dtype=bool)
+        first[1:] = pairs[1:] != pairs[:-1]
+        return np.bincount(pairs[first] % groups, minlength=groups)
+
+    @staticmethod
+    def _party_totals(columns, rows, group, groups: int, party_count: int) -> np.ndarray:
+        """Sum per-party option counts into a (groups, parties, options) array"""
+        # Map vote rows to their group, with -1 for rows filtered out
+        row_group = np.full(len(columns["yes"]), -1, dtype=np.int64)
+        row_group[rows] = group
+
+        vote_group = row_group[columns["party_vote"]]
+        keep = vote_group >= 0
+        flat = (vote_group[keep] * party_count + columns["party_code"][keep]) * len(OPTIONS) + columns["party_option"][keep]
+        totals = np.bincount(flat, weights=columns["party_count"][keep], minlength=groups * party_count * len(OPTIONS))
+        return totals.reshape(groups, party_count, len(OPTIONS)).astype(np.int64)
+
+    def _summarize(self, columns, labels, rows: np.ndarray, group_by: List[str], include_parties: bool):
+        """Aggregate raw vote rows; returns (group label codes, sums, bills, party totals)"""
+        codes = {field: columns[field][rows] for field in group_by}
+        present, group = self._factorize(codes, group_by, labels, len(rows))
+        groups = len(present)
+        sums = {
+            name: np.bincount(group, weights=values, minlength=groups)
+            for name, values in self._row_measures(columns, rows).items()
+        }
+        bills = self._distinct_bills(columns["bill"][rows], group, groups)
+        parties = None
+        if include_parties:
+            parties = self._party_totals(columns, rows, group, groups, len(labels["party"]))
+        return self._decode(present, group_by, labels), sums, bills, parties
+
+    def _build_cube(self, columns, labels) -> Dict[str, Any]:
+        """Pre-aggregate votes per (jurisdiction, session, chamber) cell
+
+        Queries without a date filter roll these cells up instead of scanning
+        every vote. A bill belongs to exactly one jurisdiction and session but
+        may be voted on in both chambers, so distinct bills are also kept per
+        (jurisdiction, session) cell for queries that don't split by chamber.
+        """
+        rows = np.arange(len(columns["yes"]))
+        cells, sums, bills, parties = self._summarize(columns, labels, rows, list(GROUP_FIELDS), True)
+        cube = {field: cells[:, i] for i, field in enumerate(GROUP_FIELDS)}
+        cube.update({"sums": sums, "bills": bills, "parties": parties})
+
+        session_cells, _, session_bills, _ = self._summarize(columns, labels, rows, ["jurisdiction", "session"], False)
+        cube["session_cells"] = {"jurisdiction": session_cells[:, 0], "session": session_cells[:, 1]}
+        cube["session_bills"] = session_bills
+        return cube
+
+    def _filter_codes(self, labels, filters: Dict[str, Optional[str]]) -> Dict[str, int]:
+        """Map label filters to codes; unknown labels map to -1 and match nothing"""
+        return {
+            field: labels[field].index(value) if value in labels[field] else -1
+            for field, value in filters.items() if value is not None
+        }
+
+    def aggregate(
+        self,
+        group_by: List[str],
+        jurisdiction: Optional[str] = None,
+        session: Optional[str] = None,
+        chamber: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        include_parties: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Compute vote aggregates grouped by any of jurisdiction, session and chamber"""
+        with self._lock:
+            columns = self._columns
+            labels = self._labels
+            cube = self._cube
+        if not columns or len(columns["yes"]) == 0:
+            return []
+
+        filters = self._filter_codes(labels, {"jurisdiction": jurisdiction, "session": session, "chamber": chamber})
+
+        since, until = parse_day(since), parse_day(until)
+        if since is not None or until is not None:
+            # Date filters need the raw vote rows
+            mask = np.ones(len(columns["yes"]), dtype=bool)
+            for field, code in filters.items():
+                mask &= columns[field] == code
+            if since is not None:
+                mask &= columns["date"] >= since
+            if until is not None:
+                mask &= columns["date"] <= until
+            rows = np.nonzero(mask)[0]
+            if len(rows) == 0:
+                return []
+            keys, sums, bills, parties = self._summarize(columns, labels, rows, group_by, include_parties)
+        else:
+            # Otherwise roll up the pre-aggregated cells
+            mask = np.ones(len(cube["bills"]), dtype=bool)
+            for field, code in filters.items():
+                mask &= cube[field] == code
+            cells = np.nonzero(mask)[0]
+            if len(cells) == 0:
+                return []
+            codes = {field: cube[field][cells] for field in group_by}
+            present, group = self._factorize(codes, group_by, labels, len(cells))
+            groups = len(present)
+            keys = self._decode(present, group_by, labels)
+            sums = {
+                name: np.bincount(group, weights=values[cells], minlength=groups)
+                for name, values in cube["sums"].items()
+            }
+
+            if "chamber" in group_by or "chamber" in filters:
+                bills = np.bincount(group, weights=cube["bills"][cells], minlength=groups)
+            else:
+                session_cells = cube["session_cells"]
+                session_mask = np.ones(len(cube["session_bills"]), dtype=bool)
+                for field, code in filters.items():
+                    session_mask &= session_cells[field] == code
+                selected = np.nonzero(session_mask)[0]
+                session_codes = {field: session_cells[field][selected] for field in group_by}
+                session_present, session_group = self._factorize(session_codes, group_by, labels, len(selected))
+                totals = np.bincount(session_group, weights=cube["session_bills"][selected])
+                bills = totals[np.searchsorted(session_present, present)]
+
+            parties = None
+            if include_parties:
+                parties = np.zeros((groups,) + cube["parties"].shape[1:], dtype=np.int64)
+                np.add.at(parties, group, cube["parties"][cells])
+
+        results = []
+        for g in range(len(keys)):
+            result = {field: labels[field][keys[g, i]] for i, field in enumerate(group_by)}
+            votes = sums["votes"][g]
+            result.update({
+                "votes": int(votes),
+                "bills": int(bills[g]),
+                "passed": int(sums["passed"][g]),
+                "pass_rate": round(float(sums["passed"][g] / votes), 4),
+                "avg_margin": round(float(sums["margin_sum"][g] / sums["margin_votes"][g]), 4) if sums["margin_votes"][g] else None,
+                "yes": int(sums["yes"][g]),
+                "no": int(sums["no"][g]),
+                "abstain": int(sums["abstain"][g]),
+            })
+            if parties is not None:
+                result["parties"] = {
+                    labels["party"][p]: dict(zip(OPTIONS, parties[g, p].tolist()))
+                    for p in np.nonzero(parties[g].sum(axis=1))[0]
+                }
+            results.append(result)
+        return results
+
+
+# Create a singleton instance
+vote_analytics = VoteAnalytics()
@@ -0,0 +1,296 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import AnalysisBatch, AnalysisRequest, Bill, Keyword, bill_keyword
+from app.services.claude import claude_service, record_usage
+
+# The Message Batches API accepts up to 100,000 requests or 256 MB per batch;
+# smaller batches finish sooner and lose less work if one fails
+BATCH_MAX_REQUESTS = int(os.getenv("ANALYSIS_BATCH_MAX_REQUESTS", "1000"))
+BATCH_MAX_BYTES = int(os.getenv("ANALYSIS_BATCH_MAX_BYTES", str(100 * 1024 * 1024)))
+BATCH_POLL_SECONDS = float(os.getenv("ANALYSIS_BATCH_POLL_SECONDS", "60"))
+# Bills whose summary request failed this many times are no longer resubmitted
+MAX_ATTEMPTS = int(os.getenv("ANALYSIS_MAX_ATTEMPTS", "3"))
+# Clock difference allowed between this machine and the API when matching interrupted submissions
+SUBMIT_CLOCK_SLACK = timedelta(minutes=10)
+
+KINDS = ("summary", "keywords")
+UNAVAILABLE_TEXT = ("Bill text not available", "Bill text URL not available")
+
+
+def custom_id(kind: str, bill_id: str, tag: str = "") -> str:
+    """Batch request ID for a bill, with its batch's tag; the API only allows [A-Za-z0-9_-], up to 64 characters"""
+    digest = hashlib.sha1(bill_id.encode()).hexdigest()
+    return f"{kind}-{tag}-{digest}" if tag else f"{kind}-{digest}"
+
+
+def batch_tag(batch_id: str) -> str:
+    """Short form of a local batch ID, carried in the custom ID of each of its requests"""
+    return batch_id.replace("-", "")[:12]
+
+
+def _utc(value: datetime) -> datetime:
+    """A timestamp as naive UTC, like the ones stored in the database"""
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+def _total(counts: Any) -> int:
+    return counts.processing + counts.succeeded + counts.errored + counts.canceled + counts.expired
+
+
+def _chunks(items: List[Any], size: int = 500) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BatchAnalysisService:
+    """Summarize and tag stored bills through the Message Batches API
+
+    Every batch and request is recorded before it is submitted, and results are
+    written back in one transaction per batch, so an interrupted run picks up
+    where it left off: batches still processing are polled again, and bills in
+    a batch whose submission never completed become pending again.
+    """
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        # Default to the Claude service's client so stand-ins swapped in there apply here too
+        return self._client or claude_service.client
+
+    def recover(self, db: Session) -> Tuple[int, int]:
+        """Settle batches recorded as submitting; returns how many were adopted and how many dropped
+
+        The process may have stopped after the API accepted a batch but before
+        its remote ID was stored. Such a batch is looked for among the remote
+        batches created since it was recorded that no local batch claims: one
+        with the same number of requests and, if it has ended, whose results
+        carry the batch's tag. A match is adopted and polled like any other
+        batch; otherwise the API never received it, and it is dropped so its
+        bills are submitted again.
+        """
+        stale = db.query(AnalysisBatch).filter(AnalysisBatch.status == "submitting").order_by(
+            AnalysisBatch.created_at
+        ).all()
+        if not stale:
+            return 0, 0
+
+        # Remote batches are listed newest first
+        since = min(batch.created_at for batch in stale) - SUBMIT_CLOCK_SLACK
+        claimed = {remote_id for (remote_id,) in db.query(AnalysisBatch.remote_id).filter(
+            AnalysisBatch.remote_id.isnot(None)
+        )}
+        candidates = []
+        for remote in self.client.messages.batches.list(limit=100):
+            if _utc(remote.created_at) < since:
+                break
+            if remote.id not in claimed:
+                candidates.append(remote)
+        candidates.reverse()
+
+        adopted = 0
+        for batch in stale:
+            remote = self._find_submission(batch, candidates)
+            if remote is None:
+                db.delete(batch)
+                continue
+            candidates.remove(remote)
+            batch.remote_id = remote.id
+            batch.status = "in_progress"
+            adopted += 1
+        db.commit()
+        return adopted, len(stale) - adopted
+
+    def _find_submission(self, batch: AnalysisBatch, candidates: List[Any]) -> Optional[Any]:
+        """The earliest remote batch that could be this local batch's interrupted submission"""
+        tag = batch_tag(batch.id)
+        for remote in candidates:
+            if _utc(remote.created_at) < batch.created_at - SUBMIT_CLOCK_SLACK \
+                    or _total(remote.request_counts) != batch.request_count:
+                continue
+            if remote.processing_status == "ended":
+                first = next(iter(self.client.messages.batches.results(remote.id)), None)
+                if first is None or f"-{tag}-" not in first.custom_id:
+                    continue
+            return remote
+        return None
+
+    def pending_bills(self, db: Session, limit: Optional[int] = None) -> List[Tuple[str, str]]:
+        """(id, title) of bills without a summary that are not in an open batch"""
+        open_bills = db.query(AnalysisRequest.bill_id).join(AnalysisBatch).filter(AnalysisBatch.status != "applied")
+        failed_bills = (
+            db.query(AnalysisRequest.bill_id)
+            .filter(AnalysisRequest.kind == "summary", AnalysisRequest.status.notin_(("submitted", "succeeded")))
+            .group_by(AnalysisRequest.bill_id)
+            .having(func.count() >= MAX_ATTEMPTS)
+        )
+        query = (
+            db.query(Bill.id, Bill.title)
+            .filter(Bill.summary.is_(None), Bill.id.notin_(open_bills), Bill.id.notin_(failed_bills))
+            .order_by(Bill.updated_at.desc())
+        )
+        if limit:
+            query = query.limit(limit)
+        return query.all()
+
+    def _requests_for(self, bill_id: str, title: str, text: str) -> List[Dict[str, Any]]:
+        builders = {"summary": claude_service.summary_request, "keywords": claude_service.keywords_request}
+        return [
+            {"custom_id": custom_id(kind, bill_id), "params": {"model": claude_service.model, **builders[kind](text, title)}}
+            for kind in KINDS
+        ]
+
+    def submit(self, db: Session, entries: List[Tuple[str, List[Dict[str, Any]]]]) -> AnalysisBatch:
+        """Record and submit one batch; `entries` pairs each bill ID with its requests"""
+        batch = AnalysisBatch(id=str(uuid.uuid4()), status="submitting",
+                              request_count=sum(len(requests) for _, requests in entries))
+        # Tag every custom ID with the batch, so recover() can recognize it if the remote ID is never stored
+        tag = batch_tag(batch.id)
+        tagged = []
+        for bill_id, requests in entries:
+            for request in requests:
+                kind = request["custom_id"].split("-", 1)[0]
+                tagged.append({**request, "custom_id": custom_id(kind, bill_id, tag)})
+                batch.requests.append(AnalysisRequest(custom_id=tagged[-1]["custom_id"], bill_id=bill_id, kind=kind))
+        db.add(batch)
+        db.commit()
+
+        remote = self.client.messages.batches.create(requests=tagged)
+        batch.remote_id = remote.id
+        batch.status = "in_progress"
+        db.commit()
+        print(f"Submitted batch {remote.id} with {batch.request_count} requests for {len(entries)} bills")
+        return batch
+
+    def submit_pending(self, db: Session, fetch_text: Callable[[str], str], limit: Optional[int] = None,
+                       delay: float = 0.0) -> int:
+        """Fetch text for pending bills and submit them in batches; returns the number of bills submitted"""
+        submitted = 0
+        entries: List[Tuple[str, List[Dict[str, Any]]]] = []
+        size = 0
+        for bill_id, title in self.pending_bills(db, limit):
+            try:
+                text = fetch_text(bill_id)
+            except Exception as e:
+                print(f"Error fetching text for bill {bill_id}: {str(e)}")
+                continue
+            if not text or text in UNAVAILABLE_TEXT:
+                print(f"Bill text not available for {bill_id}. Skipping analysis.")
+                continue
+
+            requests = self._requests_for(bill_id, title, text)
+            request_size = sum(len(json.dumps(request)) for request in requests)
+            if entries and (size + request_size > BATCH_MAX_BYTES
+                            or (len(entries) + 1) * len(KINDS) > BATCH_MAX_REQUESTS):
+                self.submit(db, entries)
+                submitted += len(entries)
+                entries, size = [], 0
+            entries.append((bill_id, requests))
+            size += request_size
+            if delay:
+                time.sleep(delay)
+
+        if entries:
+            self.submit(db, entries)
+            submitted += len(entries)
+        return submitted
+
+    def poll(self, db: Session, wait: bool = True, poll_seconds: float = BATCH_POLL_SECONDS) -> int:
+        """Apply the results of every finished batch, waiting for open ones if `wait`; returns batches applied"""
+        applied = 0
+        while True:
+            waiting = 0
+            for batch in db.query(AnalysisBatch).filter(AnalysisBatch.status == "in_progress").all():
+                remote = self.client.messages.batches.retrieve(batch.remote_id)
+                if remote.processing_status == "ended":
+                    self.apply(db, batch)
+                    applied += 1
+                else:
+                    waiting += 1
+                    counts = remote.request_counts
+                    print(f"Batch {batch.remote_id}: {counts.succeeded + counts.errored} of "
+                          f"{batch.request_count} requests done")
+            if not wait or not waiting:
+                return applied
+            time.sleep(poll_seconds)
+
+    def apply(self, db: Session, batch: AnalysisBatch):
+        """Write a finished batch's summaries and keywords back in a single transaction"""
+        requests = {request.custom_id: request for request in batch.requests}
+        summaries: List[Dict[str, Any]] = []
+        keywords: Dict[str, List[str]] = {}
+        for entry in self.client.messages.batches.results(batch.remote_id):
+            request = requests.get(entry.custom_id)
+            if request is None or request.status != "submitted":
+                continue
+            request.status = entry.result.type
+            if entry.result.type != "succeeded":
+                continue
+
+            message = entry.result.message
+            usage = getattr(message, "usage", None)
+            if usage is not None:
+                record_usage(f"batch_{request.kind}", usage)
+            text = message.content[0].text
+            if request.kind == "summary":
+                summaries.append({"id": request.bill_id, "summary": text})
+            else:
+                keywords[request.bill_id] = claude_service.parse_keywords(text)
+
+        db.bulk_update_mappings(Bill, summaries)
+        self._store_keywords(db, keywords)
+        batch.status = "applied"
+        batch.applied_at = datetime.utcnow()
+        db.commit()
+
+        failed = sum(1 for request in batch.requests if request.status != "succeeded")
+        print(f"Applied batch {batch.remote_id}: {len(summaries)} summaries, {len(keywords)} keyword sets, "
+              f"{failed} failed requests")
+
+    def _store_keywords(self, db: Session, keywords: Dict[str, List[str]]):
+        """Create missing keywords and link them to their bills with a few bulk statements"""
+        names = sorted({name for names in keywords.values() for name in names})
+        ids: Dict[str, int] = {}
+        for chunk in _chunks(names):
+            ids.update(db.query(Keyword.name, Keyword.id).filter(Keyword.name.in_(chunk)).all())
+        missing = [name for name in names if name not in ids]
+        if missing:
+            db.bulk_insert_mappings(Keyword, [{"name": name} for name in missing])
+            for chunk in _chunks(missing):
+                ids.update(db.query(Keyword.name, Keyword.id).filter(Keyword.name.in_(chunk)).all())
+
+        linked = set()
+        for chunk in _chunks(list(keywords)):
+            linked.update(db.query(bill_keyword.c.bill_id, bill_keyword.c.keyword_id)
+                          .filter(bill_keyword.c.bill_id.in_(chunk)).all())
+        links = {
+            (bill_id, ids[name]) for bill_id, names in keywords.items() for name in names
+        } - linked
+        if links:
+            db.execute(bill_keyword.insert(), [{"bill_id": bill_id, "keyword_id": keyword_id}
+                                               for bill_id, keyword_id in sorted(links)])
+
+    def run(self, db: Session, fetch_text: Callable[[str], str], limit: Optional[int] = None,
+            wait: bool = True, delay: float = 0.0, poll_seconds: float = BATCH_POLL_SECONDS) -> Dict[str, int]:
+        """Resume any earlier run, submit pending bills, then collect results"""
+        adopted, dropped = self.recover(db)
+        if adopted:
+            print(f"Found {adopted} batches whose submission was interrupted after the API accepted them")
+        if dropped:
+            print(f"Discarded {dropped} batches whose submission was interrupted; their bills will be resubmitted")
+        applied = self.poll(db, wait=False)
+        submitted = self.submit_pending(db, fetch_text, limit, delay)
+        applied += self.poll(db, wait=wait, poll_seconds=poll_seconds)
+        return {"submitted_bills": submitted, "applied_batches": applied}
+
+
+# Create a singleton instance
+batch_analysis_service = BatchAnalysisService()
@@ -0,0 +1,74 @@
+import hashlib
+from typing import Any, Dict, Optional
+from app.services.admission import BATCH
+from app.services.cache import bill_data_cache, bill_text_cache, analysis_cache, version_text_cache, diff_cache
+from app.services.claude import claude_service
+from app.services.diff import diff_versions, extract_text
+from app.services.openstates import openstates_service, bill_versions, version_url
+
+
+class VersionNotFound(LookupError):
+    """A bill has no version with the requested number, or no text for it"""
+
+
+def get_bill_data(bill_id: str) -> Dict[str, Any]:
+    """A bill's OpenStates payload, cached briefly"""
+    return bill_data_cache.get_or_load(bill_id, lambda: openstates_service.get_bill(bill_id))
+
+
+def get_bill_text(bill_id: str) -> str:
+    """The text of a bill's latest version, cached"""
+    return bill_text_cache.get_or_load(
+        bill_id, lambda: openstates_service.get_bill_text(bill_id, get_bill_data(bill_id))
+    )
+
+
+def get_bill_title(bill_id: str) -> str:
+    return openstates_service.transform_bill_data(get_bill_data(bill_id)).title
+
+
+def get_bill_analysis(bill_id: str, priority: int = BATCH) -> Dict[str, Any]:
+    """Claude's summary and keywords for a bill, cached"""
+    return analysis_cache.get_or_load(
+        bill_id, lambda: claude_service.analyze_bill(get_bill_text(bill_id), get_bill_title(bill_id), priority)
+    )
+
+
+def get_version_text(url: str) -> str:
+    """The extracted text of one bill version, cached by URL since published versions don't change"""
+    return version_text_cache.get_or_load(url, lambda: extract_text(openstates_service.get_document(url, "get_version_text")))
+
+
+def _version_summary(index: int, version: Dict[str, Any]) -> Dict[str, Any]:
+    return {"index": index, "note": version.get("note"), "date": version.get("date"), "url": version_url(version)}
+
+
+def get_bill_versions(bill_id: str) -> Dict[str, Any]:
+    """A bill's versions, numbered from 0 for the oldest"""
+    versions = bill_versions(get_bill_data(bill_id))
+    return {"bill_id": bill_id, "versions": [_version_summary(i, version) for i, version in enumerate(versions)]}
+
+
+def get_version_diff(bill_id: str, from_version: Optional[int] = None, to_version: Optional[int] = None) -> Dict[str, Any]:
+    """Section diff between two versions of a bill, by default the latest against the one before
+
+    Diffs are cached per pair of version URLs, so every later view of the same
+    pair, from any worker, is a cache read.
+    """
+    versions = bill_versions(get_bill_data(bill_id))
+    if len(versions) < 2:
+        raise VersionNotFound(f"Bill has {len(versions)} version(s); at least two are needed for a diff")
+    to_version = len(versions) - 1 if to_version is None else to_version
+    from_version = max(0, to_version - 1) if from_version is None else from_version
+    for index in (from_version, to_version):
+        if not 0 <= index < len(versions):
+            raise VersionNotFound(f"No version {index}; versions are numbered 0 to {len(versions) - 1}, oldest first")
+
+    old, new = versions[from_version], versions[to_version]
+    old_url, new_url = version_url(old), version_url(new)
+    if not old_url or not new_url:
+        raise VersionNotFound("Version text URL not available")
+    key = hashlib.sha1(f"{old_url}\n{new_url}".encode()).hexdigest()
+    diff = diff_cache.get_or_load(key, lambda: diff_versions(get_version_text(old_url), get_version_text(new_url)))
+    return {"bill_id": bill_id, "from": _version_summary(from_version, old), "to": _version_summary(to_version, new),
+            **diff}
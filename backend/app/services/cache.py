@@ -0,0 +1,466 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+from app.services.metrics import record_cache
+from app.services.resilience import deadline_remaining
+
+logger = logging.getLogger(__name__)
+
+# OpenStates bill payloads change as bills move, so they are kept briefly
+BILL_CACHE_TTL = float(os.getenv("BILL_CACHE_TTL", "600"))
+BILL_CACHE_MAX_ENTRIES = int(os.getenv("BILL_CACHE_MAX_ENTRIES", "1024"))
+# Bill text and Claude analysis only change when a new version is published
+TEXT_CACHE_TTL = float(os.getenv("TEXT_CACHE_TTL", "21600"))
+TEXT_CACHE_MAX_ENTRIES = int(os.getenv("TEXT_CACHE_MAX_ENTRIES", "256"))
+ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "86400"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+# A diff between two published versions never changes; it is only evicted for space
+DIFF_CACHE_TTL = float(os.getenv("DIFF_CACHE_TTL", "604800"))
+DIFF_CACHE_MAX_ENTRIES = int(os.getenv("DIFF_CACHE_MAX_ENTRIES", "512"))
+
+# Where cached entries live: "sqlite" (a file shared by every worker on the host),
+# "redis" (any Redis-compatible server) or "memory" (private to each worker)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite").lower()
+CACHE_PATH = os.getenv("CACHE_PATH", "./legispal_cache.db")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+# How long a worker may hold a key while loading it before others stop waiting
+CACHE_LOAD_LEASE = float(os.getenv("CACHE_LOAD_LEASE", "60"))
+# How often a worker waiting on another's load checks for the value
+CACHE_POLL_INTERVAL = 0.05
+
+
+class CacheBackend:
+    """Storage for cache entries, keyed by (namespace, key)
+
+    Values must be JSON-serializable so that every worker, and every kind of
+    backend, can read what another wrote. Leases let workers agree on which
+    of them loads a missing key; a lease expires on its own if its holder dies.
+    """
+
+    shared = False
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        """(found, value), refreshing the entry's place in the LRU order"""
+        raise NotImplementedError
+
+    def contains(self, namespace: str, key: str) -> bool:
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, max_entries: int):
+        """Store a value, then evict the least recently used entries over `max_entries`"""
+        raise NotImplementedError
+
+    def delete(self, namespace: str, key: str):
+        raise NotImplementedError
+
+    def clear(self, namespace: str):
+        raise NotImplementedError
+
+    def count(self, namespace: str) -> int:
+        raise NotImplementedError
+
+    def acquire(self, name: str, seconds: float) -> bool:
+        """Take a lease on `name` unless another holder has an unexpired one"""
+        return True
+
+    def release(self, name: str):
+        pass
+
+    def held(self, name: str) -> bool:
+        """Whether anyone holds an unexpired lease on `name`"""
+        return False
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": "memory", "shared": self.shared}
+
+
+class MemoryBackend(CacheBackend):
+    """Per-process LRU dictionaries; nothing is shared between workers"""
+
+    def __init__(self):
+        self._namespaces: Dict[str, "OrderedDict[str, tuple]"] = {}
+        self._lock = threading.Lock()
+
+    def _entries(self, namespace: str) -> "OrderedDict[str, tuple]":
+        return self._namespaces.setdefault(namespace, OrderedDict())
+
+    def _lookup(self, namespace: str, key: str, touch: bool) -> Tuple[bool, Any]:
+        entries = self._entries(namespace)
+        entry = entries.get(key)
+        if entry is None:
+            return False, None
+        expires, value = entry
+        if expires < time.time():
+            del entries[key]
+            return False, None
+        if touch:
+            entries.move_to_end(key)
+        return True, value
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            return self._lookup(namespace, key, touch=True)
+
+    def contains(self, namespace: str, key: str) -> bool:
+        with self._lock:
+            return self._lookup(namespace, key, touch=False)[0]
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, max_entries: int):
+        with self._lock:
+            entries = self._entries(namespace)
+            entries[key] = (time.time() + ttl, value)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            self._entries(namespace).pop(key, None)
+
+    def clear(self, namespace: str):
+        with self._lock:
+            self._entries(namespace).clear()
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return len(self._entries(namespace))
+
+
+class SQLiteBackend(CacheBackend):
+    """Entries in a SQLite file that every worker on the host opens
+
+    The file runs in WAL mode with reads memory-mapped, so lookups don't block
+    on writers. Each write replaces an entry and evicts in one transaction, so
+    readers see the old value or the new one, never part of either. Recency
+    is only written back once a second per entry, to keep hits from turning
+    into writes.
+    """
+
+    shared = True
+    TOUCH_INTERVAL = 1.0
+
+    def __init__(self, path: str = CACHE_PATH):
+        self.path = path
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "expires REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+            "expires REAL NOT NULL) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT value, expires, accessed FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        if row is None:
+            return False, None
+        value, expires, accessed = row
+        now = time.time()
+        if expires < now:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ? AND expires < ?", (namespace, key, now))
+            return False, None
+        if now - accessed > self.TOUCH_INTERVAL:
+            conn.execute("UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?", (now, namespace, key))
+        return True, json.loads(value)
+
+    def contains(self, namespace: str, key: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM entries WHERE namespace = ? AND key = ? AND expires >= ?", (namespace, key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, max_entries: int):
+        encoded = json.dumps(value)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, value, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, encoded, now + ttl, now),
+            )
+            (count,) = conn.execute("SELECT count(*) FROM entries WHERE namespace = ?", (namespace,)).fetchone()
+            if count > max_entries:
+                conn.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key IN "
+                    "(SELECT key FROM entries WHERE namespace = ? ORDER BY accessed LIMIT ?)",
+                    (namespace, namespace, count - max_entries),
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete(self, namespace: str, key: str):
+        self._connection().execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def clear(self, namespace: str):
+        self._connection().execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def count(self, namespace: str) -> int:
+        return self._connection().execute(
+            "SELECT count(*) FROM entries WHERE namespace = ?", (namespace,)
+        ).fetchone()[0]
+
+    def acquire(self, name: str, seconds: float) -> bool:
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM leases WHERE name = ? AND expires < ?", (name, now))
+            taken = conn.execute(
+                "INSERT OR IGNORE INTO leases (name, owner, expires) VALUES (?, ?, ?)", (name, self.owner, now + seconds)
+            ).rowcount == 1
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return taken
+
+    def release(self, name: str):
+        self._connection().execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, self.owner))
+
+    def held(self, name: str) -> bool:
+        row = self._connection().execute(
+            "SELECT 1 FROM leases WHERE name = ? AND expires >= ?", (name, time.time())
+        ).fetchone()
+        return row is not None
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "shared": self.shared, "path": self.path}
+
+
+class RedisBackend(CacheBackend):
+    """Entries in a Redis-compatible server (Redis, Valkey, KeyDB, ...)
+
+    Expiry uses the server's TTLs. The server's own eviction policy bounds
+    memory (configure `maxmemory-policy allkeys-lru`), so `max_entries` is
+    not enforced here.
+    """
+
+    shared = True
+    PREFIX = "legispal:"
+
+    def __init__(self, url: str = CACHE_REDIS_URL):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package (pip install redis)") from e
+        self.url = url
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.client = redis.Redis.from_url(url)
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.PREFIX}{namespace}:{key}"
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        value = self.client.get(self._key(namespace, key))
+        return (False, None) if value is None else (True, json.loads(value))
+
+    def contains(self, namespace: str, key: str) -> bool:
+        return bool(self.client.exists(self._key(namespace, key)))
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float, max_entries: int):
+        self.client.set(self._key(namespace, key), json.dumps(value), px=max(1, int(ttl * 1000)))
+
+    def delete(self, namespace: str, key: str):
+        self.client.delete(self._key(namespace, key))
+
+    def clear(self, namespace: str):
+        keys = list(self.client.scan_iter(match=self._key(namespace, "*"), count=500))
+        if keys:
+            self.client.delete(*keys)
+
+    def count(self, namespace: str) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self._key(namespace, "*"), count=500))
+
+    def acquire(self, name: str, seconds: float) -> bool:
+        return bool(self.client.set(f"{self.PREFIX}lease:{name}", self.owner, nx=True, px=max(1, int(seconds * 1000))))
+
+    def release(self, name: str):
+        key = f"{self.PREFIX}lease:{name}"
+        if self.client.get(key) == self.owner.encode():
+            self.client.delete(key)
+
+    def held(self, name: str) -> bool:
+        return bool(self.client.exists(f"{self.PREFIX}lease:{name}"))
+
+    def describe(self) -> Dict[str, Any]:
+        return {"backend": "redis", "shared": self.shared, "url": self.url}
+
+
+def create_backend(kind: str = CACHE_BACKEND) -> CacheBackend:
+    """The cache backend named by CACHE_BACKEND"""
+    if kind == "memory":
+        return MemoryBackend()
+    if kind == "sqlite":
+        return SQLiteBackend(CACHE_PATH)
+    if kind == "redis":
+        return RedisBackend(CACHE_REDIS_URL)
+    raise ValueError(f"Unknown CACHE_BACKEND {kind!r}; expected memory, sqlite or redis")
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire `ttl` seconds after they are stored
+
+    `get_or_load` runs the loader once per key at a time: concurrent callers
+    missing on the same key wait for the first one instead of repeating an
+    upstream call. With a shared backend this holds across workers too, via a
+    lease on the key; if the loading worker fails or dies, a waiter loads the
+    key itself.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl: float, backend: Optional[CacheBackend] = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryBackend()
+        self._loading: Dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        try:
+            return self.backend.get(self.name, str(key))
+        except Exception as e:
+            # A broken cache costs an upstream call, not the request
+            logger.warning("cache_read_failed cache=%s error=%s", self.name, e)
+            return False, None
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """The cached value, or None if it is missing or expired"""
+        found, value = self._lookup(key)
+        record_cache(self.name, found)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether a live entry exists, without counting a lookup"""
+        try:
+            return self.backend.contains(self.name, str(key))
+        except Exception as e:
+            logger.warning("cache_read_failed cache=%s error=%s", self.name, e)
+            return False
+
+    def set(self, key: Hashable, value: Any):
+        if self.max_entries <= 0:
+            return
+        try:
+            self.backend.set(self.name, str(key), value, self.ttl, self.max_entries)
+        except Exception as e:
+            logger.warning("cache_write_failed cache=%s error=%s", self.name, e)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """The cached value, calling `loader` to fill the cache on a miss"""
+        while True:
+            found, value = self._lookup(key)
+            if found:
+                record_cache(self.name, True)
+                return value
+            with self._lock:
+                loading = self._loading.get(key)
+                if loading is None:
+                    loading = self._loading[key] = threading.Event()
+                    break
+            # Another caller is loading this key; use its result, or load it ourselves if it failed
+            loading.wait()
+
+        record_cache(self.name, False)
+        try:
+            found, value = self._wait_for_other_worker(key)
+            if found:
+                return value
+            return self._load(key, loader)
+        finally:
+            with self._lock:
+                del self._loading[key]
+            loading.set()
+
+    def _wait_for_other_worker(self, key: Hashable) -> Tuple[bool, Any]:
+        """If another worker holds the load lease on `key`, wait for its value
+
+        Returns (False, None) once the lease is ours, or when the other worker
+        gives up, or the lease or this request's deadline runs out.
+        """
+        lease = f"load:{self.name}:{key}"
+        if not self.backend.shared or self.max_entries <= 0:
+            return False, None
+        try:
+            if self.backend.acquire(lease, CACHE_LOAD_LEASE):
+                return False, None
+        except Exception as e:
+            # Without a working lease, load the key here rather than wait on one that may never come
+            logger.warning("cache_lease_failed cache=%s error=%s", self.name, e)
+            return False, None
+        waited = 0.0
+        remaining = deadline_remaining()
+        limit = CACHE_LOAD_LEASE if remaining is None else min(CACHE_LOAD_LEASE, remaining)
+        while waited < limit:
+            time.sleep(CACHE_POLL_INTERVAL)
+            waited += CACHE_POLL_INTERVAL
+            found, value = self._lookup(key)
+            if found:
+                return True, value
+            try:
+                if not self.backend.held(lease):
+                    break
+            except Exception as e:
+                logger.warning("cache_lease_failed cache=%s error=%s", self.name, e)
+                break
+        return False, None
+    def _load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        try:
+            value = loader()
+            self.set(key, value)
+            return value
+        finally:
+            if self.backend.shared:
+                try:
+                    self.backend.release(f"load:{self.name}:{key}")
+                except Exception as e:
+                    # The lease expires on its own; the loaded value is still good
+                    logger.warning("cache_lease_failed cache=%s error=%s", self.name, e)
+
+    def clear(self):
+        self.backend.clear(self.name)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "cache": self.name,
+            "entries": self.backend.count(self.name),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            **self.backend.describe(),
+        }
+
+
+# Backend shared by the caches below, and caches for content that is slow or costly to produce
+cache_backend = create_backend()
+bill_data_cache = TTLCache("openstates_bill", BILL_CACHE_MAX_ENTRIES, BILL_CACHE_TTL, cache_backend)
+bill_text_cache = TTLCache("bill_text", TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_TTL, cache_backend)
+analysis_cache = TTLCache("bill_analysis", ANALYSIS_CACHE_MAX_ENTRIES, ANALYSIS_CACHE_TTL, cache_backend)
+version_text_cache = TTLCache("bill_version_text", TEXT_CACHE_MAX_ENTRIES, TEXT_CACHE_TTL, cache_backend)
+diff_cache = TTLCache("bill_diff", DIFF_CACHE_MAX_ENTRIES, DIFF_CACHE_TTL, cache_backend)
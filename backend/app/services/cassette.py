@@ -0,0 +1,138 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+import requests
+
+# "off" calls the API directly; "record" calls it and stores every response;
+# "replay" serves only stored responses; "replay_or_record" falls back to the API on a miss
+CASSETTE_MODE = os.getenv("OPENSTATES_CASSETTE_MODE", "off").lower()
+CASSETTE_PATH = os.getenv("OPENSTATES_CASSETTE_PATH", "./openstates_cassette.db")
+# Simulated upstream latency for each replayed response, in milliseconds,
+# or "recorded" to reproduce the latency observed when it was recorded
+REPLAY_LATENCY = os.getenv("OPENSTATES_REPLAY_LATENCY_MS", "0")
+
+MODES = ("off", "record", "replay", "replay_or_record")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that was never recorded
+
+    OpenStates was never called, so this is not a connection error: it
+    doesn't count against the circuit breaker or make the API answer 503.
+    """
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Canonical form of a request: method plus URL with sorted query parameters"""
+    prepared = requests.Request(method, url, params=params).prepare().url
+    parts = urlsplit(prepared)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return f"{method.upper()} {urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))}"
+
+
+class Cassette:
+    """Request/response store for OpenStates calls, kept in a single SQLite file
+
+    Bodies are zlib-compressed and looked up by their canonical request key,
+    so replay is one indexed read per call. The API key header is never stored.
+    """
+
+    def __init__(self, path: str = CASSETTE_PATH, mode: str = CASSETTE_MODE, latency: str = REPLAY_LATENCY):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        # None replays the recorded latency
+        self.latency_ms = None if str(latency).lower() == "recorded" else float(latency)
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, "
+                "body BLOB NOT NULL, elapsed_ms REAL NOT NULL, recorded_at TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> requests.Response:
+        """Drop-in for requests.get that records or replays according to the mode"""
+        key = request_key("GET", url, params)
+        if self.mode in ("replay", "replay_or_record"):
+            response = self._replay(key)
+            if response is not None:
+                self.hits += 1
+                return response
+            self.misses += 1
+            if self.mode == "replay":
+                raise CassetteMiss(f"No recorded response for {key}")
+
+        response = requests.get(url, params=params, **kwargs)
+        self._record(key, response)
+        return response
+
+    def _replay(self, key: str) -> Optional[requests.Response]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT status, headers, body, elapsed_ms FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, headers, body, elapsed_ms = row
+
+        delay_ms = elapsed_ms if self.latency_ms is None else self.latency_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(json.loads(headers))
+        response._content = zlib.decompress(body)
+        response.url = key.split(" ", 1)[1]
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or "utf-8"
+        response.elapsed = timedelta(milliseconds=delay_ms)
+        return response
+
+    def _record(self, key: str, response: requests.Response):
+        # Rate limits and server errors are transient; don't replay them forever
+        if response.status_code == 429 or response.status_code >= 500:
+            return
+        # Only the content type matters on replay; bodies are stored already decoded
+        headers = {"Content-Type": response.headers["Content-Type"]} if "Content-Type" in response.headers else {}
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, status, headers, body, elapsed_ms, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response.status_code, json.dumps(headers), zlib.compress(response.content, 6),
+                 response.elapsed.total_seconds() * 1000 if response.elapsed else 0.0,
+                 datetime.utcnow().isoformat()),
+            )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Mode, hit/miss counts and the number of stored responses"""
+        with self._lock:
+            count = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"mode": self.mode, "path": self.path, "responses": count, "hits": self.hits, "misses": self.misses}
+
+
+# Create a singleton instance
+openstates_cassette = Cassette()
@@ -1,79 +1,197 @@
 import os
-from typing import List, Dict, Any, Optional
-from anthropic import Anthropic
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from app.services.metrics import track_upstream, CLAUDE_TOKENS, CLAUDE_INPUT_TOKENS
+from app.services.tracing import start_span, KIND_CLIENT
+from app.services.resilience import claude_breaker, CLAUDE_TIMEOUT, Overloaded, UpstreamConnectionError
+from app.services.admission import claude_admission, INTERACTIVE, BATCH, PRIORITY_NAMES
+
+# Shared by every bill prompt so the cached prefix is the same across operations
+ANALYST_SYSTEM_PROMPT = (
+    "You are an expert legislative analyst who helps citizens understand bills. "
+    "Your summaries, keywords and answers are clear, concise and accurate, and based on the bill's content."
+)
+
+
+def _text_length(content: Any) -> int:
+    """Characters in a prompt given as a string or a list of content blocks"""
+    if isinstance(content, str):
+        return len(content)
+    return sum(len(block.get("text", "")) for block in content)
+
+
+def _cache_tokens(usage: Any) -> Tuple[int, int]:
+    """(cache read, cache write) input tokens from a usage object; missing fields count as 0"""
+    return (getattr(usage, "cache_read_input_tokens", None) or 0,
+            getattr(usage, "cache_creation_input_tokens", None) or 0)
+
+
+def record_usage(operation: str, usage: Any):
+    """Count a response's tokens, splitting input into uncached, cache-read and cache-write"""
+    cache_read, cache_write = _cache_tokens(usage)
+    CLAUDE_TOKENS.inc(usage.input_tokens, operation=operation, type="input")
+    CLAUDE_TOKENS.inc(cache_read, operation=operation, type="cache_read")
+    CLAUDE_TOKENS.inc(cache_write, operation=operation, type="cache_write")
+    CLAUDE_TOKENS.inc(usage.output_tokens, operation=operation, type="output")
+    CLAUDE_INPUT_TOKENS.observe(usage.input_tokens, operation=operation, cache="uncached")
+    CLAUDE_INPUT_TOKENS.observe(cache_read, operation=operation, cache="read")
+    CLAUDE_INPUT_TOKENS.observe(cache_write, operation=operation, cache="write")
+
+
+def _is_connection_error(error: Exception) -> bool:
+    """Whether an error from the client is the SDK's connection error (or timeout)"""
+    if not type(error).__module__.startswith("anthropic"):
+        return False
+    from anthropic import APIConnectionError
+    return isinstance(error, APIConnectionError)
 
 
 class ClaudeService:
     """Service for interacting with Anthropic's Claude API"""
     
     def __init__(self):
-        """Initialize the Claude API client with API key from environment"""
+        """Read the API key from environment; the client is created on first use"""
         self.api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not self.api_key:
-            raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
-        
-        self.client = Anthropic(api_key=self.api_key)
         self.model = "claude-3-opus-20240229"  # Using the most capable model
+        self._client = None
+        self._client_lock = threading.Lock()
     
-    def generate_bill_summary(self, bill_text: str, bill_title: str) -> str:
-        """Generate a concise summary of a bill"""
-        prompt = f"""
-        You are an expert in legislative analysis. Please provide a concise summary of the following bill.
-        Focus on the main provisions, objectives, and potential impacts.
-        
-        Bill Title: {bill_title}
-        
-        Bill Text:
-        {bill_text[:100000]}  # Limit text to avoid token limits
+    @property
+    def client(self):
+        """The Anthropic client, importing the SDK the first time it is needed"""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    if not self.api_key:
+                        raise ValueError("ANTHROPIC_API_KEY environment variable is not set")
+                    from anthropic import Anthropic
+                    self._client = Anthropic(api_key=self.api_key, timeout=CLAUDE_TIMEOUT)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    @staticmethod
+    def _estimate_tokens(kwargs: Dict[str, Any]) -> int:
+        """Upper-bound token cost of a request: prompt at ~4 characters per token plus max_tokens"""
+        chars = _text_length(kwargs.get("system", "")) + sum(_text_length(m.get("content", "")) for m in kwargs.get("messages", []))
+        return chars // 4 + kwargs.get("max_tokens", 0)
+    
+    def _create_message(self, operation: str, priority: int = BATCH, **kwargs):
+        """Call the Messages API through admission control, recording latency, errors and token usage"""
+        with start_span(f"claude.{operation}", KIND_CLIENT, **{
+            "gen_ai.system": "anthropic",
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": self.model,
+            "gen_ai.request.max_tokens": kwargs.get("max_tokens"),
+            "legispal.priority": PRIORITY_NAMES[priority],
+        }) as span:
+            client = self.client
+            claude_breaker.before_call()
+            try:
+                with claude_admission.admit(priority, self._estimate_tokens(kwargs)) as ticket:
+                    with track_upstream("claude", operation):
+                        try:
+                            response = client.messages.create(model=self.model, **kwargs)
+                        except Exception as e:
+                            # Only rate limits, server errors and connection problems mean Claude is unhealthy
+                            status = getattr(getattr(e, "response", None), "status_code", None)
+                            ticket.rate_limited = status == 429
+                            if status is None or status == 429 or status >= 500:
+                                claude_breaker.record_failure()
+                            else:
+                                claude_breaker.record_success()
+                            if _is_connection_error(e):
+                                raise UpstreamConnectionError(str(e), timeout="Timeout" in type(e).__name__) from e
+                            raise
+                        claude_breaker.record_success()
+                
+                    usage = getattr(response, "usage", None)
+                    if usage is not None:
+                        # Cache reads don't count towards the input token rate limit
+                        ticket.used = usage.input_tokens + _cache_tokens(usage)[1] + usage.output_tokens
+            except Overloaded:
+                # Shed before reaching Claude, so hand back a half-open trial for the next call
+                claude_breaker.release_trial()
+                raise
+            
+            if usage is not None:
+                record_usage(operation, usage)
+                if span is not None:
+                    cache_read, cache_write = _cache_tokens(usage)
+                    span.set_attribute("gen_ai.usage.input_tokens", usage.input_tokens)
+                    span.set_attribute("gen_ai.usage.output_tokens", usage.output_tokens)
+                    span.set_attribute("gen_ai.usage.cache_read_input_tokens", cache_read)
+                    span.set_attribute("gen_ai.usage.cache_creation_input_tokens", cache_write)
+                    span.set_attribute("gen_ai.response.stop_reason", getattr(response, "stop_reason", None))
+        return response
+    
+    def bill_context(self, bill_text: str, bill_title: str) -> List[Dict[str, Any]]:
+        """System prompt shared by every request about a bill, ending with the bill itself
         
-        Please provide a summary in 3-5 paragraphs that would help a citizen understand what this bill does.
+        The instructions and bill text are identical for summaries, keywords and
+        every chat question, so the whole block is marked as a cacheable prefix
+        and each request only adds its task or question after it.
         """
-        
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=1000,
-            temperature=0.2,  # Lower temperature for more factual responses
-            system="You are an expert legislative analyst who provides clear, concise, and accurate summaries of bills.",
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
+        return [
+            {"type": "text", "text": ANALYST_SYSTEM_PROMPT},
+            {
+                "type": "text",
+                "text": f"Bill Title: {bill_title}\n\nBill Text:\n{bill_text[:100000]}",  # Limit text to avoid token limits
+                "cache_control": {"type": "ephemeral"},
+            },
+        ]
+    
+    def summary_request(self, bill_text: str, bill_title: str) -> Dict[str, Any]:
+        """Messages API parameters (other than the model) for a bill summary"""
+        return {
+            "max_tokens": 1000,
+            "temperature": 0.2,  # Lower temperature for more factual responses
+            "system": self.bill_context(bill_text, bill_title),
+            "messages": [
+                {"role": "user", "content": (
+                    "Please provide a concise summary of this bill. Focus on the main provisions, objectives, "
+                    "and potential impacts. Write 3-5 paragraphs that would help a citizen understand what "
+                    "this bill does."
+                )}
+            ],
+        }
+    
+    def keywords_request(self, bill_text: str, bill_title: str) -> Dict[str, Any]:
+        """Messages API parameters (other than the model) for keyword extraction"""
+        return {
+            "max_tokens": 200,
+            "temperature": 0.2,
+            "system": self.bill_context(bill_text, bill_title),
+            "messages": [
+                {"role": "user", "content": (
+                    "Please extract 5-10 relevant keywords or key phrases from this bill. These keywords should "
+                    "help categorize the bill and make it discoverable in searches. Provide ONLY a list of "
+                    "keywords separated by commas, with no additional text or explanation."
+                )}
+            ],
+        }
+    
+    @staticmethod
+    def parse_keywords(keywords_text: str) -> List[str]:
+        """Split Claude's comma-separated keyword answer into a clean list"""
+        return [kw.strip() for kw in keywords_text.split(",") if kw.strip()]
+    
+    def generate_bill_summary(self, bill_text: str, bill_title: str, priority: int = BATCH) -> str:
+        """Generate a concise summary of a bill"""
+        response = self._create_message("summary", priority, **self.summary_request(bill_text, bill_title))
         return response.content[0].text
     
-    def extract_keywords(self, bill_text: str, bill_title: str) -> List[str]:
+    def extract_keywords(self, bill_text: str, bill_title: str, priority: int = BATCH) -> List[str]:
         """Extract relevant keywords from a bill"""
-        prompt = f"""
-        You are an expert in legislative analysis. Please extract 5-10 relevant keywords or key phrases from the following bill.
-        These keywords should help categorize the bill and make it discoverable in searches.
-        
-        Bill Title: {bill_title}
-        
-        Bill Text:
-        {bill_text[:100000]}  # Limit text to avoid token limits
-        
-        Please provide ONLY a list of keywords separated by commas, with no additional text or explanation.
-        """
-        
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=200,
-            temperature=0.2,
-            system="You are an expert legislative analyst who extracts relevant keywords from bills.",
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-        
-        # Process the response to get a clean list of keywords
-        keywords_text = response.content[0].text
-        keywords = [kw.strip() for kw in keywords_text.split(",")]
-        return keywords
+        response = self._create_message("keywords", priority, **self.keywords_request(bill_text, bill_title))
+        return self.parse_keywords(response.content[0].text)
     
-    def analyze_bill(self, bill_text: str, bill_title: str) -> Dict[str, Any]:
+    def analyze_bill(self, bill_text: str, bill_title: str, priority: int = BATCH) -> Dict[str, Any]:
         """Perform comprehensive analysis of a bill, including summary and keywords"""
-        summary = self.generate_bill_summary(bill_text, bill_title)
-        keywords = self.extract_keywords(bill_text, bill_title)
+        summary = self.generate_bill_summary(bill_text, bill_title, priority)
+        keywords = self.extract_keywords(bill_text, bill_title, priority)
         
         return {
             "summary": summary,
@@ -82,26 +200,17 @@ class ClaudeService:
     
     def chat_about_bill(self, bill_text: str, bill_title: str, user_question: str) -> str:
         """Answer a user's question about a specific bill"""
-        prompt = f"""
-        You are an expert in legislative analysis. Please answer the following question about this bill.
-        
-        Bill Title: {bill_title}
-        
-        Bill Text:
-        {bill_text[:100000]}  # Limit text to avoid token limits
-        
-        User Question: {user_question}
-        
-        Please provide a clear, accurate, and helpful answer based on the bill's content.
-        """
-        
-        response = self.client.messages.create(
-            model=self.model,
+        response = self._create_message(
+            "chat",
+            INTERACTIVE,
             max_tokens=1500,
             temperature=0.3,
-            system="You are an expert legislative analyst who helps users understand bills by answering their questions accurately and clearly.",
+            system=self.bill_context(bill_text, bill_title),
             messages=[
-                {"role": "user", "content": prompt}
+                {"role": "user", "content": (
+                    f"User Question: {user_question}\n\n"
+                    "Please provide a clear, accurate, and helpful answer based on the bill's content."
+                )}
             ]
         )
         
@@ -0,0 +1,169 @@
+import difflib
+import hashlib
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
+
+# Lines of unchanged context around each change
+DIFF_CONTEXT_LINES = int(os.getenv("DIFF_CONTEXT_LINES", "2"))
+# Bills whose two versions together are at least this long are diffed section
+# by section in worker processes; smaller ones are quicker to diff in place
+DIFF_PARALLEL_MIN_CHARS = int(os.getenv("DIFF_PARALLEL_MIN_CHARS", "200000"))
+DIFF_WORKERS = int(os.getenv("DIFF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Lines that start a section: "SECTION 1.", "Sec. 2.", "§ 3.", "TITLE IV", "ARTICLE 5:". The number
+# must end the line or be followed by "." or ":", so prose like "Section 5 of title 10" doesn't match
+SECTION_HEADING = re.compile(
+    r"^\s*(?P<kind>SECTION|SEC\.|§|TITLE|ARTICLE|PART|CHAPTER)\s*(?P<number>[0-9IVXLC]+[A-Z]?(?:[.-]\d+)*)"
+    r"(?:[.:]|\s*$)",
+    re.IGNORECASE,
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Visible text of an HTML document, one line per block"""
+
+    BLOCKS = {"p", "div", "br", "li", "tr", "h1", "h2", "h3", "h4", "h5", "h6", "section", "pre"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCKS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def extract_text(document: str) -> str:
+    """Plain text of a bill version, stripping markup from HTML versions"""
+    if "<html" in document[:1000].lower() or "<body" in document[:5000].lower():
+        extractor = _TextExtractor()
+        extractor.feed(document)
+        document = "".join(extractor.parts)
+    lines = (" ".join(line.split()) for line in document.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """(label, text) for each section, in order; text before the first heading is the "preamble"
+
+    Labels are normalized ("Sec. 2." is "SECTION 2"), and a label that
+    repeats, as section numbers do across titles, gets its occurrence appended.
+    """
+    sections: List[Tuple[str, List[str]]] = [("preamble", [])]
+    seen: Dict[str, int] = {}
+    for line in text.splitlines():
+        heading = SECTION_HEADING.match(line)
+        if heading:
+            kind = heading.group("kind").upper().rstrip(".")
+            label = f"{'SECTION' if kind == 'SEC' else kind} {heading.group('number').upper()}"
+            seen[label] = seen.get(label, 0) + 1
+            if seen[label] > 1:
+                label = f"{label} ({seen[label]})"
+            sections.append((label, []))
+        sections[-1][1].append(line)
+    return [(label, "\n".join(lines)) for label, lines in sections if lines or label != "preamble"]
+
+
+def diff_section(old: str, new: str, context: int = DIFF_CONTEXT_LINES) -> Dict[str, Any]:
+    """Unified diff lines of one section, with counts of lines added and removed"""
+    lines = list(difflib.unified_diff(old.splitlines(), new.splitlines(), lineterm="", n=context))[2:]
+    return {
+        "lines": lines,
+        "added": sum(1 for line in lines if line.startswith("+")),
+        "removed": sum(1 for line in lines if line.startswith("-")),
+    }
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _worker_pool() -> ProcessPoolExecutor:
+    """Process pool for large diffs, started on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawned rather than forked, since the server process runs threads
+            _pool = ProcessPoolExecutor(DIFF_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def diff_versions(old_text: str, new_text: str) -> Dict[str, Any]:
+    """Section-by-section diff between two version texts
+
+    Sections are matched by label. Only sections whose text changed are
+    diffed; added and removed sections are listed whole. Sections follow the
+    new version's order, then removed sections in the old version's order.
+    """
+    old_sections = dict(split_sections(old_text))
+    new_sections = split_sections(new_text)
+    new_labels = {label for label, _ in new_sections}
+
+    changed = [
+        (label, old_sections[label], text) for label, text in new_sections
+        if label in old_sections and _digest(old_sections[label]) != _digest(text)
+    ]
+    if len(changed) > 1 and len(old_text) + len(new_text) >= DIFF_PARALLEL_MIN_CHARS and DIFF_WORKERS > 1:
+        pool = _worker_pool()
+        diffs = list(pool.map(diff_section, [old for _, old, _ in changed], [new for _, _, new in changed],
+                              chunksize=max(1, len(changed) // (DIFF_WORKERS * 4))))
+    else:
+        diffs = [diff_section(old, new) for _, old, new in changed]
+    changed_diffs = {label: diff for (label, _, _), diff in zip(changed, diffs)}
+
+    sections = []
+    counts = {"added": 0, "removed": 0, "changed": 0, "unchanged": 0}
+    for label, text in new_sections:
+        if label not in old_sections:
+            lines = text.splitlines()
+            sections.append({"section": label, "status": "added", "lines": ["+" + line for line in lines],
+                             "added": len(lines), "removed": 0})
+            counts["added"] += 1
+        elif label in changed_diffs:
+            sections.append({"section": label, "status": "changed", **changed_diffs[label]})
+            counts["changed"] += 1
+        else:
+            counts["unchanged"] += 1
+    for label, text in old_sections.items():
+        if label not in new_labels:
+            lines = text.splitlines()
+            sections.append({"section": label, "status": "removed", "lines": ["-" + line for line in lines],
+                             "added": 0, "removed": len(lines)})
+            counts["removed"] += 1
+
+    return {
+        "sections": counts,
+        "lines_added": sum(section["added"] for section in sections),
+        "lines_removed": sum(section["removed"] for section in sections),
+        "changes": sections,
+    }
@@ -0,0 +1,191 @@
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import select
+from app.database.connection import SessionLocal
+from app.database.models import Bill, Keyword, bill_keyword
+from app.services.metrics import Counter
+
+# Rows fetched from the cursor, encoded and written at a time
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+# Rows read per transaction; the export resumes after the last bill ID in a new one
+EXPORT_WINDOW = int(os.getenv("EXPORT_WINDOW", "20000"))
+
+EXPORT_ROWS = Counter("legispal_export_rows_total", "Bills written by bulk exports", ["format"])
+
+# Exported columns, in output order; keywords are added from the join table
+EXPORT_COLUMNS = [
+    Bill.id, Bill.identifier, Bill.title, Bill.classification, Bill.subject, Bill.abstract, Bill.session,
+    Bill.jurisdiction_id, Bill.jurisdiction_name, Bill.primary_sponsor_id, Bill.primary_sponsor_name,
+    Bill.actions, Bill.documents, Bill.votes, Bill.versions, Bill.updated_at, Bill.summary, Bill.ai_analysis,
+]
+
+# Media type and download name of each format
+FORMATS = {
+    "jsonl": ("application/gzip", "bills.jsonl.gz"),
+    "parquet": ("application/vnd.apache.parquet", "bills.parquet"),
+}
+
+
+class ExportUnavailable(RuntimeError):
+    """The requested export format needs a library that isn't installed"""
+
+
+def iter_bill_batches(jurisdiction: Optional[str] = None, session: Optional[str] = None,
+                      since: Optional[datetime] = None, batch_size: int = EXPORT_BATCH_SIZE,
+                      window: int = EXPORT_WINDOW) -> Iterator[List[Dict[str, Any]]]:
+    """Stored bills as lists of plain rows, `batch_size` at a time, in ID order
+
+    Rows come off a server-side cursor with yield_per, so memory is bounded by
+    one batch whatever the size of the table. One cursor over the whole table
+    would hold a single read transaction open for the entire export, which on
+    SQLite stops WAL checkpoints and on PostgreSQL holds back vacuum, so the
+    export instead reads `window` bills per transaction, continuing from the
+    last ID. The result is not a single snapshot: bills updated mid-export
+    appear as of when their window was read.
+    """
+    last_id = ""
+    while True:
+        query = select(*EXPORT_COLUMNS).where(Bill.id > last_id)
+        if jurisdiction:
+            query = query.where(Bill.jurisdiction_id == jurisdiction)
+        if session:
+            query = query.where(Bill.session == session)
+        if since:
+            query = query.where(Bill.updated_at >= since)
+        query = query.order_by(Bill.id).limit(window).execution_options(stream_results=True, yield_per=batch_size)
+
+        read = 0
+        db = SessionLocal()
+        try:
+            for partition in db.execute(query).partitions():
+                rows = [dict(row._mapping) for row in partition]
+                keywords = _keywords(db, [row["id"] for row in rows])
+                for row in rows:
+                    row["keywords"] = keywords.get(row["id"], [])
+                read += len(rows)
+                last_id = rows[-1]["id"]
+                yield rows
+        finally:
+            db.close()
+        if read < window:
+            return
+
+
+def _keywords(db, bill_ids: List[str]) -> Dict[str, List[str]]:
+    """Keyword names of each bill in a batch, from one indexed query"""
+    keywords: Dict[str, List[str]] = {}
+    rows = db.execute(
+        select(bill_keyword.c.bill_id, Keyword.name)
+        .join(Keyword, Keyword.id == bill_keyword.c.keyword_id)
+        .where(bill_keyword.c.bill_id.in_(bill_ids))
+    )
+    for bill_id, name in rows:
+        keywords.setdefault(bill_id, []).append(name)
+    return keywords
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def jsonl_gzip(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """gzip-compressed JSON lines, one compressed chunk per batch"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip header and trailer
+    for rows in batches:
+        data = "".join(json.dumps(row, default=_json_default) + "\n" for row in rows).encode()
+        EXPORT_ROWS.inc(len(rows), format="jsonl")
+        chunk = compressor.compress(data)
+        if chunk:
+            yield chunk
+    yield compressor.flush()
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ExportUnavailable("Parquet export requires pyarrow (pip install -r requirements-parquet.txt)") from e
+    return pyarrow, pyarrow.parquet
+
+
+class _ChunkSink:
+    """Writable file that keeps what the Parquet writer writes until it is taken"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def writable(self) -> bool:
+        return True
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def parquet(batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """A Parquet file written one row group per batch
+
+    Lists of strings stay lists; actions, documents, votes and versions are
+    nested JSON of varying shape, so they are stored as JSON strings.
+    """
+    pa, pq = _pyarrow()
+    strings = pa.list_(pa.string())
+    schema = pa.schema([
+        ("id", pa.string()), ("identifier", pa.string()), ("title", pa.string()),
+        ("classification", strings), ("subject", strings), ("abstract", pa.string()), ("session", pa.string()),
+        ("jurisdiction_id", pa.string()), ("jurisdiction_name", pa.string()),
+        ("primary_sponsor_id", pa.string()), ("primary_sponsor_name", pa.string()),
+        ("actions", pa.string()), ("documents", pa.string()), ("votes", pa.string()), ("versions", pa.string()),
+        ("updated_at", pa.timestamp("us")), ("summary", pa.string()), ("ai_analysis", pa.string()),
+        ("keywords", strings),
+    ])
+    nested = ("actions", "documents", "votes", "versions")
+
+    def encode():
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression="zstd")
+        for rows in batches:
+            for row in rows:
+                for column in nested:
+                    row[column] = json.dumps(row[column], default=_json_default)
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            EXPORT_ROWS.inc(len(rows), format="parquet")
+            chunk = sink.take()
+            if chunk:
+                yield chunk
+        writer.close()
+        yield sink.take()
+
+    return encode()
+
+
+def encode(format: str, batches: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Encoded export chunks; raises ExportUnavailable right away if the format can't be written"""
+    if format == "parquet":
+        return parquet(batches)
+    if format == "jsonl":
+        return jsonl_gzip(batches)
+    raise ValueError(f"Unknown export format {format!r}; expected {' or '.join(FORMATS)}")
@@ -0,0 +1,29 @@
+import re
+from typing import Optional
+
+# A bill identifier is a short chamber/type prefix followed by a number,
+# e.g. "HB 123", "H.B. 123", "hb123", "H.R. 1", "SJR 4", "AB 1234"
+_IDENTIFIER_RE = re.compile(r"^\s*((?:[A-Za-z]\s*\.?\s*){1,5})\s*-?\s*0*(\d{1,6})\s*$")
+
+
+def normalize_identifier(identifier: Optional[str]) -> Optional[str]:
+    """Map any common spelling of a bill identifier to one canonical key
+
+    "HB 123", "H.B. 123", "hb123" and "HB0123" all normalize to "HB123".
+    Identifiers that don't look like prefix + number are uppercased with
+    punctuation and whitespace stripped, so they still compare exactly.
+    """
+    if not identifier:
+        return None
+
+    match = _IDENTIFIER_RE.match(identifier)
+    if match:
+        prefix = re.sub(r"[^A-Za-z]", "", match.group(1)).upper()
+        return f"{prefix}{int(match.group(2))}"
+
+    return re.sub(r"[^A-Za-z0-9]", "", identifier).upper() or None
+
+
+def looks_like_identifier(query: str) -> bool:
+    """Whether a search query is shaped like a bill identifier"""
+    return bool(query) and _IDENTIFIER_RE.match(query) is not None
@@ -0,0 +1,201 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.database.connection import SessionLocal
+from app.database.models import Jurisdiction
+from app.services.cache import cache_backend
+from app.services.openstates import openstates_service
+
+logger = logging.getLogger(__name__)
+
+# How long stored jurisdiction and session metadata is used before it is fetched again
+JURISDICTION_TTL = int(os.getenv("JURISDICTION_TTL", "86400"))
+# How often each process re-reads the stored metadata, picking up another process's refresh
+JURISDICTION_RELOAD_INTERVAL = float(os.getenv("JURISDICTION_RELOAD_INTERVAL", "300"))
+
+# Lease held by the process fetching from OpenStates, so workers don't all refresh at once
+REFRESH_LEASE = "jurisdiction-refresh"
+# Seconds before a failed background refresh is tried again
+REFRESH_RETRY_SECONDS = 60
+
+# "state:ca", "territory:pr", "district:dc", or "country:us" at the end of a jurisdiction ID
+_ABBREVIATION = re.compile(r"/(?:state|territory|district):([a-z]+)/government$|/country:([a-z]+)/government$")
+
+
+def abbreviation(jurisdiction_id: str) -> Optional[str]:
+    """Short code of a jurisdiction, e.g. "ca" or "us", as accepted by the bills search"""
+    match = _ABBREVIATION.search(jurisdiction_id or "")
+    return (match.group(1) or match.group(2)) if match else None
+
+
+def session_active(session: Dict[str, Any], today: Optional[str] = None) -> bool:
+    """Whether a legislative session is under way: its own `active` flag, or else its dates
+
+    A session without a start date isn't counted as active; if no session of a
+    jurisdiction is, active_session_ids falls back to the latest one.
+    """
+    if "active" in session:
+        return bool(session["active"])
+    start = (session.get("start_date") or "")[:10]
+    if not start:
+        return False
+    today = today or date.today().isoformat()
+    end = (session.get("end_date") or "")[:10]
+    return start <= today and (not end or end >= today)
+
+
+def active_session_ids(sessions: List[Dict[str, Any]]) -> List[str]:
+    """Identifiers of the active sessions, or of the latest session if none is active
+
+    The latest is the one with the latest start date; OpenStates lists
+    sessions oldest first, so among equally dated ones it is the last listed.
+    """
+    active = [session["identifier"] for session in sessions if session_active(session)]
+    if active or not sessions:
+        return active
+    position = max(range(len(sessions)), key=lambda i: (sessions[i].get("start_date") or "", i))
+    return [sessions[position]["identifier"]]
+
+
+class JurisdictionMetadata:
+    """Jurisdictions and their legislative sessions, stored in the database and served from memory
+
+    The table is filled from OpenStates when it is empty or older than
+    JURISDICTION_TTL, by one process at a time. Each process keeps a copy in
+    memory and re-reads the table every JURISDICTION_RELOAD_INTERVAL seconds,
+    so lookups don't touch the database and never call OpenStates.
+    """
+
+    def __init__(self, ttl: float = JURISDICTION_TTL, reload_interval: float = JURISDICTION_RELOAD_INTERVAL):
+        self.ttl = ttl
+        self.reload_interval = reload_interval
+        self._jurisdictions: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Optional[datetime] = None
+        self._loaded = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._jurisdictions)
+
+    def load(self, db: Session):
+        """Replace the in-memory copy with the stored metadata"""
+        rows = db.query(Jurisdiction).order_by(Jurisdiction.name).all()
+        jurisdictions = []
+        by_key = {}
+        for row in rows:
+            sessions = [
+                {**session, "active": session_active(session)} for session in row.sessions or []
+            ]
+            jurisdiction = {
+                "id": row.id,
+                "name": row.name,
+                "classification": row.classification,
+                "abbreviation": abbreviation(row.id),
+                "url": row.url,
+                "sessions": sessions,
+                "active_sessions": active_session_ids(row.sessions or []),
+            }
+            jurisdictions.append(jurisdiction)
+            for key in (row.id, row.name, jurisdiction["abbreviation"]):
+                if key:
+                    by_key[key.lower()] = jurisdiction
+        with self._lock:
+            self._jurisdictions = jurisdictions
+            self._by_key = by_key
+            self._fetched_at = max((row.fetched_at for row in rows if row.fetched_at), default=None)
+            self._loaded = time.monotonic()
+
+    def stale(self) -> bool:
+        """Whether the stored metadata is missing or older than the TTL"""
+        return self._fetched_at is None or datetime.utcnow() - self._fetched_at > timedelta(seconds=self.ttl)
+
+    def fetch(self, db: Session) -> bool:
+        """Fetch every jurisdiction from OpenStates, store them and reload; False if another process is fetching"""
+        if not cache_backend.acquire(REFRESH_LEASE, 120):
+            return False
+        try:
+            fetched_at = datetime.utcnow()
+            for data in openstates_service.get_jurisdictions():
+                db.merge(Jurisdiction(
+                    id=data["id"],
+                    name=data.get("name", ""),
+                    classification=data.get("classification", ""),
+                    url=data.get("url"),
+                    sessions=data.get("legislative_sessions") or data.get("sessions") or [],
+                    fetched_at=fetched_at,
+                ))
+            db.commit()
+        finally:
+            cache_backend.release(REFRESH_LEASE)
+        self.load(db)
+        logger.info("jurisdictions_refreshed count=%d", len(self))
+        return True
+
+    def ensure(self, db: Session, background: bool = True):
+        """Reload from the table when due, and refresh from OpenStates when the metadata is stale
+
+        With nothing stored yet, the first caller fetches and waits, raising
+        if OpenStates is unavailable. Otherwise the stale copy keeps being
+        served while a background thread refreshes it, or, with
+        `background=False`, the caller refreshes it before continuing.
+        """
+        if time.monotonic() - self._loaded >= self.reload_interval or not self._jurisdictions:
+            self.load(db)
+        if not self.stale():
+            return
+        if not self._jurisdictions or not background:
+            with self._refreshing:
+                if self.stale():
+                    self.fetch(db)
+                    if not self._jurisdictions:
+                        # Another process holds the lease; its rows appear on the next reload
+                        self._loaded = 0.0
+            return
+        if time.monotonic() >= self._retry_at and self._refreshing.acquire(blocking=False):
+            threading.Thread(target=self._refresh_in_background, name="jurisdiction-refresh", daemon=True).start()
+
+    def _refresh_in_background(self):
+        db = SessionLocal()
+        try:
+            self.fetch(db)
+        except Exception as e:
+            logger.warning("jurisdiction_refresh_failed error=%s", e)
+            self._retry_at = time.monotonic() + REFRESH_RETRY_SECONDS
+        finally:
+            db.close()
+            self._refreshing.release()
+
+    def all(self, classification: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Every jurisdiction, by name, optionally only those of one classification (e.g. state)"""
+        jurisdictions = self._jurisdictions
+        if classification:
+            jurisdictions = [j for j in jurisdictions if j["classification"] == classification]
+        return jurisdictions
+
+    def find(self, key: str) -> Optional[Dict[str, Any]]:
+        """A jurisdiction by ID, name or abbreviation, ignoring case"""
+        return self._by_key.get((key or "").lower())
+
+    def active_sessions(self, key: str) -> List[str]:
+        """Identifiers of a jurisdiction's active sessions; empty if it isn't known"""
+        jurisdiction = self.find(key)
+        return list(jurisdiction["active_sessions"]) if jurisdiction else []
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "count": len(self),
+            "fetched_at": self._fetched_at.isoformat() if self._fetched_at else None,
+            "stale": self.stale(),
+        }
+
+
+# Create a singleton instance
+jurisdiction_metadata = JurisdictionMetadata()
@@ -1,21 +1,108 @@
 import os
+import random
+import logging
 import requests
-from typing import Dict, List, Optional, Any
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Any, Tuple
 from app.models.bill import BillCreate, BillSearchParams
+from app.services.metrics import track_upstream
+from app.services.tracing import traced, start_span, KIND_CLIENT
+from app.services.cassette import openstates_cassette, CassetteMiss
+from app.services.resilience import (
+    openstates_breaker, document_breakers, upstream_timeout, OPENSTATES_CONNECT_TIMEOUT, OPENSTATES_READ_TIMEOUT,
+    DOCUMENT_CONNECT_TIMEOUT, DOCUMENT_READ_TIMEOUT, CircuitBreaker
+)
+
+logger = logging.getLogger(__name__)
+
+# Fraction of successful responses logged (at DEBUG) with a preview of the body
+LOG_SAMPLE_RATE = float(os.getenv("OPENSTATES_LOG_SAMPLE_RATE", "0.01"))
+
+
+# Sections of a bill that the v3 API only returns when asked for
+BILL_INCLUDES = ["sponsorships", "abstracts", "actions", "documents", "versions", "votes"]
+
+
+def bill_versions(bill_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """A bill's versions, oldest first; versions without a date keep their listed order"""
+    versions = bill_data.get("versions") or []
+    if versions and "date" in versions[0]:
+        versions = sorted(versions, key=lambda v: v.get("date") or "")
+    return versions
+
+
+def version_url(version: Dict[str, Any]) -> Optional[str]:
+    """Where a version's text can be downloaded, from `url` or its first link"""
+    if version.get("url"):
+        return version["url"]
+    links = version.get("links") or []
+    return links[0].get("url") if links else None
 
 
 class OpenStatesService:
     """Service for interacting with the OpenStates API"""
     
     def __init__(self):
-        """Initialize the OpenStates API client with API key from environment"""
+        """Read the API key from environment; it is only required once a request is made"""
         self.api_key = os.getenv("OPENSTATES_API_KEY")
+        self.base_url = os.getenv("OPENSTATES_BASE_URL", "https://v3.openstates.org").rstrip("/")
+    
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Authentication headers for API requests"""
         if not self.api_key:
             raise ValueError("OPENSTATES_API_KEY environment variable is not set")
-        
-        self.base_url = "https://v3.openstates.org"
-        self.headers = {"X-API-KEY": self.api_key}
+        return {"X-API-KEY": self.api_key}
+    
+    def _get(self, url: str, breaker: Optional[CircuitBreaker] = None,
+             timeout: Tuple[float, float] = (OPENSTATES_CONNECT_TIMEOUT, OPENSTATES_READ_TIMEOUT),
+             **kwargs) -> requests.Response:
+        """GET within the request deadline and a circuit breaker, by default OpenStates'
+
+        Goes through the record/replay cassette when it is enabled. Connection
+        errors, timeouts, 429s and 5xx responses count as breaker failures; a
+        replay miss never reached the upstream, so it doesn't count either way.
+        """
+        breaker = breaker or openstates_breaker
+        kwargs["timeout"] = upstream_timeout(*timeout)
+        breaker.before_call()
+        try:
+            if openstates_cassette.enabled:
+                response = openstates_cassette.get(url, **kwargs)
+            else:
+                response = requests.get(url, **kwargs)
+        except CassetteMiss:
+            breaker.release_trial()
+            raise
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+    
+    def _log_response(self, operation: str, response: requests.Response, params: Optional[Dict[str, Any]] = None):
+        """Log an upstream response without formatting its body on the hot path
+
+        Errors are always logged with their status; successful responses are
+        sampled, and the body preview is only built when DEBUG is enabled.
+        """
+        elapsed_ms = response.elapsed.total_seconds() * 1000 if response.elapsed else 0.0
+        if response.status_code >= 400:
+            logger.warning(
+                "openstates_error operation=%s status=%s elapsed_ms=%.1f params=%s body=%.300s",
+                operation, response.status_code, elapsed_ms, params, response.text
+            )
+        elif logger.isEnabledFor(logging.DEBUG) and random.random() < LOG_SAMPLE_RATE:
+            logger.debug(
+                "openstates_response operation=%s status=%s elapsed_ms=%.1f bytes=%s params=%s body=%.500s",
+                operation, response.status_code, elapsed_ms, len(response.content), params, response.text
+            )
     
+    @traced("openstates.search_bills", KIND_CLIENT)
     def search_bills(self, params: BillSearchParams) -> Dict[str, Any]:
         """Search for bills based on the provided parameters"""
         # For OpenStates API v3, the correct endpoint is /bills
@@ -37,67 +124,103 @@ class OpenStatesService:
         query_params["page"] = params.page
         query_params["per_page"] = params.per_page
         
-        # Print the request URL and parameters for debugging
-        print(f"Request URL: {url}")
-        print(f"Request params: {query_params}")
-        
         # Make the API request with the API key in the header
-        headers = {"X-API-KEY": self.api_key}
-        response = requests.get(url, headers=headers, params=query_params)
-        
-        # Print response status and content for debugging
-        print(f"Response status: {response.status_code}")
-        if response.status_code != 200:
-            print(f"Response error: {response.text}")
-        else:
-            print(f"Response content: {response.text[:500]}...")
-        
-        response.raise_for_status()  # Raise exception for HTTP errors
+        headers = self.headers
+        with track_upstream("openstates", "search_bills"):
+            response = self._get(url, headers=headers, params=query_params)
+            self._log_response("search_bills", response, query_params)
+            response.raise_for_status()  # Raise exception for HTTP errors
         
         return response.json()
     
+    @traced("openstates.get_bill", KIND_CLIENT)
     def get_bill(self, bill_id: str) -> Dict[str, Any]:
         """Get a specific bill by ID"""
         url = f"{self.base_url}/bills/{bill_id}"
         
-        response = requests.get(url, headers=self.headers)
-        response.raise_for_status()
+        with track_upstream("openstates", "get_bill"):
+            response = self._get(url, headers=self.headers, params={"include": BILL_INCLUDES})
+            self._log_response("get_bill", response)
+            response.raise_for_status()
         
         return response.json()
     
-    def get_bill_text(self, bill_id: str) -> str:
-        """Get the full text of a bill"""
+    @traced("openstates.get_jurisdictions", KIND_CLIENT)
+    def get_jurisdictions(self) -> List[Dict[str, Any]]:
+        """Every jurisdiction with its legislative sessions, following pagination"""
+        url = f"{self.base_url}/jurisdictions"
+        jurisdictions = []
+        page = 1
+        while True:
+            query_params = {"include": "legislative_sessions", "page": page, "per_page": 52}
+            with track_upstream("openstates", "get_jurisdictions"):
+                response = self._get(url, headers=self.headers, params=query_params)
+                self._log_response("get_jurisdictions", response, query_params)
+                response.raise_for_status()
+
+            data = response.json()
+            jurisdictions.extend(data.get("results", []))
+            if page >= data.get("pagination", {}).get("max_page", 1):
+                return jurisdictions
+            page += 1
+
+    @traced("openstates.get_bill_text")
+    def get_bill_text(self, bill_id: str, bill_data: Optional[Dict[str, Any]] = None) -> str:
+        """Get the full text of a bill, from `bill_data` if its details were already fetched"""
         # First get the bill details to find the latest version URL
-        bill_data = self.get_bill(bill_id)
+        if bill_data is None:
+            bill_data = self.get_bill(bill_id)
         
         # Find the latest version
-        versions = bill_data.get("versions", [])
+        versions = bill_versions(bill_data)
         if not versions:
             return "Bill text not available"
         
-        # Sort versions by date (if available) and get the latest
-        if "date" in versions[0]:
-            versions.sort(key=lambda v: v.get("date", ""), reverse=True)
-        
         # Get the URL of the latest version
-        latest_version_url = versions[0].get("url")
+        latest_version_url = version_url(versions[-1])
         if not latest_version_url:
             return "Bill text URL not available"
         
-        # Fetch the bill text
-        response = requests.get(latest_version_url)
-        response.raise_for_status()
+        return self.get_document(latest_version_url, "get_bill_text")
+    
+    def get_document(self, url: str, operation: str = "get_document") -> str:
+        """Download the text of a bill version or document
+
+        Documents are served by legislature sites, so each host has its own
+        breaker and timeouts, and a slow state site doesn't fail OpenStates calls.
+        """
+        breaker = document_breakers.get(urlsplit(url).netloc)
+        with track_upstream("openstates", operation), \
+                start_span("download bill text", KIND_CLIENT, **{"http.url": url}) as span:
+            response = self._get(url, breaker, (DOCUMENT_CONNECT_TIMEOUT, DOCUMENT_READ_TIMEOUT))
+            self._log_response(operation, response)
+            if span is not None:
+                span.set_attribute("http.response_content_length", len(response.content))
+            response.raise_for_status()
         
         # Return the text content
         return response.text
     
+    @traced("openstates.transform_bill_data")
     def transform_bill_data(self, data: Dict[str, Any]) -> BillCreate:
         """Transform API response into our internal bill model"""
-        # Extract the primary sponsor if available
+        # Extract every sponsor; v3 returns "sponsorships" with an optional linked person.
+        # A sponsorship's own ID is per bill, so unlinked sponsors are left without one and keyed by name
+        sponsors = []
+        for sponsor in data.get("sponsorships") or data.get("sponsors") or []:
+            person = sponsor.get("person") or {}
+            sponsors.append({
+                "name": sponsor.get("name") or person.get("name", ""),
+                "id": person.get("id") or None,
+                "classification": sponsor.get("classification"),
+                "primary": bool(sponsor.get("primary")),
+            })
+        
+        # The primary sponsor is the first one marked primary, or else the first listed
         primary_sponsor = None
-        if data.get("sponsors") and len(data["sponsors"]) > 0:
-            sponsor = data["sponsors"][0]
-            primary_sponsor = {"name": sponsor.get("name", ""), "id": sponsor.get("id", "")}
+        if sponsors:
+            sponsor = next((s for s in sponsors if s["primary"]), sponsors[0])
+            primary_sponsor = {"name": sponsor["name"], "id": sponsor["id"] or ""}
         
         # Create the bill object
         bill = BillCreate(
@@ -113,6 +236,7 @@ class OpenStatesService:
                 "id": data.get("jurisdiction", {}).get("id", ""),
             },
             primary_sponsor=primary_sponsor,
+            sponsors=sponsors,
             actions=data.get("actions", []),
             documents=data.get("documents", []),
             votes=data.get("votes", []),
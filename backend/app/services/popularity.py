@@ -0,0 +1,220 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from app.database.connection import SessionLocal
+from app.database.models import Bill
+from app.services.admission import BATCH
+from app.services.bill_content import get_bill_text, get_bill_analysis
+from app.services.cache import bill_text_cache, analysis_cache, cache_backend
+from app.services.metrics import Counter
+from app.services.resilience import UPSTREAM_UNAVAILABLE
+
+logger = logging.getLogger(__name__)
+
+# Bills tracked by the top-K sketch, and how quickly their access counts fade
+POPULARITY_CAPACITY = int(os.getenv("POPULARITY_CAPACITY", "1000"))
+POPULARITY_HALF_LIFE = float(os.getenv("POPULARITY_HALF_LIFE", "3600"))
+
+# Seconds between warming passes; 0 disables the warmer
+CACHE_WARM_INTERVAL = float(os.getenv("CACHE_WARM_INTERVAL", "300"))
+# Each pass covers the hottest bills and the most recently updated stored bills
+CACHE_WARM_TOP_BILLS = int(os.getenv("CACHE_WARM_TOP_BILLS", "20"))
+CACHE_WARM_RECENT_BILLS = int(os.getenv("CACHE_WARM_RECENT_BILLS", "10"))
+# Budget per pass: Claude analyses generated, and wall-clock seconds spent
+CACHE_WARM_MAX_ANALYSES = int(os.getenv("CACHE_WARM_MAX_ANALYSES", "5"))
+CACHE_WARM_MAX_SECONDS = float(os.getenv("CACHE_WARM_MAX_SECONDS", "60"))
+
+CACHE_WARMED = Counter(
+    "legispal_cache_warmed_total", "Cache entries filled ahead of requests by the warmer", ["cache", "result"]
+)
+
+
+class PopularityTracker:
+    """Decaying top-K access counts (Space-Saving with exponential decay)
+
+    Each access adds a weight that doubles every `half_life` seconds, which is
+    the same as every earlier count halving, without touching old entries.
+    When the table is full, a new bill replaces the least popular one and
+    inherits its count, so a bill's count can be overestimated by at most the
+    evicted count but a genuinely hot bill is never missed.
+
+    The least popular bill is found with a min-heap holding one entry per
+    tracked bill. Counts only grow, so an entry is a lower bound that is
+    brought up to date only when it reaches the top, and an eviction costs
+    O(log capacity) amortized rather than a scan of the table.
+    """
+
+    def __init__(self, capacity: int = POPULARITY_CAPACITY, half_life: float = POPULARITY_HALF_LIFE):
+        self.capacity = capacity
+        self.half_life = half_life
+        self._counts: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._epoch = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _scale(self, now: float) -> float:
+        return 2.0 ** ((now - self._epoch) / self.half_life)
+
+    def record(self, bill_id: str, weight: float = 1.0):
+        """Count one access to a bill"""
+        if self.capacity <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            scale = self._scale(now)
+            if scale > 2.0 ** 32:
+                # Rebase before the weights overflow
+                self._counts = {key: count / scale for key, count in self._counts.items()}
+                self._heap = [(count, key) for key, count in self._counts.items()]
+                heapq.heapify(self._heap)
+                self._epoch, scale = now, 1.0
+            if bill_id in self._counts:
+                self._counts[bill_id] += weight * scale
+            elif len(self._counts) < self.capacity:
+                self._counts[bill_id] = weight * scale
+                heapq.heappush(self._heap, (weight * scale, bill_id))
+            else:
+                victim = self._pop_least()
+                self._counts[bill_id] = self._counts.pop(victim) + weight * scale
+                heapq.heappush(self._heap, (self._counts[bill_id], bill_id))
+
+    def _pop_least(self) -> str:
+        """Remove and return the tracked bill with the lowest count; the caller holds the lock"""
+        while True:
+            count, bill_id = self._heap[0]
+            current = self._counts[bill_id]
+            if count == current:
+                heapq.heappop(self._heap)
+                return bill_id
+            # Stale entry: the bill was accessed since it was pushed
+            heapq.heapreplace(self._heap, (current, bill_id))
+
+    def top(self, n: int) -> List[Tuple[str, float]]:
+        """The `n` most accessed bills with their decayed access counts, highest first"""
+        with self._lock:
+            scale = self._scale(time.monotonic())
+            hottest = heapq.nlargest(n, self._counts.items(), key=lambda item: item[1])
+        return [(bill_id, count / scale) for bill_id, count in hottest]
+
+
+class CacheWarmer:
+    """Background thread that fills the text and analysis caches for likely requests
+
+    Each pass takes the hottest bills, then the most recently updated stored
+    bills, and fetches whatever isn't already cached, within a per-pass budget
+    of Claude analyses and seconds. Analyses run at batch priority, so they
+    never hold up interactive Claude calls. A pass stops early once OpenStates
+    or Claude is unavailable or overloaded. When the caches are shared between
+    workers, only one worker at a time runs a pass.
+    """
+
+    def __init__(self, tracker: PopularityTracker, interval: float = CACHE_WARM_INTERVAL,
+                 top_bills: int = CACHE_WARM_TOP_BILLS, recent_bills: int = CACHE_WARM_RECENT_BILLS,
+                 max_analyses: int = CACHE_WARM_MAX_ANALYSES, max_seconds: float = CACHE_WARM_MAX_SECONDS):
+        self.tracker = tracker
+        self.interval = interval
+        self.top_bills = top_bills
+        self.recent_bills = recent_bills
+        self.max_analyses = max_analyses
+        self.max_seconds = max_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_pass: Optional[Dict[str, Any]] = None
+
+    def candidates(self) -> List[str]:
+        """Bills to warm, hottest first, then recently updated ones"""
+        bill_ids = [bill_id for bill_id, _ in self.tracker.top(self.top_bills)]
+        if self.recent_bills > 0:
+            db = SessionLocal()
+            try:
+                bill_ids += [bill_id for (bill_id,) in
+                             db.query(Bill.id).order_by(Bill.updated_at.desc()).limit(self.recent_bills)]
+            finally:
+                db.close()
+        return list(dict.fromkeys(bill_ids))
+
+    def warm_once(self) -> Dict[str, Any]:
+        """Run one warming pass and report what it did"""
+        started = time.monotonic()
+        result = {"candidates": 0, "texts": 0, "analyses": 0, "errors": 0, "stopped": None}
+        if not cache_backend.acquire("cache-warmer", self.max_seconds):
+            result["stopped"] = "another worker is warming"
+            result["seconds"] = 0.0
+            self.last_pass = result
+            return result
+        try:
+            self._warm(result, started)
+        finally:
+            cache_backend.release("cache-warmer")
+        result["seconds"] = round(time.monotonic() - started, 2)
+        self.last_pass = result
+        return result
+
+    def _warm(self, result: Dict[str, Any], started: float):
+        bill_ids = self.candidates()
+        result["candidates"] = len(bill_ids)
+        for bill_id in bill_ids:
+            if self._stop.is_set():
+                result["stopped"] = "shutdown"
+                break
+            if time.monotonic() - started > self.max_seconds:
+                result["stopped"] = "time budget"
+                break
+            step = "bill_text"
+            try:
+                if bill_id not in bill_text_cache:
+                    get_bill_text(bill_id)
+                    result["texts"] += 1
+                    CACHE_WARMED.inc(cache=step, result="filled")
+                step = "bill_analysis"
+                if bill_id not in analysis_cache and result["analyses"] < self.max_analyses:
+                    get_bill_analysis(bill_id, BATCH)
+                    result["analyses"] += 1
+                    CACHE_WARMED.inc(cache=step, result="filled")
+            except UPSTREAM_UNAVAILABLE as e:
+                logger.info("cache_warm_stopped error=%s", e)
+                result["stopped"] = "upstream unavailable"
+                break
+            except Exception as e:
+                logger.warning("cache_warm_error bill_id=%s error=%s", bill_id, e)
+                result["errors"] += 1
+                CACHE_WARMED.inc(cache=step, result="error")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                result = self.warm_once()
+                logger.info("cache_warm_pass %s", " ".join(f"{key}={value}" for key, value in result.items()))
+            except Exception as e:
+                logger.warning("cache_warm_failed error=%s", e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start warming in the background, beginning with a pass right away"""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._thread is not None,
+            "interval": self.interval,
+            "last_pass": self.last_pass,
+            "hottest": [{"id": bill_id, "score": round(score, 2)} for bill_id, score in self.tracker.top(10)],
+        }
+
+
+# Create singleton instances
+popularity = PopularityTracker()
+cache_warmer = CacheWarmer(popularity)
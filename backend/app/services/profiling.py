@@ -0,0 +1,292 @@
+import asyncio
+import cProfile
+import functools
+import hmac
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+# Where profiles are written and how many are kept before the oldest are removed
+PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+# Shared secret for the X-Admin-Token header; profiling and /api/admin are disabled without it
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+MODES = ("cprofile", "sample")
+EXTENSIONS = {"cprofile": "pstats", "sample": "collapsed"}
+
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Whether `token` is the ADMIN_TOKEN, compared in constant time"""
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+# Profiles of the current request's sync endpoint calls, collected from worker threads in cprofile mode
+_thread_profiles: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("thread_profiles", default=None)
+
+
+class _StackSampler:
+    """Sample every thread's Python stack at a fixed interval into collapsed-stack counts"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def write(self, path: str):
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class _ProfiledCoroutine:
+    """Await a coroutine with the profiler enabled only while that coroutine is running
+
+    Other requests interleaved on the event loop run with the profiler off, so
+    they stay out of this request's profile.
+    """
+
+    def __init__(self, coroutine, profile: cProfile.Profile):
+        self.coroutine = coroutine
+        self.profile = profile
+
+    def __await__(self):
+        step, value = self.coroutine.send, None
+        while True:
+            self.profile.enable()
+            try:
+                signal = step(value)
+            except StopIteration as done:
+                return done.value
+            finally:
+                self.profile.disable()
+            try:
+                value = yield signal
+                step = self.coroutine.send
+            except BaseException as error:
+                step, value = self.coroutine.throw, error
+
+
+def _profiled_in_thread(function):
+    """Wrap a sync endpoint so that, in a request profiled with cProfile, its worker thread is profiled too"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profiles = _thread_profiles.get()
+        if profiles is None:
+            return function(*args, **kwargs)
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            profile.disable()
+            profiles.append(profile)
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Route class for the API routers: lets cprofile mode follow sync endpoints into the threadpool
+
+    FastAPI runs sync endpoints in worker threads, which a profiler enabled on
+    the event loop doesn't see. Outside a profiled request the wrapper only
+    reads a context variable.
+    """
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        if not asyncio.iscoroutinefunction(endpoint):
+            endpoint = _profiled_in_thread(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+class RequestProfiler:
+    """Opt-in profiler for individual requests
+
+    A request is profiled when it carries `X-Profile: cprofile|sample` together
+    with a valid admin token, or while an admin has armed the profiler for the
+    next N requests under a path prefix. cProfile output (pstats) covers only
+    this request: its steps on the event loop, and the sync endpoint of a
+    ProfiledRoute in its worker thread. The
+    sampler writes collapsed stacks for every thread, including other requests
+    running at the same time. Only one request is profiled at a time.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self.armed_remaining = 0
+        self.armed_prefix = "/"
+        self.armed_mode = "cprofile"
+        self._busy = threading.Lock()
+        self._lock = threading.Lock()
+
+    def arm(self, count: int, path_prefix: str = "/", mode: str = "cprofile"):
+        """Profile the next `count` requests whose path starts with `path_prefix`"""
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        with self._lock:
+            self.armed_prefix = path_prefix or "/"
+            self.armed_mode = mode
+            self.armed_remaining = max(0, count)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "armed_remaining": self.armed_remaining,
+            "path_prefix": self.armed_prefix,
+            "mode": self.armed_mode,
+            "directory": self.directory,
+        }
+
+    def take_armed(self, path: str) -> Optional[str]:
+        """Consume one armed slot for this path, returning the mode to use"""
+        with self._lock:
+            if self.armed_remaining > 0 and path.startswith(self.armed_prefix):
+                self.armed_remaining -= 1
+                return self.armed_mode
+        return None
+
+    def _path_for(self, method: str, path: str, mode: str) -> str:
+        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        slug = _SAFE_NAME_RE.sub("_", path.strip("/"))[:80] or "root"
+        return os.path.join(self.directory, f"{stamp}-{method}-{slug}.{EXTENSIONS[mode]}")
+
+    async def profile(self, mode: str, scope, call):
+        """Run `call()` under the requested profiler and save the result"""
+        if not self._busy.acquire(blocking=False):
+            # Another request is being profiled; serve this one normally
+            await call()
+            return
+
+        try:
+            started = time.perf_counter()
+            if mode == "sample":
+                sampler = _StackSampler()
+                sampler.start()
+                try:
+                    await call()
+                finally:
+                    sampler.stop()
+                    self._save(scope, mode, sampler.write)
+            else:
+                profile = cProfile.Profile()
+                thread_profiles: List[cProfile.Profile] = []
+                token = _thread_profiles.set(thread_profiles)
+                try:
+                    await _ProfiledCoroutine(call(), profile)
+                finally:
+                    _thread_profiles.reset(token)
+                    stats = pstats.Stats(profile)
+                    for thread_profile in thread_profiles:
+                        stats.add(thread_profile)
+                    self._save(scope, mode, stats.dump_stats)
+            logger.info("request_profiled method=%s path=%s mode=%s seconds=%.3f",
+                        scope["method"], scope["path"], mode, time.perf_counter() - started)
+        finally:
+            self._busy.release()
+
+    def _save(self, scope, mode: str, writer):
+        os.makedirs(self.directory, exist_ok=True)
+        writer(self._path_for(scope["method"], scope["path"], mode))
+        self._prune()
+
+    def _prune(self):
+        files = sorted(self.list_profiles(), key=lambda p: p["created_at"])
+        for old in files[:max(0, len(files) - self.max_files)]:
+            os.remove(os.path.join(self.directory, old["name"]))
+
+    def list_profiles(self) -> List[Dict[str, Any]]:
+        """Saved profiles, newest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.rsplit(".", 1)[-1] in EXTENSIONS.values():
+                stat = entry.stat()
+                profiles.append({
+                    "name": entry.name,
+                    "size": stat.st_size,
+                    "created_at": datetime.utcfromtimestamp(stat.st_mtime).isoformat(),
+                })
+        profiles.sort(key=lambda p: p["created_at"], reverse=True)
+        return profiles
+
+    def profile_path(self, name: str) -> Optional[str]:
+        """Absolute path of a saved profile, or None if it does not exist"""
+        if name != os.path.basename(name) or _SAFE_NAME_RE.search(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that hands selected requests to the request profiler
+
+    Only installed when ADMIN_TOKEN is set, so unprofiled deployments pay nothing.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler = None):
+        self.app = app
+        self.profiler = profiler or request_profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        mode = None
+        headers = dict(scope.get("headers", []))
+        requested = headers.get(b"x-profile")
+        if requested is not None and is_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            mode = requested.decode("latin-1").strip().lower()
+            mode = mode if mode in MODES else "cprofile"
+        elif self.profiler.armed_remaining:
+            mode = self.profiler.take_armed(scope["path"])
+
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def call():
+            await self.app(scope, receive, send)
+
+        await self.profiler.profile(mode, scope, call)
+
+
+# Create a singleton instance
+request_profiler = RequestProfiler()
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+import requests
+from app.services.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Per-dependency timeouts in seconds
+OPENSTATES_CONNECT_TIMEOUT = float(os.getenv("OPENSTATES_CONNECT_TIMEOUT", "3"))
+OPENSTATES_READ_TIMEOUT = float(os.getenv("OPENSTATES_READ_TIMEOUT", "10"))
+CLAUDE_TIMEOUT = float(os.getenv("CLAUDE_TIMEOUT", "120"))
+# Bill text downloads, served by each state legislature's own site rather than OpenStates
+DOCUMENT_CONNECT_TIMEOUT = float(os.getenv("DOCUMENT_CONNECT_TIMEOUT", "5"))
+DOCUMENT_READ_TIMEOUT = float(os.getenv("DOCUMENT_READ_TIMEOUT", "20"))
+# Total time budget for an API request, covering database work and any upstream fallback
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "15"))
+# Consecutive failures that open a breaker, and how long it stays open before a trial call
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RECOVERY_SECONDS = float(os.getenv("BREAKER_RECOVERY_SECONDS", "30"))
+
+CIRCUIT_REJECTIONS = Counter(
+    "legispal_circuit_rejections_total", "Upstream calls rejected by an open circuit breaker", ["service"]
+)
+CIRCUIT_OPENED = Counter(
+    "legispal_circuit_opened_total", "Times a circuit breaker opened", ["service"]
+)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"{service} is unavailable (circuit open); retry in {retry_after:.0f}s")
+        self.service = service
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request has no time budget left for an upstream call"""
+
+
+class UpstreamConnectionError(Exception):
+    """Raised in place of an SDK's connection error, so callers can catch it without importing the SDK"""
+
+    def __init__(self, message: str, timeout: bool = False):
+        super().__init__(message)
+        self.timeout = timeout
+
+
+class Overloaded(Exception):
+    """Raised when admission control sheds a call: 429 if the queue is full, 503 if it waited too long"""
+
+    def __init__(self, message: str, status_code: int, retry_after: float):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+# Errors that mean a dependency is unavailable, as opposed to the request being bad
+UPSTREAM_UNAVAILABLE = (
+    CircuitOpenError, DeadlineExceeded, Overloaded, requests.Timeout, requests.ConnectionError, UpstreamConnectionError
+)
+
+
+def unavailable_status(error: Exception) -> Tuple[int, Dict[str, str]]:
+    """HTTP status and headers for an UPSTREAM_UNAVAILABLE error: 504 for timeouts, else 503"""
+    if isinstance(error, (CircuitOpenError, Overloaded)):
+        status = error.status_code if isinstance(error, Overloaded) else 503
+        return status, {"Retry-After": str(max(1, int(error.retry_after)))}
+    if isinstance(error, (DeadlineExceeded, requests.Timeout)) or getattr(error, "timeout", False) is True \
+            or "timeout" in type(error).__name__.lower():
+        return 504, {}
+    return 503, {}
+
+
+class CircuitBreaker:
+    """Fail fast after repeated errors from a dependency
+
+    Closed: calls go through and consecutive failures are counted. After
+    `failure_threshold` of them the breaker opens and calls are rejected for
+    `recovery_seconds`. Then a single trial call is let through (half-open);
+    its success closes the breaker, its failure re-opens it.
+    """
+
+    def __init__(self, service: str, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 recovery_seconds: float = BREAKER_RECOVERY_SECONDS):
+        self.service = service
+        self.failure_threshold = failure_threshold
+        self.recovery_seconds = recovery_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        """Whether calls would currently be rejected"""
+        return self.state == "open" and time.monotonic() - self.opened_at < self.recovery_seconds
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call should not be attempted"""
+        if self.state == "closed":
+            return
+        with self._lock:
+            if self.state == "open":
+                remaining = self.recovery_seconds - (time.monotonic() - self.opened_at)
+                if remaining > 0:
+                    CIRCUIT_REJECTIONS.inc(service=self.service)
+                    raise CircuitOpenError(self.service, remaining)
+                self.state = "half_open"
+            if self._trial_in_flight:
+                CIRCUIT_REJECTIONS.inc(service=self.service)
+                raise CircuitOpenError(self.service, 1.0)
+            self._trial_in_flight = True
+
+    def record_success(self):
+        if self.state == "closed" and self.failures == 0:
+            return
+        with self._lock:
+            if self.state != "closed":
+                logger.info("circuit_closed service=%s", self.service)
+            self.state = "closed"
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    CIRCUIT_OPENED.inc(service=self.service)
+                    logger.warning("circuit_opened service=%s failures=%s", self.service, self.failures)
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+    def release_trial(self):
+        """Let another call through after one admitted by before_call never reached the dependency"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def status(self) -> dict:
+        return {"service": self.service, "state": "open" if self.is_open else self.state, "failures": self.failures}
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+def deadline_remaining() -> Optional[float]:
+    """Seconds left in the current request's budget, or None outside a request"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def upstream_timeout(connect: float, read: float) -> Tuple[float, float]:
+    """(connect, read) timeouts for requests, capped by the request deadline"""
+    remaining = deadline_remaining()
+    if remaining is None:
+        return connect, read
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline exceeded before calling upstream")
+    return min(connect, remaining), min(read, remaining)
+
+
+class DeadlineMiddleware:
+    """ASGI middleware giving every HTTP request a time budget for upstream calls"""
+
+    def __init__(self, app, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+        token = _deadline.set(time.monotonic() + self.seconds)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _deadline.reset(token)
+
+
+class HostBreakers:
+    """One circuit breaker per host, created on first use
+
+    Bill texts are downloaded from dozens of legislature sites; a slow or
+    failing one only opens its own breaker, not OpenStates' or another state's.
+    """
+
+    def __init__(self, service: str):
+        self.service = service
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(host, CircuitBreaker(f"{self.service}:{host}"))
+        return breaker
+
+    def status(self) -> List[dict]:
+        """Status of every host's breaker that isn't closed"""
+        return [breaker.status() for breaker in list(self._breakers.values()) if breaker.state != "closed"]
+
+
+# Create singleton instances
+openstates_breaker = CircuitBreaker("openstates")
+claude_breaker = CircuitBreaker("claude")
+document_breakers = HostBreakers("documents")
@@ -0,0 +1,343 @@
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+# Where build_semantic_index.py writes the index and the API loads it from
+SEMANTIC_INDEX_PATH = os.getenv("SEMANTIC_INDEX_PATH", "./semantic_index")
+# How often the API checks whether a newer index has been built
+SEMANTIC_RELOAD_INTERVAL = float(os.getenv("SEMANTIC_RELOAD_INTERVAL", "30"))
+
+# File in the index directory naming the version directory to load
+POINTER = "CURRENT"
+# Files of an index, inside a version directory (or directly in the index directory for older builds)
+INDEX_FILES = ("meta.json", "components.npy", "vectors.npy")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "act", "bill", "relating", "shall",
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Rows per chunk for sparse products and for scoring the vector matrix
+_CHUNK = 65536
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase terms, dropping stopwords and single characters"""
+    return [w for w in _WORD_RE.findall(text.lower()) if len(w) > 1 and w not in STOPWORDS]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[str]:
+    """Merge several ranked ID lists, scoring each ID by the sum of 1 / (k + rank)"""
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: -scores[item])
+
+
+class _Sparse:
+    """Compressed sparse rows (ptr, idx, data) with a chunked dense product"""
+
+    def __init__(self, ptr: np.ndarray, idx: np.ndarray, data: np.ndarray, columns: int):
+        self.ptr = ptr
+        self.idx = idx
+        self.data = data
+        self.rows = len(ptr) - 1
+        self.columns = columns
+
+    def transpose(self) -> "_Sparse":
+        """Return the same matrix stored by column"""
+        row_of = np.repeat(np.arange(self.rows, dtype=np.int32), np.diff(self.ptr))
+        order = np.argsort(self.idx, kind="stable")
+        ptr = np.zeros(self.columns + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.idx, minlength=self.columns), out=ptr[1:])
+        return _Sparse(ptr, row_of[order], self.data[order], self.rows)
+
+    def dot(self, dense: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Multiply by a dense (columns, k) matrix, writing into `out` if given"""
+        if out is None:
+            out = np.zeros((self.rows, dense.shape[1]), dtype=np.float32)
+        for start in range(0, self.rows, _CHUNK):
+            end = min(start + _CHUNK, self.rows)
+            lo, hi = self.ptr[start], self.ptr[end]
+            block = np.zeros((end - start, dense.shape[1]), dtype=np.float32)
+            if hi > lo:
+                values = self.data[lo:hi, None] * dense[self.idx[lo:hi]]
+                starts = self.ptr[start:end] - lo
+                nonempty = self.ptr[start:end] < self.ptr[start + 1:end + 1]
+                block[nonempty] = np.add.reduceat(values, starts[nonempty], axis=0)
+            out[start:end] = block
+        return out
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length, leaving all-zero rows alone"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def build_semantic_index(
+    documents: Callable[[], Iterable[Tuple[str, str]]],
+    path: str = SEMANTIC_INDEX_PATH,
+    dim: int = 128,
+    max_features: int = 50000,
+    min_df: int = 2,
+    power_iterations: int = 2,
+) -> int:
+    """Build a latent semantic index (TF-IDF + truncated SVD) and write it to `path`
+
+    `documents` is called twice and must yield (bill_id, text) pairs each time,
+    so the corpus never needs to be held in memory. Returns the number of
+    documents indexed.
+    """
+    started = time.time()
+
+    # Pass 1: document frequencies and vocabulary
+    df = Counter()
+    count = 0
+    for _, text in documents():
+        df.update(set(tokenize(text)))
+        count += 1
+    terms = [term for term, freq in df.most_common(max_features) if freq >= min_df]
+    vocabulary = {term: i for i, term in enumerate(terms)}
+    idf = np.array([np.log((1 + count) / (1 + df[term])) + 1 for term in terms], dtype=np.float32)
+    del df
+
+    # Pass 2: sublinear TF-IDF rows, L2-normalized
+    ids = []
+    ptr = [0]
+    idx_parts, data_parts = [], []
+    for bill_id, text in documents():
+        counts = Counter(vocabulary[t] for t in tokenize(text) if t in vocabulary)
+        columns = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        weights = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * idf[columns]
+        norm = np.linalg.norm(weights)
+        if norm > 0:
+            weights /= norm
+        ids.append(bill_id)
+        idx_parts.append(columns)
+        data_parts.append(weights.astype(np.float32))
+        ptr.append(ptr[-1] + len(columns))
+
+    matrix = _Sparse(
+        np.array(ptr, dtype=np.int64),
+        np.concatenate(idx_parts) if idx_parts else np.zeros(0, dtype=np.int32),
+        np.concatenate(data_parts) if data_parts else np.zeros(0, dtype=np.float32),
+        len(terms),
+    )
+    del idx_parts, data_parts
+    if not ids or not terms:
+        print("Not enough text to build a semantic index")
+        return 0
+    transposed = matrix.transpose()
+
+    # Randomized truncated SVD: project onto a random subspace, refine it with
+    # a few power iterations, then take the exact SVD of the small projection
+    dim = max(1, min(dim, len(terms), len(ids)))
+    width = min(dim + 10, len(terms), len(ids))
+    rng = np.random.RandomState(0)
+    sample = matrix.dot(rng.standard_normal((len(terms), width)).astype(np.float32))
+    for _ in range(power_iterations):
+        sample, _ = np.linalg.qr(sample)
+        projected, _ = np.linalg.qr(transposed.dot(sample))
+        sample = matrix.dot(projected)
+    basis, _ = np.linalg.qr(sample)
+    small = transposed.dot(basis).T  # (width, terms)
+    _, _, vt = np.linalg.svd(small, full_matrices=False)
+    components = np.ascontiguousarray(vt[:dim].T, dtype=np.float32)  # (terms, dim)
+    del sample, basis, small
+
+    # Write a new version directory, then point readers at it with one atomic rename
+    os.makedirs(path, exist_ok=True)
+    previous = current_version(path)
+    version_dir = tempfile.mkdtemp(prefix=time.strftime("%Y%m%d-%H%M%S-"), dir=path)
+    os.chmod(version_dir, 0o755)
+
+    vectors = np.lib.format.open_memmap(
+        os.path.join(version_dir, "vectors.npy"), mode="w+", dtype=np.float32, shape=(len(ids), dim)
+    )
+    matrix.dot(components, out=vectors)
+    for start in range(0, len(ids), _CHUNK):
+        vectors[start:start + _CHUNK] = _normalize_rows(vectors[start:start + _CHUNK])
+    vectors.flush()
+    del vectors
+
+    np.save(os.path.join(version_dir, "components.npy"), components)
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump({"dim": dim, "count": len(ids), "ids": ids, "terms": terms, "idf": idf.tolist()}, f)
+
+    version = os.path.basename(version_dir)
+    publish_version(path, version)
+    _remove_old_versions(path, keep={version, previous})
+
+    print(f"Semantic index built with {len(ids)} documents, {len(terms)} terms "
+          f"and {dim} dimensions in {time.time() - started:.1f}s")
+    return len(ids)
+
+
+def current_version(path: str) -> Optional[str]:
+    """The version directory the index's pointer names, or None if there is no pointer"""
+    try:
+        with open(os.path.join(path, POINTER)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_version(path: str, version: str):
+    """Point the index at a finished version directory; readers see the old or the new one, never a mix"""
+    staging = os.path.join(path, POINTER + ".tmp")
+    with open(staging, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(staging, os.path.join(path, POINTER))
+
+
+def _remove_old_versions(path: str, keep: set):
+    """Delete versions other than `keep`, and the files of an index from before versioning
+
+    The previous version is kept, so a server still mapping it isn't left
+    without files on platforms that don't allow deleting open files.
+    """
+    for name in os.listdir(path):
+        target = os.path.join(path, name)
+        if name in keep or name == POINTER:
+            continue
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        elif name in INDEX_FILES:
+            os.remove(target)
+
+
+class _LoadedIndex:
+    """The arrays of one loaded version, replaced as a whole when a newer version is loaded"""
+
+    __slots__ = ("version", "ids", "vocabulary", "idf", "components", "vectors")
+
+    def __init__(self, version: Optional[str], ids: List[str], vocabulary: Dict[str, int], idf: np.ndarray,
+                 components: np.ndarray, vectors: np.ndarray):
+        self.version = version
+        self.ids = ids
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.components = components
+        self.vectors = vectors
+
+
+_EMPTY = _LoadedIndex(None, [], {}, np.zeros(0, dtype=np.float32), np.zeros((0, 0), dtype=np.float32),
+                      np.zeros((0, 0), dtype=np.float32))
+
+
+class SemanticIndex:
+    """Read-only latent semantic index over bill text
+
+    Document vectors are memory-mapped from disk as a float32 matrix, so the
+    OS page cache is shared by every worker, and queries are scored in
+    fixed-size row batches. Each build writes a new version directory and
+    swaps a pointer file; refresh() loads the new version when the pointer
+    changes, so running servers pick up rebuilds without a restart.
+    """
+
+    def __init__(self, path: str = SEMANTIC_INDEX_PATH, batch_size: int = _CHUNK,
+                 refresh_interval: float = SEMANTIC_RELOAD_INTERVAL):
+        """Create an unloaded index; call load() to map the files"""
+        self.path = path
+        self.batch_size = batch_size
+        self.refresh_interval = refresh_interval
+        self.available = False
+        self._index = _EMPTY
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Map the files of the current version if there is one; returns whether the index is available"""
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            version = current_version(self.path)
+            # Indexes built before versioning keep their files directly in the index directory
+            directory = os.path.join(self.path, version) if version else self.path
+            meta_path = os.path.join(directory, "meta.json")
+            if not os.path.exists(meta_path):
+                print(f"Semantic index not found at {self.path}; semantic search disabled")
+                self._index = _EMPTY
+                self.available = False
+                return False
+
+            with open(meta_path) as f:
+                meta = json.load(f)
+            self._index = _LoadedIndex(
+                version,
+                meta["ids"],
+                {term: i for i, term in enumerate(meta["terms"])},
+                np.array(meta["idf"], dtype=np.float32),
+                np.load(os.path.join(directory, "components.npy")),
+                np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r"),
+            )
+            self.available = True
+        print(f"Semantic index loaded with {len(self._index.ids)} documents")
+        return True
+
+    def refresh(self, force: bool = False):
+        """Load a newer version if the pointer has changed since the last check"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+        version = current_version(self.path)
+        if version is not None and version != self._index.version:
+            self.load()
+
+    def embed(self, text: str, index: Optional[_LoadedIndex] = None) -> Optional[np.ndarray]:
+        """Project a query into the latent space, or None if no term is known"""
+        index = index or self._index
+        counts = Counter(index.vocabulary[t] for t in tokenize(text) if t in index.vocabulary)
+        if not counts:
+            return None
+        columns = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = (1 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))) * index.idf[columns]
+        vector = weights @ index.components[columns]
+        norm = np.linalg.norm(vector)
+        return (vector / norm).astype(np.float32) if norm > 0 else None
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """Return the `limit` most similar (bill_id, cosine score) pairs for a query"""
+        if not self.available:
+            return []
+        # Score against one version even if a newer one is loaded meanwhile
+        index = self._index
+        vector = self.embed(query, index)
+        if vector is None:
+            return []
+
+        # Keep the best `limit` rows of each batch, then rank the survivors
+        best_rows, best_scores = [], []
+        for start in range(0, len(index.ids), self.batch_size):
+            scores = index.vectors[start:start + self.batch_size] @ vector
+            if len(scores) > limit:
+                top = np.argpartition(scores, -limit)[-limit:]
+            else:
+                top = np.arange(len(scores))
+            best_rows.append(top + start)
+            best_scores.append(scores[top])
+        if not best_rows:
+            return []
+
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores)[:limit]
+        return [(index.ids[rows[i]], float(scores[i])) for i in order if scores[i] > 0]
+
+
+# Create a singleton instance
+semantic_index = SemanticIndex()
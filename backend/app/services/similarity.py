@@ -0,0 +1,250 @@
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from sqlalchemy.orm import Session
+from app.database.models import BillSignature
+
+# MinHash parameters: 128 permutations split into 32 bands of 4 rows gives an
+# LSH candidate threshold of roughly (1/32) ** (1/4) ~= 0.42 Jaccard similarity
+NUM_PERM = 128
+BANDS = 32
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+# Hash family h(x) = (a * x + b) mod p over a 31-bit Mersenne prime, so every
+# product fits in uint64 and the whole signature is computed in one numpy pass
+_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(20240229)  # Fixed seed: signatures must match across processes
+_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+# Odd multipliers used to fold each band's rows into one uint64 key
+_BAND_MIX = (_rng.randint(1, 1 << 62, size=ROWS, dtype=np.int64).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+
+# Process shingles in chunks so a very long bill doesn't allocate a huge matrix
+_CHUNK = 4096
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """Hash every run of `size` consecutive words in the text to a 31-bit integer"""
+    words = _WORD_RE.findall(_TAG_RE.sub(" ", text).lower())
+    if len(words) < size:
+        return np.zeros(0, dtype=np.uint64)
+
+    hashes = {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes)) % _PRIME
+
+
+def compute_signature(text: str) -> Optional[Tuple[np.ndarray, int]]:
+    """Compute the MinHash signature of a bill's text
+
+    Returns the uint32 signature and the number of distinct shingles, or None
+    if the text is too short to shingle.
+    """
+    shingles = shingle_hashes(text)
+    if len(shingles) == 0:
+        return None
+
+    signature = np.full(NUM_PERM, np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(shingles), _CHUNK):
+        chunk = shingles[start:start + _CHUNK]
+        values = (_A[:, None] * chunk[None, :] + _B[:, None]) % _PRIME
+        np.minimum(signature, values.min(axis=1), out=signature)
+
+    return signature.astype(np.uint32), len(shingles)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """Fold each band of one or more signatures into a uint64 bucket key
+
+    Returns an array of shape (BANDS, n).
+    """
+    rows = signatures.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    return (rows * _BAND_MIX).sum(axis=2).T
+
+
+def store_signature(db: Session, bill_id: str, text: str) -> Optional[BillSignature]:
+    """Compute and persist the signature for a bill's text"""
+    result = compute_signature(text)
+    if result is None:
+        return None
+    signature, shingle_count = result
+
+    record = db.query(BillSignature).filter(BillSignature.bill_id == bill_id).first()
+    if not record:
+        record = BillSignature(bill_id=bill_id)
+        db.add(record)
+    record.signature = signature.astype("<u4").tobytes()
+    record.shingle_count = shingle_count
+    record.updated_at = datetime.utcnow()
+    db.commit()
+    return record
+
+
+class SimilarityIndex:
+    """MinHash LSH index for finding near-duplicate bill text
+
+    Signatures live in one (n, NUM_PERM) uint32 matrix. For each band the
+    bucket keys are kept sorted alongside the slot they came from, so finding
+    candidates is a binary search per band. Bills added since the last merge
+    sit in a small pending list that is scanned directly, and are merged into
+    the sorted arrays once it grows past `merge_threshold`.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0, merge_threshold: int = 1024):
+        """Create an empty index"""
+        self.refresh_interval = refresh_interval
+        self.merge_threshold = merge_threshold
+        self._signatures = np.zeros((0, NUM_PERM), dtype=np.uint32)
+        self._count = 0
+        self._ids: List[str] = []
+        self._slots: Dict[str, int] = {}
+        self._sorted_keys = np.zeros((BANDS, 0), dtype=np.uint64)
+        self._sorted_slots = np.zeros((BANDS, 0), dtype=np.int32)
+        self._pending: List[int] = []
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _reserve(self, size: int):
+        """Grow the signature matrix to hold at least `size` rows"""
+        if size <= len(self._signatures):
+            return
+        capacity = max(size, len(self._signatures) * 2, 1024)
+        grown = np.zeros((capacity, NUM_PERM), dtype=np.uint32)
+        grown[:self._count] = self._signatures[:self._count]
+        self._signatures = grown
+
+    def _merge(self):
+        """Re-sort the band arrays over every signature; caller must hold the lock"""
+        keys = band_keys(self._signatures[:self._count])
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._sorted_keys = np.take_along_axis(keys, order, axis=1)
+        self._sorted_slots = order.astype(np.int32)
+        self._pending = []
+
+    def _add(self, bill_id: str, signature: np.ndarray):
+        """Add or replace one signature; caller must hold the lock"""
+        slot = self._slots.get(bill_id)
+        if slot is None:
+            slot = self._count
+            self._reserve(slot + 1)
+            self._ids.append(bill_id)
+            self._slots[bill_id] = slot
+            self._count += 1
+        self._signatures[slot] = signature
+        # Replaced signatures keep stale band entries until the next merge;
+        # candidates are always re-scored against the current signature
+        self._pending.append(slot)
+
+    def build(self, db: Session):
+        """Load every stored signature and build the band arrays"""
+        rows = db.query(BillSignature.bill_id, BillSignature.signature, BillSignature.updated_at).all()
+
+        with self._lock:
+            self._signatures = np.zeros((max(len(rows), 1024), NUM_PERM), dtype=np.uint32)
+            self._ids = []
+            self._slots = {}
+            self._count = 0
+            self._watermark = None
+            for bill_id, blob, updated_at in rows:
+                self._signatures[self._count] = np.frombuffer(blob, dtype="<u4")
+                self._ids.append(bill_id)
+                self._slots[bill_id] = self._count
+                self._count += 1
+                if updated_at and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+            self._merge()
+            self._last_refresh = time.monotonic()
+
+        print(f"Similarity index built with {self._count} signatures")
+
+    def refresh(self, db: Session, force: bool = False):
+        """Pick up signatures stored since the last build or refresh"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+
+        query = db.query(BillSignature.bill_id, BillSignature.signature, BillSignature.updated_at)
+        if self._watermark is not None:
+            query = query.filter(BillSignature.updated_at > self._watermark)
+
+        with self._lock:
+            for bill_id, blob, updated_at in query.all():
+                self._add(bill_id, np.frombuffer(blob, dtype="<u4"))
+                if updated_at and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+            if len(self._pending) >= self.merge_threshold:
+                self._merge()
+
+    def add(self, bill_id: str, signature: np.ndarray):
+        """Add or update a single bill's signature"""
+        with self._lock:
+            self._add(bill_id, signature)
+            if len(self._pending) >= self.merge_threshold:
+                self._merge()
+
+    def has(self, bill_id: str) -> bool:
+        """Whether the index holds a signature for this bill"""
+        return bill_id in self._slots
+
+    def similar(self, bill_id: str, limit: int = 10, threshold: float = 0.5) -> List[Tuple[str, float]]:
+        """Return (bill_id, estimated Jaccard similarity) pairs for near-duplicates of a bill"""
+        slot = self._slots.get(bill_id)
+        if slot is None:
+            return []
+
+        with self._lock:
+            signature = self._signatures[slot]
+            query_keys = band_keys(signature)[:, 0]
+
+            # Binary search each band's sorted keys for the query's bucket
+            candidates = []
+            for band in range(BANDS):
+                keys = self._sorted_keys[band]
+                lo = np.searchsorted(keys, query_keys[band], side="left")
+                hi = np.searchsorted(keys, query_keys[band], side="right")
+                if hi > lo:
+                    candidates.append(self._sorted_slots[band, lo:hi])
+
+            # Bills added since the last merge are compared directly
+            if self._pending:
+                pending = np.array(self._pending, dtype=np.int32)
+                pending_keys = band_keys(self._signatures[pending])
+                matches = (pending_keys == query_keys[:, None]).any(axis=0)
+                candidates.append(pending[matches])
+
+            if not candidates:
+                return []
+            candidate_slots = np.unique(np.concatenate(candidates))
+            candidate_slots = candidate_slots[candidate_slots != slot]
+            if len(candidate_slots) == 0:
+                return []
+
+            # Estimate Jaccard similarity as the fraction of matching MinHash values
+            scores = (self._signatures[candidate_slots] == signature).mean(axis=1)
+            ids = [self._ids[s] for s in candidate_slots]
+
+        ranked = sorted(
+            ((other_id, float(score)) for other_id, score in zip(ids, scores) if score >= threshold),
+            key=lambda item: -item[1]
+        )
+        return ranked[:limit]
+
+
+# Create a singleton instance
+similarity_index = SimilarityIndex()
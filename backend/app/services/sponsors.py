@@ -0,0 +1,159 @@
+import os
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import Bill, Sponsorship, CoSponsorship
+
+# Bills with more sponsors than this add no co-sponsorship edges: n sponsors make
+# n(n-1)/2 pairs, and a bill most of a chamber signed says little about collaboration
+COSPONSOR_MAX_SPONSORS = int(os.getenv("COSPONSOR_MAX_SPONSORS", "100"))
+
+
+def sponsor_key(person_id: Optional[str], name: Optional[str]) -> str:
+    """Graph key for a sponsor: the OpenStates person ID, or the name if unlinked"""
+    return person_id or f"name:{name or ''}"
+
+
+def _pairs(keys: Set[str]) -> Set[Tuple[str, str]]:
+    """Every pair of co-sponsors, each once with the smaller key first"""
+    if len(keys) > COSPONSOR_MAX_SPONSORS:
+        return set()
+    return set(combinations(sorted(keys), 2))
+
+
+def update_sponsorships(db: Session, bill_id: str, sponsors: List[Any]):
+    """Replace a bill's sponsorship rows and apply the difference to the co-sponsorship graph
+
+    `sponsors` are the Sponsorship models from transform_bill_data. Only the
+    pairs that appeared or disappeared since the bill was last ingested are
+    touched, so re-ingesting an unchanged bill costs one query, and a changed
+    one a single query for all of its edges. The caller commits, and the new
+    and updated edges are written in one batch per statement at flush.
+    """
+    existing = db.query(Sponsorship).filter(Sponsorship.bill_id == bill_id).all()
+    old_keys = {row.person_id for row in existing}
+    new_keys = {sponsor_key(s.id, s.name) for s in sponsors}
+
+    # Rewrite the bill's rows so names and classifications stay current
+    for row in existing:
+        db.delete(row)
+    for sponsor in sponsors:
+        db.add(Sponsorship(
+            bill_id=bill_id,
+            person_id=sponsor_key(sponsor.id, sponsor.name),
+            name=sponsor.name,
+            classification=sponsor.classification,
+            primary=sponsor.primary,
+        ))
+
+    if old_keys == new_keys:
+        return
+
+    old_pairs = _pairs(old_keys)
+    new_pairs = _pairs(new_keys)
+    added = new_pairs - old_pairs
+    removed = old_pairs - new_pairs
+
+    # One indexed query for every edge that may change, instead of a lookup per pair
+    changed = {key for pair in added | removed for key in pair}
+    edges = {
+        (edge.person_id, edge.collaborator_id): edge
+        for edge in db.query(CoSponsorship).filter(
+            CoSponsorship.person_id.in_(changed), CoSponsorship.collaborator_id.in_(changed)
+        )
+    }
+    for pair in added:
+        edge = edges.get(pair)
+        if edge is None:
+            db.add(CoSponsorship(person_id=pair[0], collaborator_id=pair[1], bill_count=1))
+        else:
+            edge.bill_count += 1
+    for pair in removed:
+        edge = edges.get(pair)
+        if edge is not None:
+            edge.bill_count -= 1
+            if edge.bill_count <= 0:
+                db.delete(edge)
+
+
+def backfill_primary_sponsors(db: Session) -> int:
+    """Create sponsorship rows for bills stored before every sponsor was kept
+
+    Those bills only recorded their primary sponsor, so they add no graph edges.
+    """
+    if db.query(Sponsorship.id).first() is not None:
+        return 0
+    rows = db.query(Bill.id, Bill.primary_sponsor_id, Bill.primary_sponsor_name).filter(
+        Bill.primary_sponsor_name.isnot(None)
+    ).all()
+    db.bulk_save_objects([
+        Sponsorship(
+            bill_id=bill_id,
+            person_id=sponsor_key(person_id, name),
+            name=name,
+            classification="primary",
+            primary=True,
+        )
+        for bill_id, person_id, name in rows
+    ])
+    db.commit()
+    return len(rows)
+
+
+def legislator_bills(db: Session, person_id: str, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+    """Bills sponsored or co-sponsored by a legislator, most recently updated first"""
+    query = db.query(Bill, Sponsorship.primary, Sponsorship.classification).join(
+        Sponsorship, Sponsorship.bill_id == Bill.id
+    ).filter(Sponsorship.person_id == person_id)
+
+    total = db.query(func.count(Sponsorship.id)).filter(Sponsorship.person_id == person_id).scalar()
+    rows = query.order_by(Bill.updated_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
+    return {
+        "results": [
+            {
+                "id": bill.id,
+                "identifier": bill.identifier,
+                "title": bill.title,
+                "session": bill.session,
+                "jurisdiction": {"name": bill.jurisdiction_name, "id": bill.jurisdiction_id},
+                "primary": primary,
+                "classification": classification,
+            }
+            for bill, primary, classification in rows
+        ],
+        "pagination": {
+            "total_items": total,
+            "page": page,
+            "per_page": per_page,
+            "total_pages": (total + per_page - 1) // per_page,
+        },
+    }
+
+
+def top_collaborators(db: Session, person_id: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Legislators who most often sponsor bills together with this one
+
+    Each pair is stored once, so the legislator's edges are read from both
+    ends, each an indexed top-`limit` query, and merged.
+    """
+    edges = db.query(CoSponsorship.collaborator_id, CoSponsorship.bill_count).filter(
+        CoSponsorship.person_id == person_id
+    ).order_by(CoSponsorship.bill_count.desc()).limit(limit).all()
+    edges += db.query(CoSponsorship.person_id, CoSponsorship.bill_count).filter(
+        CoSponsorship.collaborator_id == person_id
+    ).order_by(CoSponsorship.bill_count.desc()).limit(limit).all()
+    if not edges:
+        return []
+    edges = sorted(edges, key=lambda edge: -edge[1])[:limit]
+
+    # One indexed lookup for the display names
+    names = dict(
+        db.query(Sponsorship.person_id, func.max(Sponsorship.name)).filter(
+            Sponsorship.person_id.in_([collaborator_id for collaborator_id, _ in edges])
+        ).group_by(Sponsorship.person_id).all()
+    )
+    return [
+        {"id": collaborator_id, "name": names.get(collaborator_id), "shared_bills": count}
+        for collaborator_id, count in edges
+    ]
@@ -0,0 +1,308 @@
+import bisect
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Any, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.database.models import Bill
+
+# Title words shorter than this (or in the stopword list) are not indexed on their own
+MIN_WORD_LENGTH = 3
+STOPWORDS = {"the", "and", "for", "act", "relating", "with", "from", "that", "this", "an", "of", "to", "in", "on"}
+
+# Bill IDs looked up per query when the index is reconciled with the table
+RECONCILE_BATCH_SIZE = 500
+
+# Key kinds, in the order matches are ranked
+IDENTIFIER, SPONSOR, TITLE, WORD = 0, 1, 2, 3
+KIND_NAMES = {IDENTIFIER: "identifier", SPONSOR: "sponsor", TITLE: "title", WORD: "title"}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse whitespace so prefixes compare consistently"""
+    return " ".join(text.lower().split())
+
+
+class _Snapshot:
+    """One immutable version of the index; refreshes build a new one rather than editing it
+
+    Keys of each kind are kept in their own sorted list, so a lookup can read
+    identifier matches before any title word, however many words share the prefix.
+    """
+
+    __slots__ = ("keys", "refs", "bills", "slots")
+
+    def __init__(self, keys: List[List[str]], refs: List[List[int]],
+                 bills: List[Optional[Tuple[str, str, str, Optional[str]]]], slots: Dict[str, int]):
+        self.keys = keys  # Per kind, sorted by key and then bill slot
+        self.refs = refs  # Per kind, the bill slot of each key
+        self.bills = bills  # None for the slot of a deleted bill
+        self.slots = slots
+
+
+def _empty_snapshot() -> _Snapshot:
+    return _Snapshot([[] for _ in KIND_NAMES], [[] for _ in KIND_NAMES], [], {})
+
+
+def _position(keys: List[str], refs: List[int], key: str, ref: int) -> int:
+    """Where (key, ref) is or would be in the lists, which are sorted by key and then ref"""
+    lo = bisect.bisect_left(keys, key)
+    hi = bisect.bisect_right(keys, key, lo)
+    return bisect.bisect_left(refs, ref, lo, hi)
+
+
+def _merge(keys: List[str], refs: List[int], drop: List[int], entries: List[Tuple[str, int]]) -> Tuple[List[str], List[int]]:
+    """Copies of the sorted key and ref lists without the positions in `drop` and with `entries` merged in
+
+    Each insertion point is found by bisecting the old lists, and the runs
+    between them are copied as slices, so a refresh of m keys costs
+    O(m log n) comparisons plus one copy of the lists.
+    """
+    events = sorted(
+        [(_position(keys, refs, key, ref), 0, key, ref) for key, ref in entries] + [(pos, 1, "", 0) for pos in drop]
+    )
+    new_keys: List[str] = []
+    new_refs: List[int] = []
+    start = 0
+    for pos, dropped, key, ref in events:
+        new_keys.extend(keys[start:pos])
+        new_refs.extend(refs[start:pos])
+        if dropped:
+            start = pos + 1
+        else:
+            new_keys.append(key)
+            new_refs.append(ref)
+            start = pos
+    new_keys.extend(keys[start:])
+    new_refs.extend(refs[start:])
+    return new_keys, new_refs
+
+
+class SuggestIndex:
+    """In-memory prefix index for typeahead suggestions
+
+    Keys are kept in one sorted list per kind, with a parallel list holding
+    the bill slot of each key. A prefix lookup is two bisects plus a short
+    scan per kind, so completions never touch the database. Lookups read one
+    snapshot of the lists without locking; builds and refreshes swap in a new
+    snapshot.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0, reconcile_interval: float = 900.0):
+        """Create an empty index"""
+        self.refresh_interval = refresh_interval
+        self.reconcile_interval = reconcile_interval
+        self._last_reconcile = time.monotonic()
+        self._snapshot = _empty_snapshot()
+        self._watermark: Optional[datetime] = None
+        self._last_refresh = 0.0
+        self._lock = threading.Lock()  # Serializes writers; readers never take it
+
+    def __len__(self) -> int:
+        return len(self._snapshot.slots)
+
+    def _bill_keys(self, identifier: str, title: str, sponsor: Optional[str]) -> List[Tuple[str, int]]:
+        """Build the (key, kind) pairs indexed for one bill"""
+        keys = []
+        if identifier:
+            keys.append((normalize(identifier).replace(" ", ""), IDENTIFIER))
+        if sponsor:
+            sponsor_key = normalize(sponsor)
+            keys.append((sponsor_key, SPONSOR))
+            # Also match on surname, e.g. "warren" for "Elizabeth Warren"
+            parts = sponsor_key.split(" ")
+            if len(parts) > 1:
+                keys.append((parts[-1], SPONSOR))
+        if title:
+            title_key = normalize(title)
+            keys.append((title_key, TITLE))
+            words = set(_WORD_RE.findall(title_key))
+            for word in words:
+                if len(word) >= MIN_WORD_LENGTH and word not in STOPWORDS:
+                    keys.append((word, WORD))
+        return keys
+
+    def _apply(self, rows: List[Tuple[str, Optional[str], Optional[str], Optional[str], Optional[datetime]]],
+               deleted: Iterable[str] = ()):
+        """Add or replace a batch of bills, and drop deleted ones, in one new snapshot; caller must hold the lock
+
+        A replaced bill keeps its slot, and its old keys are dropped in the same
+        merge that adds the new ones.
+        """
+        snapshot = self._snapshot
+        deleted = [bill_id for bill_id in deleted if bill_id in snapshot.slots]
+        if not rows and not deleted:
+            return
+        bills = list(snapshot.bills)
+        slots = dict(snapshot.slots)
+        drop: List[List[int]] = [[] for _ in KIND_NAMES]
+        entries: List[List[Tuple[str, int]]] = [[] for _ in KIND_NAMES]
+        watermark = self._watermark
+
+        def drop_keys(slot):
+            _, old_identifier, old_title, old_sponsor = bills[slot]
+            for key, kind in self._bill_keys(old_identifier, old_title, old_sponsor):
+                keys, refs = snapshot.keys[kind], snapshot.refs[kind]
+                pos = _position(keys, refs, key, slot)
+                if pos < len(keys) and keys[pos] == key and refs[pos] == slot:
+                    drop[kind].append(pos)
+
+        for bill_id in deleted:
+            slot = slots.pop(bill_id)
+            drop_keys(slot)
+            bills[slot] = None
+
+        # Only the last version of a bill listed more than once is indexed
+        latest = {row[0]: row for row in rows}
+        for bill_id, identifier, title, sponsor, updated_at in latest.values():
+            slot = slots.get(bill_id)
+            record = (bill_id, identifier or "", title or "", sponsor)
+            if slot is None:
+                slot = slots[bill_id] = len(bills)
+                bills.append(record)
+            else:
+                drop_keys(slot)
+                bills[slot] = record
+            for key, kind in self._bill_keys(identifier, title, sponsor):
+                entries[kind].append((key, slot))
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+
+        keys, refs = [], []
+        for kind in KIND_NAMES:
+            if drop[kind] or entries[kind]:
+                kind_keys, kind_refs = _merge(snapshot.keys[kind], snapshot.refs[kind], drop[kind], entries[kind])
+            else:
+                kind_keys, kind_refs = snapshot.keys[kind], snapshot.refs[kind]
+            keys.append(kind_keys)
+            refs.append(kind_refs)
+        self._snapshot = _Snapshot(keys, refs, bills, slots)
+        self._watermark = watermark
+
+    def build(self, db: Session):
+        """Rebuild the index from every bill in the database"""
+        rows = db.query(
+            Bill.id, Bill.identifier, Bill.title, Bill.primary_sponsor_name, Bill.updated_at
+        ).all()
+
+        # Build the sorted arrays in one pass instead of inserting key by key
+        bills = []
+        slots = {}
+        entries: List[List[Tuple[str, int]]] = [[] for _ in KIND_NAMES]
+        watermark = None
+        for bill_id, identifier, title, sponsor, updated_at in rows:
+            slot = len(bills)
+            bills.append((bill_id, identifier or "", title or "", sponsor))
+            slots[bill_id] = slot
+            for key, kind in self._bill_keys(identifier, title, sponsor):
+                entries[kind].append((key, slot))
+            if updated_at and (watermark is None or updated_at > watermark):
+                watermark = updated_at
+        for kind_entries in entries:
+            kind_entries.sort()
+
+        with self._lock:
+            self._snapshot = _Snapshot(
+                [[key for key, _ in kind_entries] for kind_entries in entries],
+                [[slot for _, slot in kind_entries] for kind_entries in entries],
+                bills, slots,
+            )
+            self._watermark = watermark
+            self._last_refresh = self._last_reconcile = time.monotonic()
+
+        print(f"Suggest index built with {len(bills)} bills and {sum(len(e) for e in entries)} keys")
+
+    def add_bill(self, bill: Bill):
+        """Add or update a single bill in the index"""
+        with self._lock:
+            self._apply([(bill.id, bill.identifier, bill.title, bill.primary_sponsor_name, bill.updated_at)])
+
+    def refresh(self, db: Session, force: bool = False):
+        """Pick up bills added or updated since the last build or refresh"""
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval:
+            return
+        self._last_refresh = now
+
+        if self._watermark is None and not self._snapshot.slots:
+            self.build(db)
+            return
+
+        query = db.query(
+            Bill.id, Bill.identifier, Bill.title, Bill.primary_sponsor_name, Bill.updated_at
+        )
+        if self._watermark is not None:
+            query = query.filter(Bill.updated_at > self._watermark)
+
+        rows = query.all()
+        with self._lock:
+            self._apply(rows)
+            # A count that differs from the index means bills were deleted, or stored with
+            # an older updated_at; both at once can cancel out, so IDs are also compared
+            # every reconcile_interval
+            if now - self._last_reconcile >= self.reconcile_interval \
+                    or db.query(func.count(Bill.id)).scalar() != len(self._snapshot.slots):
+                self._reconcile(db)
+                self._last_reconcile = now
+
+    def _reconcile(self, db: Session):
+        """Drop deleted bills and add any the watermark missed; caller must hold the lock"""
+        stored = {bill_id for (bill_id,) in db.query(Bill.id)}
+        indexed = self._snapshot.slots
+        missing = [bill_id for bill_id in stored if bill_id not in indexed]
+        rows = []
+        for start in range(0, len(missing), RECONCILE_BATCH_SIZE):
+            rows += db.query(
+                Bill.id, Bill.identifier, Bill.title, Bill.primary_sponsor_name, Bill.updated_at
+            ).filter(Bill.id.in_(missing[start:start + RECONCILE_BATCH_SIZE])).all()
+        self._apply(rows, [bill_id for bill_id in indexed if bill_id not in stored])
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Return up to `limit` bills whose identifier, title or sponsor starts with `prefix`"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        # Identifiers are stored without spaces, so "hb 12" should match "hb123"
+        probes = [prefix]
+        compact = prefix.replace(" ", "")
+        if compact != prefix:
+            probes.append(compact)
+
+        # Scan a bounded window per kind and probe, best kind first, then rank by kind and
+        # key length; once `limit` bills have matched, a lower kind can't place any more
+        scan_limit = limit * 8
+        candidates = {}
+        snapshot = self._snapshot
+        for kind in KIND_NAMES:
+            if len(candidates) >= limit:
+                break
+            keys, refs = snapshot.keys[kind], snapshot.refs[kind]
+            for probe in probes:
+                lo = bisect.bisect_left(keys, probe)
+                hi = bisect.bisect_left(keys, probe + "\uffff", lo)
+                for pos in range(lo, min(hi, lo + scan_limit)):
+                    slot = refs[pos]
+                    rank = (kind, len(keys[pos]))
+                    if slot not in candidates or rank < candidates[slot]:
+                        candidates[slot] = rank
+
+        results = []
+        for slot, (kind, _) in sorted(candidates.items(), key=lambda item: item[1])[:limit]:
+            bill_id, identifier, title, sponsor = snapshot.bills[slot]
+            results.append({
+                "id": bill_id,
+                "identifier": identifier,
+                "title": title,
+                "primary_sponsor": sponsor,
+                "match": KIND_NAMES[kind],
+            })
+        return results
+
+
+# Create a singleton instance
+suggest_index = SuggestIndex()
@@ -0,0 +1,312 @@
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import requests
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# "none" disables tracing, "file" appends OTLP/JSON lines to TRACE_FILE,
+# "otlp" posts OTLP/HTTP JSON to a collector at OTEL_EXPORTER_OTLP_ENDPOINT
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("TRACE_FILE", "./traces.jsonl")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "http://localhost:4318").rstrip("/")
+# Fraction of root requests traced; children follow their parent's decision
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "legispal-api")
+
+# Span kinds and status codes as numbered in the OTLP protobuf schema
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+STATUS_OK, STATUS_ERROR = 1, 2
+
+_MAX_STATEMENT_LENGTH = 1000
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    """Encode a Python value as an OTLP AnyValue"""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed operation within a trace"""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "kind", "start_ns", "end_ns",
+                 "attributes", "status", "status_message", "sampled")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, sampled: bool,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = dict(attributes or {})
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any):
+        if self.sampled and value is not None:
+            self.attributes[key] = value
+
+    def record_exception(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self):
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header for this span"""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in self.attributes.items()],
+            "status": {"code": self.status, "message": self.status_message} if self.status else {},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost active span in this context, if any"""
+    return _current_span.get()
+
+
+def _begin(name: str, kind: int, attributes: Optional[Dict[str, Any]] = None,
+           traceparent: Optional[str] = None) -> Span:
+    """Create a child of the current span, or a new root with a sampling decision"""
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, kind, parent.sampled, attributes)
+
+    if traceparent:
+        # Continue a trace started by the caller: 00-<trace_id>-<span_id>-<flags>
+        parts = traceparent.strip().split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            return Span(name, parts[1], parts[2], kind, parts[3] == "01", attributes)
+
+    sampled = random.random() < TRACE_SAMPLE_RATE
+    return Span(name, "%032x" % random.getrandbits(128), None, kind, sampled, attributes)
+
+
+@contextmanager
+def start_span(name: str, kind: int = KIND_INTERNAL, traceparent: Optional[str] = None, **attributes):
+    """Run the with-block inside a span, making it the current span
+
+    Yields None when tracing is disabled so call sites cost one check.
+    """
+    if not tracing_enabled():
+        yield None
+        return
+
+    span = _begin(name, kind, attributes if attributes else None, traceparent)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+
+def traced(name: str, kind: int = KIND_INTERNAL):
+    """Decorator wrapping every call of a function in a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with start_span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Exporter:
+    """Background thread batching finished spans to a file or an OTLP collector"""
+
+    def __init__(self, max_batch: int = 512, interval: float = 2.0, max_queue: int = 10000):
+        self.max_batch = max_batch
+        self.interval = interval
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+
+    def _drain(self, block: bool) -> List[Span]:
+        batch = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.interval))
+            while len(batch) < self.max_batch:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._drain(block=True)
+            if batch:
+                self._export(batch)
+
+    def flush(self):
+        """Export everything queued so far from the calling thread"""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return
+            self._export(batch)
+
+    def _export(self, spans: List[Span]):
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": SERVICE_NAME}},
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": "legispal"},
+                    "spans": [span.to_otlp() for span in spans],
+                }],
+            }]
+        }
+        try:
+            if TRACE_EXPORTER == "file":
+                with self._lock, open(TRACE_FILE, "a") as f:
+                    f.write(json.dumps(payload) + "\n")
+            elif TRACE_EXPORTER == "otlp":
+                requests.post(f"{OTLP_ENDPOINT}/v1/traces", json=payload, timeout=5).raise_for_status()
+        except Exception as e:
+            logger.warning("trace_export_failed exporter=%s spans=%s error=%s", TRACE_EXPORTER, len(spans), e)
+
+
+_exporter = _Exporter()
+
+
+def tracing_enabled() -> bool:
+    return TRACE_EXPORTER in ("file", "otlp")
+
+
+def flush_traces():
+    """Write out any finished spans still queued, e.g. at shutdown"""
+    if tracing_enabled():
+        _exporter.flush()
+
+
+def trace_engine(engine):
+    """Record a client span for every SQL statement run on an engine"""
+    if not tracing_enabled():
+        return
+
+    system = engine.dialect.name
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        # Only trace statements issued inside a sampled request or job
+        if parent is None or not parent.sampled:
+            conn.info.setdefault("trace_spans", []).append(None)
+            return
+        span = Span(
+            statement.lstrip().split(None, 1)[0].upper(), parent.trace_id, parent.span_id, KIND_CLIENT, True,
+            {"db.system": system, "db.statement": statement[:_MAX_STATEMENT_LENGTH]},
+        )
+        conn.info.setdefault("trace_spans", []).append(span)
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = conn.info["trace_spans"].pop()
+        if span is not None:
+            span.set_attribute("db.rows_affected", cursor.rowcount if cursor.rowcount >= 0 else None)
+            span.end()
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        spans = context.connection.info.get("trace_spans") if context.connection is not None else None
+        if spans:
+            span = spans.pop()
+            if span is not None:
+                span.record_exception(context.original_exception)
+                span.end()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request
+
+    Honors an incoming W3C `traceparent` header so traces continue across
+    services; otherwise the request is sampled at TRACE_SAMPLE_RATE.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for key, value in scope.get("headers", []):
+            if key == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        with start_span(f"{scope['method']} {scope['path']}", KIND_SERVER, traceparent=traceparent,
+                        **{"http.method": scope["method"], "http.target": scope["path"]}) as span:
+            async def send_with_status(message):
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        span.status = STATUS_ERROR
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+            # Rename to the matched route template once routing has run
+            route = scope.get("route")
+            if getattr(route, "path", None):
+                span.name = f"{scope['method']} {route.path}"
+                span.set_attribute("http.route", route.path)
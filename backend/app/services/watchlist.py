@@ -0,0 +1,252 @@
+import hashlib
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.database.models import Bill, BillChange, ChangeWatermark, Keyword, Watch, WatchMatch, bill_keyword
+from app.services.metrics import Counter
+
+# Changes read and matched against watches per transaction
+WATCH_MATCH_BATCH_SIZE = int(os.getenv("WATCH_MATCH_BATCH_SIZE", "500"))
+# Watches one API key may register
+WATCHLIST_MAX_WATCHES = int(os.getenv("WATCHLIST_MAX_WATCHES", "1000"))
+
+# Watermark row of the watch matcher in change_watermarks
+MATCHER = "watch_matcher"
+
+CHANGES_LOGGED = Counter("legispal_bill_changes_total", "Changes logged at ingest", ["kind"])
+WATCH_MATCHES = Counter("legispal_watch_matches_total", "Logged changes matched to watchers", ["watch"])
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def owner_key(api_key: str) -> str:
+    """The stored owner of an API key's watches; the key itself is never stored"""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def search_words(text: str) -> Set[str]:
+    """Lowercase words of a saved search, or of the text it is matched against"""
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _action_key(action: Dict[str, Any]) -> Tuple:
+    return (action.get("date"), action.get("description"))
+
+
+def _vote_key(vote: Dict[str, Any]) -> Tuple:
+    return (vote.get("date"), vote.get("result"))
+
+
+def _version_key(version: Dict[str, Any]) -> Tuple:
+    return (version.get("url") or version.get("note"), version.get("date"))
+
+
+# Kind of change, the Bill column it comes from, and the identity of one entry
+TRACKED = [("action", "actions", _action_key), ("vote", "votes", _vote_key), ("version", "versions", _version_key)]
+
+
+def record_changes(db: Session, bill_id: str, previous: Optional[Bill], current: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Log what is new on a bill since it was last ingested, returning the number of changes
+
+    `previous` is the stored bill before this ingest, or None for a bill seen
+    for the first time, which is logged as one "new_bill" change rather than
+    one per action. `current` maps "actions", "votes" and "versions" to the
+    freshly fetched lists. The caller commits, so the log and the bill are
+    written together.
+    """
+    if previous is None:
+        counts = {column: len(current.get(column) or []) for _, column, _ in TRACKED}
+        db.add(BillChange(bill_id=bill_id, kind="new_bill", detail=counts))
+        CHANGES_LOGGED.inc(kind="new_bill")
+        return 1
+
+    logged = 0
+    for kind, column, key in TRACKED:
+        seen = {key(entry) for entry in getattr(previous, column) or []}
+        for entry in current.get(column) or []:
+            if key(entry) not in seen:
+                db.add(BillChange(bill_id=bill_id, kind=kind, detail=entry))
+                CHANGES_LOGGED.inc(kind=kind)
+                logged += 1
+    return logged
+
+
+class SavedSearchIndex:
+    """Saved searches keyed by one of their words, for matching many bills at once
+
+    Each search is filed under its longest word, as a cheap stand-in for its
+    rarest. A bill is checked only against the searches filed under one of its
+    own words, so matching costs a lookup per word of the bill rather than a
+    comparison with every saved search. Searches are kept as plain tuples,
+    since reading ORM attributes in this loop costs more than the set checks.
+    """
+
+    def __init__(self, watches: Iterable[Tuple[int, str, str, Optional[str], Optional[str]]]):
+        self.by_word: Dict[str, List[Tuple[Set[str], Optional[str], Optional[str], int, str]]] = {}
+        for watch_id, owner, query, jurisdiction_id, session in watches:
+            words = search_words(query or "")
+            if words:
+                anchor = max(sorted(words), key=len)
+                self.by_word.setdefault(anchor, []).append((words, jurisdiction_id, session, watch_id, owner))
+
+    def __len__(self) -> int:
+        return sum(len(searches) for searches in self.by_word.values())
+
+    def matches(self, words: Set[str], jurisdiction_id: Optional[str], session: Optional[str]) -> List[Tuple[int, str]]:
+        """(watch ID, owner) of saved searches whose words all appear in `words` and whose filters fit the bill"""
+        found = []
+        for word in words:
+            for needed, watch_jurisdiction, watch_session, watch_id, owner in self.by_word.get(word, ()):
+                if needed <= words and (not watch_jurisdiction or watch_jurisdiction == jurisdiction_id) \
+                        and (not watch_session or watch_session == session):
+                    found.append((watch_id, owner))
+        return found
+
+
+def _bill_words(db: Session, bill_ids: List[str]) -> Dict[str, Tuple[Set[str], Optional[str], Optional[str]]]:
+    """Searchable words, jurisdiction and session of each bill, from two queries"""
+    keywords: Dict[str, List[str]] = {}
+    for bill_id, name in db.execute(
+        select(bill_keyword.c.bill_id, Keyword.name)
+        .join(Keyword, Keyword.id == bill_keyword.c.keyword_id)
+        .where(bill_keyword.c.bill_id.in_(bill_ids))
+    ):
+        keywords.setdefault(bill_id, []).append(name)
+
+    bills = {}
+    rows = db.execute(
+        select(Bill.id, Bill.identifier, Bill.title, Bill.abstract, Bill.subject, Bill.jurisdiction_id, Bill.session)
+        .where(Bill.id.in_(bill_ids))
+    )
+    for bill_id, identifier, title, abstract, subject, jurisdiction_id, session in rows:
+        text = " ".join([identifier or "", title or "", abstract or "", *(subject or []), *keywords.get(bill_id, [])])
+        bills[bill_id] = (search_words(text), jurisdiction_id, session)
+    return bills
+
+
+def match_pending(db: Session, batch_size: int = WATCH_MATCH_BATCH_SIZE) -> int:
+    """Match changes logged since the last run against every watch, returning the number of matches
+
+    Changes are read from the watermark in batches. For each batch, watched
+    bills are found with one indexed query on the changed bill IDs, and saved
+    searches are matched in memory against each changed bill's words, which
+    are read once per bill however many of its changes are in the batch. Each
+    batch's matches and the advanced watermark commit together, so an
+    interrupted run resumes where it stopped.
+    """
+    watermark = db.get(ChangeWatermark, MATCHER)
+    if watermark is None:
+        watermark = ChangeWatermark(name=MATCHER, change_id=0)
+        db.add(watermark)
+    searches = SavedSearchIndex(db.execute(
+        select(Watch.id, Watch.owner, Watch.query, Watch.jurisdiction_id, Watch.session).where(Watch.query.is_not(None))
+    ))
+
+    matched = 0
+    while True:
+        changes = db.execute(
+            select(BillChange.id, BillChange.bill_id)
+            .where(BillChange.id > watermark.change_id)
+            .order_by(BillChange.id)
+            .limit(batch_size)
+        ).all()
+        if not changes:
+            break
+
+        bill_ids = sorted({bill_id for _, bill_id in changes})
+        bill_watches: Dict[str, List[Tuple[int, str]]] = {}
+        for watch_id, owner, bill_id in db.execute(
+            select(Watch.id, Watch.owner, Watch.bill_id).where(Watch.bill_id.in_(bill_ids))
+        ):
+            bill_watches.setdefault(bill_id, []).append((watch_id, owner))
+        bills = _bill_words(db, bill_ids) if len(searches) else {}
+        search_hits = {bill_id: searches.matches(*bills[bill_id]) for bill_id in bill_ids if bill_id in bills}
+
+        for change_id, bill_id in changes:
+            owners = set()
+            for source, hits in (("bill", bill_watches.get(bill_id, ())), ("search", search_hits.get(bill_id, ()))):
+                for watch_id, owner in hits:
+                    if owner not in owners:
+                        owners.add(owner)
+                        db.add(WatchMatch(owner=owner, change_id=change_id, watch_id=watch_id))
+                        WATCH_MATCHES.inc(watch=source)
+            matched += len(owners)
+
+        watermark.change_id = changes[-1][0]
+        db.commit()
+        if len(changes) < batch_size:
+            break
+    return matched
+
+
+def _change_dict(change: BillChange, identifier: Optional[str], title: Optional[str]) -> Dict[str, Any]:
+    return {
+        "cursor": change.id,
+        "bill_id": change.bill_id,
+        "identifier": identifier,
+        "title": title,
+        "kind": change.kind,
+        "detail": change.detail,
+        "created_at": change.created_at.isoformat() if change.created_at else None,
+    }
+
+
+def change_feed(db: Session, since: int = 0, limit: int = 100, owner: Optional[str] = None) -> Dict[str, Any]:
+    """Changes after the `since` cursor, oldest first, from a range scan of an index
+
+    With an owner, only changes that matched the owner's watches, which
+    appear once the watch matcher has run over them.
+    """
+    query = select(BillChange, Bill.identifier, Bill.title).outerjoin(Bill, Bill.id == BillChange.bill_id)
+    if owner is None:
+        query = query.where(BillChange.id > since).order_by(BillChange.id)
+    else:
+        query = (
+            query.join(WatchMatch, WatchMatch.change_id == BillChange.id)
+            .where(WatchMatch.owner == owner, WatchMatch.change_id > since)
+            .order_by(WatchMatch.change_id)
+        )
+    rows = db.execute(query.limit(limit + 1)).all()
+    changes = [_change_dict(change, identifier, title) for change, identifier, title in rows[:limit]]
+    return {
+        "changes": changes,
+        "cursor": changes[-1]["cursor"] if changes else since,
+        "more": len(rows) > limit,
+    }
+
+
+def list_watches(db: Session, owner: str) -> List[Dict[str, Any]]:
+    """An owner's watches, oldest first"""
+    watches = db.scalars(select(Watch).where(Watch.owner == owner).order_by(Watch.id))
+    return [watch.to_dict() for watch in watches]
+
+
+def add_watch(db: Session, owner: str, bill_id: Optional[str] = None, query: Optional[str] = None,
+              jurisdiction_id: Optional[str] = None, session: Optional[str] = None) -> Watch:
+    """Register a watched bill or saved search; raises ValueError if it isn't valid
+
+    A saved search matches changes logged from now on, once the matcher runs.
+    """
+    if bool(bill_id) == bool(query):
+        raise ValueError("A watch needs either a bill_id or a query")
+    if query and not search_words(query):
+        raise ValueError("A saved search needs at least one word")
+    if db.query(Watch.id).filter(Watch.owner == owner).count() >= WATCHLIST_MAX_WATCHES:
+        raise ValueError(f"At most {WATCHLIST_MAX_WATCHES} watches per API key")
+    watch = Watch(owner=owner, bill_id=bill_id, query=query, jurisdiction_id=jurisdiction_id, session=session)
+    db.add(watch)
+    db.commit()
+    db.refresh(watch)
+    return watch
+
+
+def remove_watch(db: Session, owner: str, watch_id: int) -> bool:
+    """Delete one of an owner's watches; changes it already matched stay in the feed"""
+    watch = db.get(Watch, watch_id)
+    if watch is None or watch.owner != owner:
+        return False
+    db.delete(watch)
+    db.commit()
+    return True
@@ -0,0 +1,92 @@
+"""Compare per-bill Claude analysis with batched analysis, including a resumed run
+
+Ingests a synthetic corpus from the fake OpenStates server, then analyzes it
+twice against FakeAnthropic: once the way `fetch_bills.py --analyze` does (two
+synchronous calls per bill) and once through analyze_bills.py's batch mode.
+The batch run is interrupted after submission and resumed by a fresh
+service, and the script checks that every bill ends up with a summary and
+keywords exactly once.
+
+    python benchmarks/batch_analysis.py
+    python benchmarks/batch_analysis.py --bills 500 --claude-latency-ms 2000 --batch-seconds 5
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures
+from suite import configure_environment, run_ingestion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bills", type=int, default=100)
+    parser.add_argument("--text-kb", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake OpenStates latency per request")
+    parser.add_argument("--claude-latency-ms", type=float, default=200.0, help="fake Claude latency per call")
+    parser.add_argument("--batch-seconds", type=float, default=1.0, help="time the fake takes to process a batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.cassette = None
+
+    bills = expand_fixtures(load_fixtures(), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, args.latency_ms, text_kb=args.text_kb, seed=args.seed)
+    fake_claude = FakeAnthropic(args.claude_latency_ms, seed=args.seed, batch_seconds=args.batch_seconds)
+    workdir = tempfile.mkdtemp(prefix="legispal-batch-")
+    try:
+        configure_environment(workdir, server.start(), args)
+        args.analyze = False
+        run_ingestion(args, fake_claude)
+
+        from app.database.connection import SessionLocal
+        from app.database.models import AnalysisBatch, Bill, bill_keyword
+        from app.services.batch_analysis import BatchAnalysisService
+        from app.services.claude import claude_service
+        from app.services.openstates import openstates_service
+
+        db = SessionLocal()
+        bill_rows = db.query(Bill.id, Bill.title).all()
+
+        # Per-bill analysis, as fetch_bills.py --analyze does it
+        started = time.perf_counter()
+        for bill_id, title in bill_rows:
+            claude_service.analyze_bill(openstates_service.get_bill_text(bill_id), title)
+        sequential = time.perf_counter() - started
+        print(f"Per-bill analysis: {len(bill_rows)} bills in {sequential:.1f}s "
+              f"({2 * len(bill_rows)} synchronous Claude calls)")
+
+        # Batched analysis, interrupted after submission and resumed by a new service
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            first = BatchAnalysisService(fake_claude).run(db, openstates_service.get_bill_text, wait=False)
+            # Simulate a crash between recording a batch and submitting it
+            db.add(AnalysisBatch(id="interrupted", status="submitting", request_count=0))
+            db.commit()
+            second = BatchAnalysisService(fake_claude).run(db, openstates_service.get_bill_text, poll_seconds=0.2)
+            batched = time.perf_counter() - started
+        print(f"Batched analysis:  {first['submitted_bills'] + second['submitted_bills']} bills in {batched:.1f}s "
+              f"({len(fake_claude.batches.batches)} batches, resumed once)")
+
+        summarized = db.query(Bill).filter(Bill.summary.isnot(None)).count()
+        tagged = db.query(bill_keyword.c.bill_id).distinct().count()
+        open_batches = db.query(AnalysisBatch).filter(AnalysisBatch.status != "applied").count()
+        print(f"Bills with summaries: {summarized}/{len(bill_rows)}, with keywords: {tagged}/{len(bill_rows)}, "
+              f"unfinished batches: {open_batches}")
+        db.close()
+        return 0 if summarized == tagged == len(bill_rows) and not open_batches else 1
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
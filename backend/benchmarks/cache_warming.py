@@ -0,0 +1,143 @@
+"""Latency after a cache expiry with and without the popularity-driven warmer
+
+Ingests a synthetic corpus, then replays Zipf-distributed traffic over
+/text, /analysis and /chat so the popularity sketch learns which bills are
+hot. The caches are then emptied, as after an expiry or restart, and the
+same traffic is replayed twice: once cold, and once after a single warming
+pass. It reports request latency, cache hit rates and upstream calls.
+
+    python benchmarks/cache_warming.py
+    python benchmarks/cache_warming.py --bills 500 --requests 400 --claude-latency-ms 1500
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures
+from suite import configure_environment, percentile, run_ingestion
+
+
+def zipf_traffic(bill_ids, count: int, exponent: float, seed: int):
+    """(method, path, body) requests whose bills follow a Zipf distribution"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) ** exponent for rank in range(len(bill_ids))]
+    requests = []
+    for bill_id in rng.choices(bill_ids, weights, k=count):
+        kind = rng.random()
+        if kind < 0.5:
+            requests.append(("GET", f"/api/bills/{bill_id}/text", None))
+        elif kind < 0.8:
+            requests.append(("GET", f"/api/bills/{bill_id}/analysis", None))
+        else:
+            requests.append(("POST", "/api/chat/", {"bill_id": bill_id, "question": "Who does this affect?"}))
+    return requests
+
+
+def replay(client, requests):
+    """Latency percentiles in ms, by kind of request"""
+    latencies = {"text": [], "analysis": [], "chat": []}
+    for method, path, body in requests:
+        started = time.perf_counter()
+        client.request(method, path, json=body).raise_for_status()
+        kind = "chat" if body else path.rsplit("/", 1)[-1]
+        latencies[kind].append((time.perf_counter() - started) * 1000)
+    return {kind: (percentile(sorted(values), 0.5), percentile(sorted(values), 0.99))
+            for kind, values in latencies.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bills", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300, help="requests per replay")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of bill popularity")
+    parser.add_argument("--text-kb", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake OpenStates latency per request")
+    parser.add_argument("--claude-latency-ms", type=float, default=300.0, help="fake Claude latency per call")
+    parser.add_argument("--warm-analyses", type=int, default=20, help="Claude analyses allowed in the warming pass")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    args.cassette = None
+    args.analyze = False
+
+    bills = expand_fixtures(load_fixtures(), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, args.latency_ms, text_kb=args.text_kb, seed=args.seed)
+    fake_claude = FakeAnthropic(args.claude_latency_ms, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="legispal-warm-")
+    try:
+        configure_environment(workdir, server.start(), args)
+        run_ingestion(args, fake_claude)
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services.cache import bill_data_cache, bill_text_cache, analysis_cache
+        from app.services.claude import claude_service
+        from app.services.metrics import CACHE_REQUESTS
+        from app.services.popularity import cache_warmer
+        claude_service.client = fake_claude
+        cache_warmer.max_analyses = args.warm_analyses
+
+        def cache_counts():
+            with CACHE_REQUESTS._lock:
+                return dict(CACHE_REQUESTS._values)
+
+        def clear():
+            for cache in (bill_data_cache, bill_text_cache, analysis_cache):
+                cache.clear()
+
+        def run(name, traffic):
+            before_counts, before_upstream = cache_counts(), (server.requests, fake_claude.calls)
+            latencies = replay(client, traffic)
+            after = cache_counts()
+            hits = {
+                cache: after.get((cache, "hit"), 0) - before_counts.get((cache, "hit"), 0)
+                for cache in ("bill_text", "bill_analysis")
+            }
+            misses = {
+                cache: after.get((cache, "miss"), 0) - before_counts.get((cache, "miss"), 0)
+                for cache in ("bill_text", "bill_analysis")
+            }
+            print(f"\n{name}: {server.requests - before_upstream[0]} OpenStates requests, "
+                  f"{fake_claude.calls - before_upstream[1]} Claude calls")
+            for cache in hits:
+                total = hits[cache] + misses[cache]
+                print(f"  {cache:<14} hit rate {hits[cache] / total if total else 0:.0%}")
+            for kind, (p50, p99) in latencies.items():
+                print(f"  {kind:<9} p50 {p50:>8.1f} ms  p99 {p99:>8.1f} ms")
+
+        bill_ids = [bill["id"] for bill in bills]
+        random.Random(args.seed).shuffle(bill_ids)
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = TestClient(app).__enter__()
+
+        # Learn popularity, then forget the cached content, as after an expiry
+        replay(client, zipf_traffic(bill_ids, args.requests, args.zipf, args.seed))
+        traffic = zipf_traffic(bill_ids, args.requests, args.zipf, args.seed + 1)
+        print(f"{args.requests} requests over {args.bills} bills, Zipf exponent {args.zipf}")
+
+        clear()
+        run("Cold caches", traffic)
+
+        clear()
+        started = time.perf_counter()
+        result = cache_warmer.warm_once()
+        print(f"\nWarming pass: {result['texts']} texts and {result['analyses']} analyses "
+              f"in {time.perf_counter() - started:.1f}s")
+        run("After warming", traffic)
+        client.__exit__(None, None, None)
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
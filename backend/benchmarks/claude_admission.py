@@ -0,0 +1,141 @@
+"""Load test for Claude admission control against a rate-limited FakeAnthropic
+
+Interactive chat callers and batch analysis workers hammer ClaudeService
+concurrently, first with admission control effectively disabled and then
+with the configured limiter. Without it the fake's rate limit turns excess
+load into 429s and a tripped circuit breaker; with it throughput settles at
+the upstream's capacity, chat keeps low latency ahead of batch work, and
+overflow is shed early with 429/503.
+
+    python benchmarks/claude_admission.py
+    python benchmarks/claude_admission.py --rate-limit 5 --chat-clients 30 --duration 20
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter as Tally
+from contextlib import contextmanager
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+from fakes import FakeAnthropic, bill_text
+import app.services.claude as claude_module
+from app.services.admission import AdmissionController, Ticket, INTERACTIVE, BATCH
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Overloaded
+from suite import percentile
+
+
+class NoAdmission:
+    """Stand-in for AdmissionController that admits every call immediately"""
+
+    @contextmanager
+    def admit(self, priority: int = INTERACTIVE, tokens: int = 0, timeout=None):
+        yield Ticket(priority, tokens)
+
+
+def run(limiter, args) -> Dict[str, Any]:
+    """Drive chat and analysis callers for args.duration seconds and tally the outcomes"""
+    service = claude_module.claude_service
+    service.client = FakeAnthropic(latency_ms=args.latency_ms, ms_per_output_token=args.ms_per_token,
+                                   rate_limit=args.rate_limit, output_tokens=args.output_tokens)
+    claude_module.claude_admission = limiter
+    claude_module.claude_breaker = CircuitBreaker("claude")
+
+    text = bill_text(0, args.text_kb)
+    outcomes = {INTERACTIVE: Tally(), BATCH: Tally()}
+    latencies: Dict[int, List[float]] = {INTERACTIVE: [], BATCH: []}
+    per_second = Tally()
+    lock = threading.Lock()
+    stop = time.monotonic() + args.duration
+    started = time.monotonic()
+
+    def caller(priority: int):
+        while time.monotonic() < stop:
+            began = time.monotonic()
+            try:
+                if priority == INTERACTIVE:
+                    service.chat_about_bill(text, "Benchmark Bill", "What does this bill change?")
+                else:
+                    service.generate_bill_summary(text, "Benchmark Bill")
+                outcome = "ok"
+            except Overloaded as e:
+                outcome = f"shed_{e.status_code}"
+            except CircuitOpenError:
+                outcome = "circuit_open"
+            except Exception as e:
+                outcome = "upstream_429" if getattr(getattr(e, "response", None), "status_code", None) == 429 else "error"
+            elapsed = time.monotonic() - began
+            with lock:
+                outcomes[priority][outcome] += 1
+                if outcome == "ok":
+                    latencies[priority].append(elapsed * 1000)
+                    per_second[int(time.monotonic() - started)] += 1
+            if outcome != "ok":
+                # Rejected callers back off briefly instead of spinning
+                time.sleep(args.backoff_ms / 1000)
+
+    threads = [threading.Thread(target=caller, args=(INTERACTIVE,)) for _ in range(args.chat_clients)]
+    threads += [threading.Thread(target=caller, args=(BATCH,)) for _ in range(args.batch_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Ignore the first and last second, which are partial
+    seconds = [per_second.get(s, 0) for s in range(1, max(2, int(args.duration)))]
+    result = {"throughput": round(sum(seconds) / len(seconds), 2),
+              "throughput_stdev": round(statistics.pstdev(seconds), 2)}
+    for priority, name in ((INTERACTIVE, "chat"), (BATCH, "batch")):
+        values = sorted(latencies[priority])
+        result[name] = {
+            "outcomes": dict(outcomes[priority]),
+            "p50_ms": round(percentile(values, 0.50), 1),
+            "p99_ms": round(percentile(values, 0.99), 1),
+        }
+    return result
+
+
+def report(name: str, result: Dict[str, Any]):
+    print(f"\n{name}: {result['throughput']} ok/s (stdev {result['throughput_stdev']} per second)")
+    for kind in ("chat", "batch"):
+        stats = result[kind]
+        outcomes = ", ".join(f"{key}={value}" for key, value in sorted(stats["outcomes"].items()))
+        print(f"  {kind:<6} p50 {stats['p50_ms']:>8} ms  p99 {stats['p99_ms']:>8} ms  {outcomes}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--chat-clients", type=int, default=20)
+    parser.add_argument("--batch-workers", type=int, default=10)
+    parser.add_argument("--rate-limit", type=float, default=8.0, help="fake Claude requests per second")
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.5)
+    parser.add_argument("--output-tokens", type=int, default=300)
+    parser.add_argument("--text-kb", type=int, default=4)
+    parser.add_argument("--max-concurrency", type=int, default=4)
+    parser.add_argument("--tokens-per-minute", type=int, default=0, help="0 disables the token budget")
+    parser.add_argument("--max-queue", type=int, default=16)
+    parser.add_argument("--queue-timeout", type=float, default=5.0)
+    parser.add_argument("--backoff-ms", type=float, default=100.0, help="pause after a rejected call")
+    args = parser.parse_args()
+
+    print(f"{args.chat_clients} chat clients and {args.batch_workers} batch workers, "
+          f"fake Claude limited to {args.rate_limit} req/s, {args.duration:.0f}s per run")
+    report("Without admission control", run(NoAdmission(), args))
+    limited = AdmissionController("claude", max_concurrency=args.max_concurrency,
+                                  tokens_per_minute=args.tokens_per_minute, max_queue=args.max_queue,
+                                  queue_timeout=args.queue_timeout)
+    report("With admission control", run(limited, args))
+    print(f"  final concurrency limit {limited.status()['concurrency_limit']}")
+
+
+if __name__ == "__main__":
+    main()
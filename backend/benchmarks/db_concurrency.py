@@ -0,0 +1,138 @@
+"""Concurrent API read throughput while fetch_bills is writing, per SQLite journal mode
+
+For each journal mode a fresh process ingests a corpus from the fake
+OpenStates server, then re-ingests it with fetch_bills in a separate writer
+process, as a scheduled ingest would run. Meanwhile reader threads call
+GET /api/bills/{id} (async engine) and /api/bills/search (sync engine)
+through the ASGI app. It reports read throughput, latency and errors such
+as "database is locked" for the rollback journal and for WAL.
+
+    python benchmarks/db_concurrency.py
+    python benchmarks/db_concurrency.py --bills 500 --readers 16 --modes DELETE WAL
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter as Tally
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures
+from suite import configure_environment, percentile, run_ingestion
+
+
+def measure(args) -> dict:
+    """Run one journal mode in this process; the engine reads SQLITE_JOURNAL_MODE at import"""
+    bills = expand_fixtures(load_fixtures(), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, args.latency_ms, text_kb=args.text_kb, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="legispal-dbbench-")
+    try:
+        args.cassette = None
+        args.analyze = False
+        configure_environment(workdir, server.start(), args)
+        os.environ["SQLITE_JOURNAL_MODE"] = args.mode
+        fake_claude = FakeAnthropic()
+        run_ingestion(args, fake_claude)
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = TestClient(app).__enter__()
+        words = [bill["title"].split()[0].lower() for bill in bills[:20]]
+        latencies, outcomes = [], Tally()
+        lock = threading.Lock()
+        writing = threading.Event()
+        writing.set()
+
+        def writer():
+            script = f"import fetch_bills; fetch_bills.fetch_bills(None, None, limit={args.bills}, index_text=True)"
+            try:
+                subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, check=True)
+            finally:
+                writing.clear()
+
+        def reader(seed: int):
+            rng = random.Random(seed)
+            while writing.is_set():
+                if rng.random() < 0.5:
+                    path = f"/api/bills/{rng.choice(bills)['id']}"
+                else:
+                    path = f"/api/bills/search?query={rng.choice(words)}"
+                started = time.perf_counter()
+                try:
+                    status = client.get(path).status_code
+                except Exception as e:
+                    status = type(e).__name__
+                elapsed = (time.perf_counter() - started) * 1000
+                with lock:
+                    outcomes[str(status)] += 1
+                    latencies.append(elapsed)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=writer)] + [
+            threading.Thread(target=reader, args=(n,)) for n in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        client.__exit__(None, None, None)
+
+        latencies.sort()
+        return {
+            "mode": args.mode,
+            "write_seconds": round(elapsed, 2),
+            "reads": len(latencies),
+            "reads_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "statuses": dict(outcomes),
+        }
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bills", type=int, default=200)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--text-kb", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="fake OpenStates latency per request")
+    parser.add_argument("--modes", nargs="+", default=["DELETE", "WAL"], help="SQLite journal modes to compare")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args)))
+        return
+
+    print(f"{args.readers} readers during re-ingestion of {args.bills} bills")
+    print(f"{'mode':<8}{'reads/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'write s':>10}  statuses")
+    for mode in args.modes:
+        # A fresh process per mode, since the engine's pragmas are fixed at import
+        command = [sys.executable, os.path.abspath(__file__), "--mode", mode, "--bills", str(args.bills),
+                   "--readers", str(args.readers), "--text-kb", str(args.text_kb),
+                   "--latency-ms", str(args.latency_ms), "--seed", str(args.seed)]
+        output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+        row = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<8}{row['reads_per_second']:>10}{row['p50_ms']:>10}{row['p99_ms']:>10}"
+              f"{row['write_seconds']:>10}  {row['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Memory and time of a bulk bill export, streamed versus loaded all at once
+
+Fills a scratch database with synthetic bills (with actions, versions and
+keywords), then exports it twice per corpus size: by loading every Bill and
+calling to_dict(), and through the streaming gzip JSONL export. It reports
+rows per second and peak Python memory for each, which for the streaming
+export should stay flat as the corpus grows.
+
+    python benchmarks/export.py
+    python benchmarks/export.py --sizes 10000,100000 --batch-size 500
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+
+def fill(count: int, seed: int):
+    """Insert `count` synthetic bills, each with three keywords"""
+    from app.database.connection import engine
+    from app.database.models import Bill, Keyword, bill_keyword
+
+    rng = random.Random(seed)
+    words = [f"topic{n}" for n in range(500)]
+    started = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(Keyword.__table__.insert(), [{"id": n + 1, "name": word} for n, word in enumerate(words)])
+        for offset in range(0, count, 5000):
+            bills, links = [], []
+            for n in range(offset, min(count, offset + 5000)):
+                bill_id = f"ocd-bill/{n:08d}"
+                bills.append({
+                    "id": bill_id, "identifier": f"HB {n}", "title": f"An act relating to {rng.choice(words)} ({n})",
+                    "classification": ["bill"], "subject": [rng.choice(words)],
+                    "abstract": "An act " + " ".join(rng.choices(words, k=40)), "session": str(2020 + n % 6),
+                    "jurisdiction_id": f"ocd-jurisdiction/country:us/state:s{n % 50}/government",
+                    "jurisdiction_name": f"State {n % 50}", "primary_sponsor_name": f"Member {n % 400}",
+                    "primary_sponsor_id": f"ocd-person/{n % 400}",
+                    "actions": [{"date": "2025-01-0%d" % (a + 1), "description": "Referred to committee"} for a in range(5)],
+                    "documents": [], "votes": [],
+                    "versions": [{"note": "Introduced", "links": [{"url": f"https://example.org/{n}.html"}]}],
+                    "updated_at": started + timedelta(minutes=n), "summary": "A summary. " * 30,
+                })
+                links += [{"bill_id": bill_id, "keyword_id": k + 1} for k in rng.sample(range(len(words)), 3)]
+            conn.execute(Bill.__table__.insert(), bills)
+            conn.execute(bill_keyword.insert(), links)
+
+
+class NullSink:
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, data):
+        self.bytes += len(data)
+
+
+def measure(label: str, run):
+    """Print the throughput and peak traced memory of one export"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = run()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    print(f"  {label:<22} {rows / elapsed:>10.0f} rows/s  peak {peak:>8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,50000", help="comma-separated corpus sizes")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in [int(value) for value in args.sizes.split(",")]:
+        workdir = tempfile.mkdtemp(prefix="legispal-export-")
+        # The app reads DATABASE_URL at import, so each size runs in a new interpreter
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'export.db')}",
+                   LOG_LEVEL="ERROR", EXPORT_BENCH_CHILD=str(size), EXPORT_BENCH_BATCH=str(args.batch_size),
+                   EXPORT_BENCH_SEED=str(args.seed))
+        try:
+            subprocess.run([sys.executable, os.path.abspath(__file__)], env=env, check=True)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def child(size: int, batch_size: int, seed: int):
+    import contextlib
+    import io
+    from app.database.init_db import init_database
+    from app.database.connection import SessionLocal
+    from app.database.models import Bill
+    from app.services.export import iter_bill_batches, jsonl_gzip
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_database()
+    fill(size, seed)
+    print(f"\n{size} bills")
+
+    def load_all():
+        db = SessionLocal()
+        try:
+            sink = NullSink()
+            with gzip.GzipFile(fileobj=sink, mode="wb") as out:
+                bills = db.query(Bill).all()
+                for bill in bills:
+                    out.write((json.dumps(bill.to_dict(), default=str) + "\n").encode())
+            return len(bills)
+        finally:
+            db.close()
+
+    def stream():
+        sink = NullSink()
+        counted = []
+
+        def batches():
+            for rows in iter_bill_batches(batch_size=batch_size):
+                counted.append(len(rows))
+                yield rows
+        for chunk in jsonl_gzip(batches()):
+            sink.write(chunk)
+        return sum(counted)
+
+    measure("load all + to_dict", load_all)
+    measure("streaming export", stream)
+
+
+if __name__ == "__main__":
+    if os.getenv("EXPORT_BENCH_CHILD"):
+        child(int(os.environ["EXPORT_BENCH_CHILD"]), int(os.environ["EXPORT_BENCH_BATCH"]),
+              int(os.environ["EXPORT_BENCH_SEED"]))
+    else:
+        main()
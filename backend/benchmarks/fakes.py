@@ -0,0 +1,410 @@
+"""Local stand-ins for the OpenStates API and the Anthropic client
+
+Both fakes are deterministic for a given seed and have configurable latency,
+rate limits and payload sizes, so benchmarks run offline and repeatably.
+The OpenStates fake serves a synthetic corpus expanded from recorded bill
+fixtures (benchmarks/fixtures/openstates_bills.json by default), stored in
+the shape OpenStatesService.transform_bill_data reads.
+"""
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, unquote, urlparse
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "openstates_bills.json")
+
+_WORDS = (
+    "agency board commission county credit department district education energy federal funding grant health "
+    "housing insurance labor license municipal pension program property public report resident safety school "
+    "service state tax transportation utility water worker authority benefit contract employer facility "
+    "local provision requirement section subsection amended enacted fiscal year annual budget appropriation"
+).split()
+_BILL_NAMESPACE = uuid.UUID("6f1c2a3e-8d4b-4c5a-9e6f-7a8b9c0d1e2f")
+
+
+class TokenBucket:
+    """Allow `rate` events per second with bursts of up to `rate`; 0 means unlimited"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+def load_fixtures(path: str = FIXTURE_PATH) -> List[Dict[str, Any]]:
+    """Load recorded OpenStates v3 bill payloads"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def expand_fixtures(templates: List[Dict[str, Any]], count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Derive `count` distinct bills from the fixture templates
+
+    Identifiers, titles, sponsors and vote tallies are varied deterministically
+    so indexes, the co-sponsorship graph and analytics see realistic spread.
+    """
+    rng = random.Random(seed)
+    people = [
+        {"id": f"ocd-person/{uuid.UUID(int=rng.getrandbits(128), version=4)}", "name": f"Legislator {i}",
+         "party": rng.choice(["Democratic", "Republican", "Independent"])}
+        for i in range(max(10, count // 10))
+    ]
+
+    bills = []
+    for i in range(count):
+        bill = copy.deepcopy(templates[i % len(templates)])
+        bill["id"] = f"ocd-bill/{uuid.uuid5(_BILL_NAMESPACE, str(i))}"
+        prefix = bill.get("identifier", "HB 1").split(" ")[0]
+        bill["identifier"] = f"{prefix} {1000 + i}"
+        topic = " ".join(rng.sample(_WORDS, 3))
+        bill["title"] = f"{bill.get('title', '')} ({topic})"
+
+        sponsors = rng.sample(people, rng.randint(1, 4))
+        bill["sponsorships"] = [
+            {"name": person["name"], "classification": "primary" if n == 0 else "cosponsor", "primary": n == 0,
+             "person": person}
+            for n, person in enumerate(sponsors)
+        ]
+        for vote in bill.get("votes", []):
+            for option, value in vote.get("counts", {}).items():
+                vote["counts"][option] = max(0, int(value * rng.uniform(0.7, 1.3)))
+            vote["result"] = "pass" if rng.random() < 0.7 else "fail"
+        for version in bill.get("versions", []):
+            version["url"] = f"/documents/{i}.txt"
+        if bill.get("versions"):
+            # An amended version after the last, so there is something to diff
+            last = bill["versions"][-1]
+            bill["versions"].append({"url": f"/documents/{i}.txt?version=1", "note": "Amended",
+                                     "date": (last.get("date") or "2023-01-01")[:4] + "-12-31"})
+        bills.append(bill)
+    return bills
+
+
+def bill_text(index: int, size_kb: int, seed: int = 0, family_size: int = 5, version: int = 0) -> str:
+    """Synthetic bill text; bills in the same family share ~90% of their words
+
+    Each later `version` rewrites a few lines of the previous one and adds a section.
+    """
+    words_needed = max(50, size_kb * 1024 // 7)
+    family_rng = random.Random(f"{seed}-family-{index // family_size}")
+    words = [family_rng.choice(_WORDS) for _ in range(words_needed)]
+    rng = random.Random(f"{seed}-bill-{index}")
+    for position in rng.sample(range(words_needed), words_needed // 10):
+        words[position] = rng.choice(_WORDS)
+    lines = [" ".join(words[i:i + 12]) for i in range(0, words_needed, 12)]
+    sections = [f"SECTION 1. Bill {index}.\n" + "\n".join(lines)]
+    for amendment in range(1, version + 1):
+        rng = random.Random(f"{seed}-bill-{index}-version-{amendment}")
+        for position in rng.sample(range(len(lines)), max(1, len(lines) // 30)):
+            lines[position] = " ".join(rng.choices(_WORDS, k=12))
+        sections = [f"SECTION 1. Bill {index}.\n" + "\n".join(lines)] + sections[1:]
+        sections.append(f"SEC. {amendment + 1}. Amendment {amendment}.\n" + " ".join(rng.choices(_WORDS, k=60)))
+    return "\n".join(sections)
+
+
+class FakeOpenStatesServer:
+    """Threaded HTTP server answering /bills, /bills/{id} and /documents/{n}.txt like OpenStates v3"""
+
+    def __init__(self, bills: List[Dict[str, Any]], latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 rate_limit: float = 0.0, text_kb: int = 20, seed: int = 0):
+        self.bills = bills
+        self.by_id = {bill["id"]: bill for bill in bills}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.bucket = TokenBucket(rate_limit)
+        self.text_kb = text_kb
+        self.seed = seed
+        self.requests = 0
+        self.rate_limited = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """Start serving on a free local port and return the base URL"""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                fake._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-openstates", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _delay(self):
+        delay = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def _absolute(self, bill: Dict[str, Any]) -> Dict[str, Any]:
+        """Point relative document links at this server"""
+        bill = copy.deepcopy(bill)
+        for section in ("versions", "documents"):
+            for entry in bill.get(section, []):
+                if entry.get("url", "").startswith("/"):
+                    entry["url"] = self.base_url + entry["url"]
+        return bill
+
+    def _send(self, handler, status: int, body: bytes, content_type: str = "application/json", headers=None):
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def _handle(self, handler):
+        self.requests += 1
+        self._delay()
+        if not self.bucket.take():
+            self.rate_limited += 1
+            self._send(handler, 429, b'{"detail": "exceeded limit of requests per second"}', headers={"Retry-After": "1"})
+            return
+
+        url = urlparse(handler.path)
+        path = unquote(url.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if path == "/bills":
+            self._send(handler, 200, json.dumps(self._search(query)).encode())
+        elif path.startswith("/bills/"):
+            bill = self.by_id.get(path[len("/bills/"):])
+            if bill is None:
+                self._send(handler, 404, b'{"detail": "No such Bill"}')
+            else:
+                self._send(handler, 200, json.dumps(self._absolute(bill)).encode())
+        elif path == "/jurisdictions":
+            self._send(handler, 200, json.dumps(self._jurisdictions(query)).encode())
+        elif re.fullmatch(r"/documents/\d+\.txt", path):
+            index = int(path[len("/documents/"):-len(".txt")])
+            text = bill_text(index, self.text_kb, self.seed, version=int(query.get("version", 0)))
+            self._send(handler, 200, text.encode(), "text/plain")
+        else:
+            self._send(handler, 404, b'{"detail": "Not Found"}')
+
+    def _jurisdictions(self, query: Dict[str, str]) -> Dict[str, Any]:
+        """The corpus's jurisdictions; each bill's session is ongoing, and a 2019 session has ended"""
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for bill in self.bills:
+            jurisdiction = bill["jurisdiction"]
+            entry = sessions.setdefault(jurisdiction["id"], {
+                "id": jurisdiction["id"],
+                "name": jurisdiction["name"],
+                "classification": "country" if jurisdiction["id"].endswith("/country:us/government") else "state",
+                "legislative_sessions": [{"identifier": "2019", "name": "2019 Regular Session",
+                                          "start_date": "2019-01-01", "end_date": "2019-12-31"}],
+            })
+            if all(s["identifier"] != bill["session"] for s in entry["legislative_sessions"]):
+                entry["legislative_sessions"].append({"identifier": bill["session"], "name": f"Session {bill['session']}",
+                                                      "start_date": "2023-01-01", "end_date": ""})
+        jurisdictions = sorted(sessions.values(), key=lambda j: j["name"])
+
+        page = max(1, int(query.get("page", 1)))
+        per_page = max(1, int(query.get("per_page", 52)))
+        start = (page - 1) * per_page
+        return {
+            "results": jurisdictions[start:start + per_page],
+            "pagination": {"per_page": per_page, "page": page,
+                           "max_page": max(1, (len(jurisdictions) + per_page - 1) // per_page),
+                           "total_items": len(jurisdictions)},
+        }
+
+    def _search(self, query: Dict[str, str]) -> Dict[str, Any]:
+        matches = self.bills
+        if query.get("jurisdiction"):
+            wanted = query["jurisdiction"].lower()
+            matches = [b for b in matches if wanted in (b["jurisdiction"]["id"].lower(), b["jurisdiction"]["name"].lower())
+                       or b["jurisdiction"]["id"].lower().endswith(f"/country:{wanted}/government")
+                       or f"/state:{wanted}/" in b["jurisdiction"]["id"].lower()]
+        if query.get("session"):
+            matches = [b for b in matches if b.get("session") == query["session"]]
+        if query.get("q"):
+            term = query["q"].lower()
+            matches = [b for b in matches if term in b.get("title", "").lower()]
+
+        page = max(1, int(query.get("page", 1)))
+        per_page = max(1, int(query.get("per_page", 20)))
+        start = (page - 1) * per_page
+        results = []
+        for bill in matches[start:start + per_page]:
+            summary = {k: v for k, v in bill.items() if k not in ("actions", "versions", "votes", "documents")}
+            results.append(summary)
+        return {
+            "results": results,
+            "pagination": {
+                "per_page": per_page,
+                "page": page,
+                "max_page": max(1, (len(matches) + per_page - 1) // per_page),
+                "total_items": len(matches),
+            },
+        }
+
+
+class FakeRateLimitError(Exception):
+    """Raised by FakeAnthropic when its request rate is exceeded, carrying a 429 response"""
+
+    def __init__(self):
+        super().__init__("Error code: 429 - rate_limit_error")
+        self.response = SimpleNamespace(status_code=429)
+
+
+class FakeAnthropic:
+    """Drop-in for anthropic.Anthropic that answers messages.create locally
+
+    Latency is a fixed per-call cost plus a per-output-token cost, and usage
+    is estimated at four characters per token, like a real completion.
+    Prompt prefixes marked with cache_control are remembered and reported as
+    cache reads when sent again. messages.batches is a FakeMessageBatches.
+    """
+
+    def __init__(self, latency_ms: float = 0.0, ms_per_output_token: float = 0.0, rate_limit: float = 0.0,
+                 output_tokens: int = 300, seed: int = 0, batch_seconds: float = 0.0):
+        self.latency_ms = latency_ms
+        self.ms_per_output_token = ms_per_output_token
+        self.bucket = TokenBucket(rate_limit)
+        self.output_tokens = output_tokens
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self._cache = set()
+        self._cache_lock = threading.Lock()
+        self.batches = FakeMessageBatches(self, batch_seconds)
+        self.messages = SimpleNamespace(create=self._create, batches=self.batches)
+
+    def _create(self, model: str, max_tokens: int, messages: List[Dict[str, Any]], system: str = "", **kwargs):
+        self.calls += 1
+        if not self.bucket.take():
+            raise FakeRateLimitError()
+        response = self._respond(model, max_tokens, messages, system)
+
+        delay = self.latency_ms + response.usage.output_tokens * self.ms_per_output_token
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return response
+
+    def _respond(self, model: str, max_tokens: int, messages: List[Dict[str, Any]], system: Any = "", **kwargs):
+        """Build a completion for the request without any latency or rate limiting"""
+        blocks = [{"type": "text", "text": system}] if isinstance(system, str) else list(system)
+        for message in messages:
+            content = message.get("content", "")
+            blocks.extend([{"type": "text", "text": content}] if isinstance(content, str) else content)
+
+        # Prompt caching: the prompt up to the last cache_control marker is
+        # read from the cache if an identical prefix was sent before
+        cached_chars, prefix = 0, ""
+        for block in blocks:
+            prefix += block.get("text", "")
+            if block.get("cache_control"):
+                cached_chars = len(prefix)
+        cache_read = cache_write = 0
+        if cached_chars:
+            key = hash(prefix[:cached_chars])
+            with self._cache_lock:
+                if key in self._cache:
+                    cache_read = cached_chars // 4
+                else:
+                    self._cache.add(key)
+                    cache_write = cached_chars // 4
+
+        if "keyword" in str(messages[-1].get("content", "")).lower():
+            text = ", ".join(self.rng.sample(_WORDS, 8))
+        else:
+            words = [self.rng.choice(_WORDS) for _ in range(self.output_tokens * 3 // 4)]
+            text = " ".join(words).capitalize() + "."
+        output_tokens = min(max_tokens, max(1, len(text) // 4))
+        return SimpleNamespace(
+            id=f"msg_fake_{self.calls}",
+            model=model,
+            content=[SimpleNamespace(type="text", text=text)],
+            stop_reason="end_turn",
+            usage=SimpleNamespace(input_tokens=max(1, (len(prefix) - cached_chars) // 4), output_tokens=output_tokens,
+                                  cache_read_input_tokens=cache_read, cache_creation_input_tokens=cache_write),
+        )
+
+
+class FakeMessageBatches:
+    """Local stand-in for the Message Batches API (create, retrieve, list, results)
+
+    A batch reports "in_progress" until `batch_seconds` after it was created
+    and "ended" afterwards. Requests with a "fail" model error out, so
+    partial failures can be exercised.
+    """
+
+    def __init__(self, client: FakeAnthropic, batch_seconds: float = 0.0):
+        self.client = client
+        self.batch_seconds = batch_seconds
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def create(self, requests: List[Dict[str, Any]], **kwargs):
+        with self._lock:
+            batch_id = f"msgbatch_fake_{len(self.batches) + 1}"
+            self.batches[batch_id] = {"requests": list(requests), "created": time.monotonic(),
+                                      "created_at": datetime.now(timezone.utc)}
+        return self.retrieve(batch_id)
+
+    def retrieve(self, batch_id: str, **kwargs):
+        batch = self.batches[batch_id]
+        ended = time.monotonic() - batch["created"] >= self.batch_seconds
+        total = len(batch["requests"])
+        errored = sum(1 for request in batch["requests"] if request["params"].get("model") == "fail") if ended else 0
+        return SimpleNamespace(
+            id=batch_id,
+            type="message_batch",
+            created_at=batch["created_at"],
+            processing_status="ended" if ended else "in_progress",
+            request_counts=SimpleNamespace(processing=0 if ended else total, succeeded=total - errored if ended else 0,
+                                           errored=errored, canceled=0, expired=0),
+        )
+
+    def list(self, **kwargs):
+        """Every batch, most recently created first, like iterating the API's paginated list"""
+        return [self.retrieve(batch_id) for batch_id in reversed(list(self.batches))]
+
+    def results(self, batch_id: str, **kwargs):
+        if self.retrieve(batch_id).processing_status != "ended":
+            raise RuntimeError(f"Batch {batch_id} is still processing")
+        for request in self.batches[batch_id]["requests"]:
+            params = request["params"]
+            if params.get("model") == "fail":
+                result = SimpleNamespace(type="errored", error=SimpleNamespace(type="invalid_request_error"))
+            else:
+                result = SimpleNamespace(type="succeeded", message=self.client._respond(**params))
+            yield SimpleNamespace(custom_id=request["custom_id"], result=result)
@@ -0,0 +1,82 @@
+"""Latency benchmark for semantic search over synthetic corpora
+
+Writes a random unit-vector index of each size to a temporary directory and
+times SemanticIndex.search against it, so results reflect the memory-mapped
+batch scoring path without needing a real corpus.
+
+    python benchmarks/semantic_search.py --sizes 100000 1000000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.semantic import SemanticIndex, publish_version
+
+
+def write_synthetic_index(path: str, count: int, dim: int, terms: int = 20000):
+    """Write a random index with the same on-disk layout as build_semantic_index"""
+    rng = np.random.RandomState(0)
+    version_dir = os.path.join(path, "synthetic")
+    os.makedirs(version_dir)
+
+    vectors = np.lib.format.open_memmap(
+        os.path.join(version_dir, "vectors.npy"), mode="w+", dtype=np.float32, shape=(count, dim)
+    )
+    for start in range(0, count, 65536):
+        block = rng.standard_normal((min(65536, count - start), dim)).astype(np.float32)
+        vectors[start:start + len(block)] = block / np.linalg.norm(block, axis=1, keepdims=True)
+    vectors.flush()
+    del vectors
+
+    np.save(os.path.join(version_dir, "components.npy"), rng.standard_normal((terms, dim)).astype(np.float32))
+    with open(os.path.join(version_dir, "meta.json"), "w") as f:
+        json.dump({
+            "dim": dim,
+            "count": count,
+            "ids": [f"bill-{i}" for i in range(count)],
+            "terms": [f"term{i}" for i in range(terms)],
+            "idf": [1.0] * terms,
+        }, f)
+    publish_version(path, "synthetic")
+
+
+def run(sizes, dim: int, queries: int, limit: int):
+    """Print p50/p99 search latency for each corpus size"""
+    for count in sizes:
+        with tempfile.TemporaryDirectory() as path:
+            write_synthetic_index(path, count, dim)
+            index = SemanticIndex(path)
+            index.load()
+
+            rng = np.random.RandomState(1)
+            texts = [" ".join(f"term{t}" for t in rng.randint(0, 20000, size=4)) for _ in range(queries)]
+            index.search(texts[0], limit)  # Warm the page cache
+
+            timings = []
+            for text in texts:
+                started = time.perf_counter()
+                index.search(text, limit)
+                timings.append((time.perf_counter() - started) * 1000)
+
+            timings.sort()
+            p50 = timings[len(timings) // 2]
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(f"{count:>9} bills  dim={dim}  top-{limit}  p50={p50:.1f}ms  p99={p99:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark semantic search latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000],
+                      help="Corpus sizes to benchmark")
+    parser.add_argument("--dim", type=int, default=128, help="Vector dimensions")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per corpus size")
+    parser.add_argument("--limit", type=int, default=20, help="Results per query")
+
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.limit)
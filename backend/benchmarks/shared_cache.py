@@ -0,0 +1,132 @@
+"""Upstream calls per host with per-worker caches versus a shared cache
+
+Starts several worker processes, each importing the app's caches the way a
+uvicorn worker does, and has them fetch bill payloads, text and analyses
+for the same Zipf-distributed bills at the same time. Each cache backend is
+run in turn, with the caches emptied in between, and the benchmark reports how
+many OpenStates requests and Claude calls the host made and how long the
+workers took.
+
+    python benchmarks/shared_cache.py
+    python benchmarks/shared_cache.py --workers 8 --backends memory,sqlite,redis
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures
+from suite import percentile
+
+
+def worker(env, bill_ids, threads, claude_latency_ms, seed, start, results):
+    """One worker process: fetch every bill in `bill_ids` through the app's caches"""
+    os.environ.update(env)
+    from app.services import bill_content
+    from app.services.claude import claude_service
+    fake_claude = FakeAnthropic(claude_latency_ms, seed=seed)
+    claude_service.client = fake_claude
+
+    def fetch(bill_id):
+        started = time.perf_counter()
+        bill_content.get_bill_data(bill_id)
+        bill_content.get_bill_text(bill_id)
+        bill_content.get_bill_analysis(bill_id)
+        return (time.perf_counter() - started) * 1000
+
+    start.wait()
+    with ThreadPoolExecutor(threads) as pool:
+        latencies = list(pool.map(fetch, bill_ids))
+    results.put((fake_claude.calls, latencies))
+
+
+def run(backend, args, server, bill_ids, workdir):
+    """(OpenStates requests, Claude calls, latencies in ms) for one backend"""
+    env = {
+        "CACHE_BACKEND": backend,
+        "CACHE_PATH": os.path.join(workdir, f"{backend}-cache.db"),
+        "OPENSTATES_BASE_URL": server.base_url,
+        "OPENSTATES_API_KEY": "benchmark",
+        "ANTHROPIC_API_KEY": "benchmark",
+        "CLAUDE_TOKENS_PER_MINUTE": "0",
+        "TRACE_EXPORTER": "none",
+        "LOG_LEVEL": "ERROR",
+    }
+    if backend == "redis":
+        # Start from an empty cache, as the other backends do
+        os.environ.update(env)
+        from app.services.cache import RedisBackend
+        redis_backend = RedisBackend()
+        for name in ("openstates_bill", "bill_text", "bill_analysis"):
+            redis_backend.clear(name)
+
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    rng = random.Random(args.seed)
+    weights = [1.0 / (rank + 1) ** args.zipf for rank in range(len(bill_ids))]
+    processes = []
+    for index in range(args.workers):
+        traffic = rng.choices(bill_ids, weights, k=args.requests)
+        process = context.Process(
+            target=worker, args=(env, traffic, args.threads, args.claude_latency_ms, args.seed + index, start, results)
+        )
+        process.start()
+        processes.append(process)
+
+    before = server.requests
+    # Give every worker time to import the app before releasing them together
+    time.sleep(args.import_seconds)
+    start.set()
+    claude_calls, latencies = 0, []
+    for _ in processes:
+        calls, worker_latencies = results.get()
+        claude_calls += calls
+        latencies += worker_latencies
+    for process in processes:
+        process.join()
+    return server.requests - before, claude_calls, sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="concurrent requests per worker")
+    parser.add_argument("--bills", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=200, help="requests per worker")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Zipf exponent of bill popularity")
+    parser.add_argument("--text-kb", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="fake OpenStates latency per request")
+    parser.add_argument("--claude-latency-ms", type=float, default=300.0, help="fake Claude latency per call")
+    parser.add_argument("--backends", default="memory,sqlite", help="comma-separated CACHE_BACKEND values")
+    parser.add_argument("--import-seconds", type=float, default=3.0, help="time allowed for workers to start")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    bills = expand_fixtures(load_fixtures(), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, args.latency_ms, text_kb=args.text_kb, seed=args.seed)
+    server.start()
+    bill_ids = [bill["id"] for bill in bills]
+    random.Random(args.seed).shuffle(bill_ids)
+    workdir = tempfile.mkdtemp(prefix="legispal-shared-cache-")
+    print(f"{args.workers} workers x {args.requests} requests over {args.bills} bills, Zipf exponent {args.zipf}")
+    try:
+        for backend in args.backends.split(","):
+            openstates, claude, latencies = run(backend.strip(), args, server, bill_ids, workdir)
+            print(f"\n{backend}: {openstates} OpenStates requests, {claude} Claude calls")
+            print(f"  p50 {percentile(latencies, 0.5):>8.1f} ms  p99 {percentile(latencies, 0.99):>8.1f} ms")
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
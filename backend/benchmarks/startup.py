@@ -0,0 +1,166 @@
+"""Cold start of the API and of fetch_bills.py, in fresh interpreters
+
+Ingests a synthetic corpus once, then starts a new Python process for every
+trial and measures, in that process:
+
+- app: importing app.main, running the startup event, and the first
+  request for a stored bill
+- fetch_bills: importing fetch_bills, and fetching and storing the first bill
+  from the fake OpenStates server
+
+Medians over the trials are compared against a stored baseline, and the
+exit status is non-zero on a regression, like suite.py.
+
+    python benchmarks/startup.py                   # compare against benchmarks/startup_baseline.json
+    python benchmarks/startup.py --save-baseline   # record a new baseline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def measure_app(bill_id: str) -> Dict[str, float]:
+    """Import, startup and first-request times for the API, in this process"""
+    timings = {}
+    started = time.perf_counter()
+    from app.main import app
+    timings["app.import"] = _elapsed_ms(started)
+
+    from fastapi.testclient import TestClient
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = TestClient(app).__enter__()
+    timings["app.startup"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    client.get(f"/api/bills/{bill_id}").raise_for_status()
+    timings["app.first_request"] = _elapsed_ms(started)
+    client.__exit__(None, None, None)
+    return timings
+
+
+def measure_fetch_bills() -> Dict[str, float]:
+    """Import and first-bill times for fetch_bills.py, in this process"""
+    timings = {}
+    started = time.perf_counter()
+    import fetch_bills
+    timings["fetch_bills.import"] = _elapsed_ms(started)
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fetch_bills.fetch_bills(None, None, limit=1)
+    timings["fetch_bills.first_bill"] = _elapsed_ms(started)
+    return timings
+
+
+def run_child(kind: str, bill_id: str) -> Dict[str, float]:
+    """Time one cold start in a new interpreter, including the interpreter's own startup"""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", kind, "--bill-id", bill_id],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings[f"{kind}.process"] = _elapsed_ms(started)
+    return timings
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float, slack_ms: float) -> List[str]:
+    """Describe every timing that regressed beyond tolerance relative to the baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous * (1 + tolerance) + slack_ms
+        if current > limit:
+            regressions.append(f"{name}: {current:.1f} ms > {previous:.1f} ms (limit {limit:.1f})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trials", type=int, default=5, help="Fresh processes per measurement")
+    parser.add_argument("--bills", type=int, default=300, help="Synthetic bills to ingest")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="Allowed absolute slowdown before failing")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--child", choices=["app", "fetch_bills"], help=argparse.SUPPRESS)
+    parser.add_argument("--bill-id", type=str, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        # Runs inside the fresh interpreter; the parent has already set up the environment
+        timings = measure_app(args.bill_id) if args.child == "app" else measure_fetch_bills()
+        print(json.dumps(timings))
+        return 0
+
+    from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures
+    from suite import configure_environment, run_ingestion
+
+    args.cassette = None
+    args.analyze = False
+    bills = expand_fixtures(load_fixtures(), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="legispal-startup-")
+    samples: Dict[str, List[float]] = {}
+    try:
+        configure_environment(workdir, server.start(), args)
+        run_ingestion(args, FakeAnthropic(seed=args.seed))
+        print(f"Timing {args.trials} cold starts of each...")
+        for _ in range(args.trials):
+            for kind in ("app", "fetch_bills"):
+                for name, value in run_child(kind, bills[0]["id"]).items():
+                    samples.setdefault(name, []).append(value)
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {name: round(statistics.median(values), 2) for name, values in sorted(samples.items())}
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f).get("results", {})
+
+    print(f"{'measurement':<28}{'median ms':>12}{'min ms':>10}{'base ms':>10}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        base_text = f"{base:.1f}" if base is not None else "-"
+        print(f"{name:<28}{value:>12.1f}{min(samples[name]):>10.1f}{base_text:>10}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": {"bills": args.bills, "trials": args.trials}, "results": results}, f,
+                      indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance, args.slack_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
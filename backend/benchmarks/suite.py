@@ -0,0 +1,443 @@
+"""End-to-end benchmark suite against local OpenStates and Anthropic stand-ins
+
+Starts the fake OpenStates server, ingests a synthetic corpus with
+fetch_bills (Claude replaced by FakeAnthropic), then drives every /api route
+through the ASGI app and reports throughput and p50/p99 latency. Results are
+compared against a stored baseline and the exit status is non-zero on a
+regression, or if a hot query's plan stops using its index, so the suite
+can gate CI.
+
+    python benchmarks/suite.py                     # compare against benchmarks/baseline.json
+    python benchmarks/suite.py --save-baseline     # record a new baseline
+    python benchmarks/suite.py --latency-ms 50 --rate-limit 20 --routes search
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fakes import FakeOpenStatesServer, FakeAnthropic, load_fixtures, expand_fixtures, FIXTURE_PATH
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# API key that owns the watches registered before ingestion
+BENCHMARK_API_KEY = "benchmark"
+# API key that creates and deletes watches during the timed requests
+WRITER_API_KEY = "benchmark-writer"
+
+# Routes that are operational rather than user-facing and are not benchmarked
+EXCLUDED_PREFIXES = ("/api/admin",)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarize(latencies_ms: List[float], elapsed: float, statuses: Dict[Any, int]) -> Dict[str, Any]:
+    """p50/p99 latency in milliseconds and throughput in operations per second"""
+    values = sorted(latencies_ms)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "throughput": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+    }
+
+
+def configure_environment(workdir: str, base_url: str, args):
+    """Point the app at the fakes and a scratch database before it is imported"""
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "OPENSTATES_BASE_URL": base_url,
+        "OPENSTATES_API_KEY": "benchmark",
+        "ANTHROPIC_API_KEY": "benchmark",
+        "FETCH_BILL_DELAY": "0",
+        "FETCH_PAGE_DELAY": "0",
+        "ANALYTICS_CACHE_PATH": "",
+        "SEMANTIC_INDEX_PATH": os.path.join(workdir, "semantic_index"),
+        "CACHE_PATH": os.path.join(workdir, "cache.db"),
+        "TRACE_EXPORTER": "none",
+        "ADMIN_TOKEN": "",
+        "LOG_LEVEL": "ERROR",
+        # The fake Claude has no token quota; --claude-rate-limit models its limits instead
+        "CLAUDE_TOKENS_PER_MINUTE": "0",
+        # Background warming would add upstream calls during timed requests
+        "CACHE_WARM_INTERVAL": "0",
+    })
+    if args.cassette:
+        # Record from the fake server on the first run, replay at full speed afterwards
+        os.environ.update({
+            "OPENSTATES_CASSETTE_MODE": "replay_or_record",
+            "OPENSTATES_CASSETTE_PATH": os.path.abspath(args.cassette),
+            "OPENSTATES_REPLAY_LATENCY_MS": "0",
+        })
+
+
+def run_ingestion(args, fake_claude) -> Dict[str, Any]:
+    """Time fetch_bills over the fake corpus, per bill and overall"""
+    import fetch_bills
+    from app.database.init_db import init_database
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_database()
+
+    latencies = []
+    outcomes = {"stored": 0, "failed": 0}
+    original = fetch_bills.process_bill
+
+    def timed_process_bill(*a, **kw):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = original(*a, **kw)
+            return result
+        finally:
+            latencies.append((time.perf_counter() - started) * 1000)
+            outcomes["stored" if result is not None else "failed"] += 1
+
+    fetch_bills.process_bill = timed_process_bill
+    fetch_bills.claude_service.client = fake_claude
+    started = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetch_bills.fetch_bills(None, None, limit=args.bills, analyze=args.analyze, index_text=True)
+    finally:
+        fetch_bills.process_bill = original
+    return summarize(latencies, time.perf_counter() - started, outcomes)
+
+
+def register_watches(bills: List[Dict[str, Any]], count: int, seed: int):
+    """Saved searches of two title words each, plus a watch on the sample bill, under BENCHMARK_API_KEY
+
+    Registered before ingestion, so fetch_bills matches every logged change against them.
+    """
+    import random
+    from app.database.connection import SessionLocal
+    from app.database.init_db import init_database
+    from app.database.models import Watch
+    from app.services.watchlist import owner_key, search_words
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        init_database()
+    rng = random.Random(seed)
+    owner = owner_key(BENCHMARK_API_KEY)
+    watches = [Watch(owner=owner, bill_id=bills[0]["id"])]
+    for _ in range(count):
+        words = sorted(search_words(rng.choice(bills)["title"]))
+        watches.append(Watch(owner=owner, query=" ".join(rng.sample(words, min(2, len(words))))))
+    db = SessionLocal()
+    try:
+        db.add_all(watches)
+        db.commit()
+    finally:
+        db.close()
+
+
+def register_writer_watches(count: int) -> List[int]:
+    """Bill watches under WRITER_API_KEY for the delete scenario to remove, one per request"""
+    from app.database.connection import SessionLocal
+    from app.database.models import Watch
+    from app.services.watchlist import owner_key
+
+    owner = owner_key(WRITER_API_KEY)
+    watches = [Watch(owner=owner, bill_id=f"ocd-bill/benchmark-{n}") for n in range(count)]
+    db = SessionLocal()
+    try:
+        db.add_all(watches)
+        db.commit()
+        return [watch.id for watch in watches]
+    finally:
+        db.close()
+
+
+def build_semantic(workdir: str):
+    """Build the semantic index over the ingested bills so hybrid search is exercised"""
+    from app.database.connection import SessionLocal
+    from app.services.semantic import build_semantic_index
+    from build_semantic_index import bill_documents
+
+    db = SessionLocal()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_semantic_index(bill_documents(db), os.environ["SEMANTIC_INDEX_PATH"], dim=64)
+    finally:
+        db.close()
+
+
+def check_query_plans() -> List[str]:
+    """EXPLAIN the hot queries against the ingested corpus; problems count as regressions"""
+    from app.database.connection import SessionLocal
+    from check_query_plans import check_plans
+
+    db = SessionLocal()
+    try:
+        return check_plans(db)
+    finally:
+        db.close()
+
+
+def scenarios(sample: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """One request shape per /api route; `route` is the OpenAPI path template it exercises
+
+A case with `paths` sends each request to the next one in turn, for
+requests that can't be repeated, such as deleting a resource.
+"""
+    bill_id = sample["bill_id"]
+    person_id = sample["person_id"]
+    return [
+        {"name": "bills.list", "route": "/api/bills/", "method": "GET", "path": "/api/bills/?jurisdiction=us&per_page=20"},
+        {"name": "bills.search.keyword", "route": "/api/bills/search", "method": "GET",
+         "path": f"/api/bills/search?query={sample['word']}"},
+        {"name": "bills.search.identifier", "route": "/api/bills/search", "method": "GET",
+         "path": f"/api/bills/search?query={sample['identifier']}"},
+        {"name": "bills.search.hybrid", "route": "/api/bills/search", "method": "GET",
+         "path": f"/api/bills/search?query={sample['word']}&mode=hybrid"},
+        {"name": "bills.suggest", "route": "/api/bills/suggest", "method": "GET", "path": f"/api/bills/suggest?q={sample['word'][:3]}"},
+        {"name": "bills.get", "route": "/api/bills/{bill_id}", "method": "GET", "path": f"/api/bills/{bill_id}"},
+        {"name": "bills.batch", "route": "/api/bills/batch", "method": "POST", "path": "/api/bills/batch",
+         "json": {"ids": sample["page_ids"], "fields": ["title", "identifier", "session", "jurisdiction", "summary"]}},
+        {"name": "bills.export", "route": "/api/bills/export", "method": "GET", "path": "/api/bills/export"},
+        {"name": "bills.text", "route": "/api/bills/{bill_id}/text", "method": "GET", "path": f"/api/bills/{bill_id}/text"},
+        {"name": "bills.versions", "route": "/api/bills/{bill_id}/versions", "method": "GET",
+         "path": f"/api/bills/{bill_id}/versions"},
+        {"name": "bills.diff", "route": "/api/bills/{bill_id}/diff", "method": "GET", "path": f"/api/bills/{bill_id}/diff"},
+        {"name": "bills.analysis", "route": "/api/bills/{bill_id}/analysis", "method": "GET",
+         "path": f"/api/bills/{bill_id}/analysis"},
+        {"name": "bills.similar", "route": "/api/bills/{bill_id}/similar", "method": "GET",
+         "path": f"/api/bills/{bill_id}/similar?threshold=0.3"},
+        {"name": "chat", "route": "/api/chat/", "method": "POST", "path": "/api/chat/",
+         "json": {"bill_id": bill_id, "question": "What does this bill fund?"}},
+        {"name": "legislators.bills", "route": "/api/legislators/{person_id}/bills", "method": "GET",
+         "path": f"/api/legislators/{person_id}/bills"},
+        {"name": "legislators.collaborators", "route": "/api/legislators/{person_id}/collaborators", "method": "GET",
+         "path": f"/api/legislators/{person_id}/collaborators"},
+        {"name": "changes", "route": "/api/changes", "method": "GET", "path": "/api/changes?since=0&limit=100"},
+        {"name": "changes.watched", "route": "/api/changes", "method": "GET", "path": "/api/changes?since=0&limit=100",
+         "headers": {"X-API-Key": BENCHMARK_API_KEY}},
+        {"name": "watches.list", "route": "/api/watches", "method": "GET", "path": "/api/watches",
+         "headers": {"X-API-Key": BENCHMARK_API_KEY}},
+        {"name": "watches.create", "route": "/api/watches", "method": "POST", "path": "/api/watches",
+         "json": {"query": sample["word"]}, "headers": {"X-API-Key": WRITER_API_KEY}},
+        {"name": "watches.delete", "route": "/api/watches/{watch_id}", "method": "DELETE",
+         "paths": [f"/api/watches/{watch_id}" for watch_id in sample["watch_ids"]], "headers": {"X-API-Key": WRITER_API_KEY}},
+        {"name": "jurisdictions", "route": "/api/jurisdictions/", "method": "GET", "path": "/api/jurisdictions/"},
+        {"name": "jurisdictions.get", "route": "/api/jurisdictions/{jurisdiction}", "method": "GET",
+         "path": "/api/jurisdictions/ca"},
+        {"name": "analytics.votes", "route": "/api/analytics/votes", "method": "GET",
+         "path": "/api/analytics/votes?group_by=jurisdiction,chamber&parties=true"},
+        {"name": "analytics.votes.dated", "route": "/api/analytics/votes", "method": "GET",
+         "path": "/api/analytics/votes?group_by=session&since=2023-03-01"},
+    ]
+
+
+def check_coverage(app, cases: List[Dict[str, Any]]) -> List[str]:
+    """Return API routes that no scenario exercises"""
+    covered = {(case["method"], case["route"]) for case in cases}
+    missing = []
+    for path, operations in app.openapi()["paths"].items():
+        if not path.startswith("/api") or path.startswith(EXCLUDED_PREFIXES):
+            continue
+        for method in operations:
+            # Path converters such as {person_id:path} are reported without the converter
+            if (method.upper(), path) not in covered:
+                missing.append(f"{method.upper()} {path}")
+    return missing
+
+
+def run_case(client, case: Dict[str, Any], requests_per_route: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    """Issue the same request repeatedly and summarize latency, throughput and statuses"""
+    paths = iter(case["paths"]) if "paths" in case else None
+    paths_lock = threading.Lock()
+
+    def once() -> tuple:
+        if paths is None:
+            path = case["path"]
+        else:
+            with paths_lock:
+                path = next(paths)
+        started = time.perf_counter()
+        response = client.request(case["method"], path, json=case.get("json"), headers=case.get("headers"))
+        return (time.perf_counter() - started) * 1000, response.status_code
+
+    for _ in range(warmup):
+        once()
+
+    statuses: Dict[int, int] = {}
+    latencies = []
+    started = time.perf_counter()
+    if concurrency <= 1:
+        results = [once() for _ in range(requests_per_route)]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda _: once(), range(requests_per_route)))
+    elapsed = time.perf_counter() - started
+    for latency, status in results:
+        latencies.append(latency)
+        statuses[status] = statuses.get(status, 0) + 1
+    return summarize(latencies, elapsed, statuses)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, p99_tolerance: float,
+            slack_ms: float) -> List[str]:
+    """Describe every metric that regressed beyond tolerance relative to the baseline
+
+    p99 is estimated from few samples, so it gets its own, looser tolerance.
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, allowed in (("p50_ms", tolerance), ("p99_ms", p99_tolerance)):
+            limit = previous[metric] * (1 + allowed) + slack_ms
+            if current[metric] > limit:
+                regressions.append(f"{name} {metric}: {current[metric]:.2f} > {previous[metric]:.2f} (limit {limit:.2f})")
+        if previous["throughput"] and current["throughput"] < previous["throughput"] / (1 + tolerance) \
+                and current["p50_ms"] > previous["p50_ms"] + slack_ms:
+            regressions.append(f"{name} throughput: {current['throughput']:.1f}/s < {previous['throughput']:.1f}/s")
+        if set(current.get("statuses", {})) != set(previous.get("statuses", {})):
+            regressions.append(f"{name} statuses: {current.get('statuses')} != {previous.get('statuses')}")
+    return regressions
+
+
+def print_table(results: Dict[str, Any], baseline: Dict[str, Any]):
+    print(f"{'scenario':<28}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}{'ops/s':>10}{'base p50':>10}  statuses")
+    for name, row in results.items():
+        base = baseline.get(name, {}).get("p50_ms")
+        base_text = f"{base:.2f}" if base is not None else "-"
+        print(f"{name:<28}{row['count']:>6}{row['p50_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['throughput']:>10.1f}"
+              f"{base_text:>10}  {row['statuses']}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the API and ingestion against local fakes")
+    parser.add_argument("--bills", type=int, default=300, help="Synthetic bills to ingest")
+    parser.add_argument("--requests", type=int, default=100, help="Timed requests per scenario")
+    parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Concurrent clients per scenario")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Fake OpenStates latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random OpenStates latency")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fake OpenStates requests/second (0 = unlimited)")
+    parser.add_argument("--text-kb", type=int, default=20, help="Size of each bill text document")
+    parser.add_argument("--claude-latency-ms", type=float, default=20.0, help="Fake Claude latency per call")
+    parser.add_argument("--claude-ms-per-token", type=float, default=0.0, help="Fake Claude latency per output token")
+    parser.add_argument("--claude-rate-limit", type=float, default=0.0, help="Fake Claude calls/second (0 = unlimited)")
+    parser.add_argument("--analyze", action="store_true", help="Run Claude analysis during ingestion")
+    parser.add_argument("--watches", type=int, default=1000, help="Saved searches matched during ingestion")
+    parser.add_argument("--fixtures", type=str, default=FIXTURE_PATH, help="Recorded OpenStates bill payloads")
+    parser.add_argument("--cassette", type=str, help="Record OpenStates responses here, then replay them on later runs")
+    parser.add_argument("--routes", type=str, nargs="*", help="Only run scenarios whose name contains one of these")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative slowdown before failing")
+    parser.add_argument("--p99-tolerance", type=float, default=1.0, help="Allowed relative p99 slowdown before failing")
+    parser.add_argument("--slack-ms", type=float, default=1.0, help="Allowed absolute slowdown before failing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic corpus")
+    args = parser.parse_args(argv)
+
+    bills = expand_fixtures(load_fixtures(args.fixtures), args.bills, args.seed)
+    server = FakeOpenStatesServer(bills, args.latency_ms, args.jitter_ms, args.rate_limit, args.text_kb, args.seed)
+    fake_claude = FakeAnthropic(args.claude_latency_ms, args.claude_ms_per_token, args.claude_rate_limit, seed=args.seed)
+    workdir = tempfile.mkdtemp(prefix="legispal-bench-")
+    try:
+        configure_environment(workdir, server.start(), args)
+        results: Dict[str, Any] = {}
+
+        print(f"Ingesting {args.bills} bills from the fake OpenStates server...")
+        register_watches(bills, args.watches, args.seed)
+        results["ingest.fetch_bills"] = run_ingestion(args, fake_claude)
+        build_semantic(workdir)
+        plan_failures = check_query_plans()
+        watch_ids = register_writer_watches(args.warmup + args.requests)
+
+        from fastapi.testclient import TestClient
+        from app.main import app
+        from app.services.claude import claude_service
+        claude_service.client = fake_claude
+
+        sample = {
+            "bill_id": bills[0]["id"],
+            "identifier": bills[1]["identifier"].replace(" ", ""),
+            "person_id": bills[0]["sponsorships"][0]["person"]["id"],
+            "word": bills[0]["title"].split()[0].lower(),
+            "page_ids": [bill["id"] for bill in bills[:20]],
+            "watch_ids": watch_ids,
+        }
+        cases = scenarios(sample)
+        for route in check_coverage(app, cases):
+            print(f"warning: no benchmark scenario covers {route}")
+        if args.routes:
+            cases = [case for case in cases if any(part in case["name"] for part in args.routes)]
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            client = TestClient(app).__enter__()
+        # Move setup garbage (corpus, fixtures, indexes) out of the collector's
+        # view so full collections don't land on random timed requests
+        gc.collect()
+        gc.freeze()
+        try:
+            for case in cases:
+                results[case["name"]] = run_case(client, case, args.requests, args.concurrency, args.warmup)
+        finally:
+            client.__exit__(None, None, None)
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline = stored.get("results", {})
+        if stored.get("config") != _config(args):
+            print("note: baseline was recorded with different settings; comparisons may not be meaningful")
+
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"config": _config(args), "results": results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    regressions = [f"query plan {failure}" for failure in plan_failures]
+    regressions += compare(results, baseline, args.tolerance, args.p99_tolerance, args.slack_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+def _config(args) -> Dict[str, Any]:
+    """Settings that affect results, stored with the baseline"""
+    return {
+        "bills": args.bills,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "rate_limit": args.rate_limit,
+        "text_kb": args.text_kb,
+        "claude_latency_ms": args.claude_latency_ms,
+        "analyze": args.analyze,
+        "watches": args.watches,
+        "cassette": bool(args.cassette),
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main())
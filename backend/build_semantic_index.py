@@ -0,0 +1,56 @@
+import os
+import sys
+from collections import defaultdict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to the path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Import our app modules
+from app.database.connection import SessionLocal
+from app.database.models import Bill, Keyword, bill_keyword
+from app.services.semantic import build_semantic_index, SEMANTIC_INDEX_PATH
+
+
+def bill_documents(db):
+    """Return a callable yielding (bill_id, text) for every bill in the database
+
+    The text combines the title, abstract, AI summary and keywords.
+    """
+    keywords = defaultdict(list)
+    for bill_id, name in db.query(bill_keyword.c.bill_id, Keyword.name).join(
+        Keyword, Keyword.id == bill_keyword.c.keyword_id
+    ):
+        keywords[bill_id].append(name)
+
+    def documents():
+        rows = db.query(Bill.id, Bill.title, Bill.abstract, Bill.summary).yield_per(1000)
+        for bill_id, title, abstract, summary in rows:
+            parts = [title, abstract if abstract != title else None, summary, " ".join(keywords[bill_id])]
+            yield bill_id, " ".join(part for part in parts if part)
+
+    return documents
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the offline semantic search index")
+    parser.add_argument("--path", type=str, default=SEMANTIC_INDEX_PATH,
+                      help="Directory to write the index to")
+    parser.add_argument("--dim", type=int, default=128,
+                      help="Number of latent dimensions per bill vector")
+    parser.add_argument("--max-features", type=int, default=50000,
+                      help="Maximum vocabulary size")
+
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        build_semantic_index(bill_documents(db), args.path, dim=args.dim, max_features=args.max_features)
+    finally:
+        db.close()
@@ -1,54 +1,63 @@
 import sys
 sys.path.append('.')
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
 from app.database.connection import SessionLocal
 from app.database.models import Bill
 
-# Create database session
-db = SessionLocal()
-
-try:
-    # Count total bills
-    total_bills = db.query(Bill).count()
-    print(f"Total bills in database: {total_bills}")
-    
-    # Count US bills
-    us_bills = db.query(Bill).filter(Bill.jurisdiction_name == "United States").count()
-    print(f"US Congress bills: {us_bills}")
-    
-    # Count California bills
-    ca_bills = db.query(Bill).filter(Bill.jurisdiction_name == "California").count()
-    print(f"California bills: {ca_bills}")
-    
-    # Show sample of US bills
-    print("\nSample of US Congress bills:")
-    us_bill_samples = db.query(Bill).filter(Bill.jurisdiction_name == "United States").limit(5).all()
-    for bill in us_bill_samples:
-        print(f"Bill ID: {bill.identifier}, Session: {bill.session}")
-        print(f"Title: {bill.title[:100]}..." if len(bill.title) > 100 else f"Title: {bill.title}")
-        print(f"Abstract: {bill.abstract[:100]}..." if len(bill.abstract) > 100 else f"Abstract: {bill.abstract}")
-        print(f"Primary Sponsor: {bill.primary_sponsor_name}")
-        print(f"Actions: {len(bill.actions) if bill.actions else 0}")
-        print(f"Documents: {len(bill.documents) if bill.documents else 0}")
-        print(f"Votes: {len(bill.votes) if bill.votes else 0}")
-        print(f"Versions: {len(bill.versions) if bill.versions else 0}")
-        print(f"Summary: {'Yes' if bill.summary else 'No'}")
-        print("---")
-    
-    # Show sample of California bills if any
-    if ca_bills > 0:
-        print("\nSample of California bills:")
-        ca_bill_samples = db.query(Bill).filter(Bill.jurisdiction_name == "California").limit(5).all()
-        for bill in ca_bill_samples:
-            print(f"Bill ID: {bill.identifier}, Session: {bill.session}")
-            print(f"Title: {bill.title[:100]}..." if len(bill.title) > 100 else f"Title: {bill.title}")
-            print(f"Abstract: {bill.abstract[:100]}..." if len(bill.abstract) > 100 else f"Abstract: {bill.abstract}")
-            print(f"Primary Sponsor: {bill.primary_sponsor_name}")
-            print(f"Actions: {len(bill.actions) if bill.actions else 0}")
-            print(f"Documents: {len(bill.documents) if bill.documents else 0}")
-            print(f"Votes: {len(bill.votes) if bill.votes else 0}")
-            print(f"Versions: {len(bill.versions) if bill.versions else 0}")
-            print(f"Summary: {'Yes' if bill.summary else 'No'}")
-            print("---")
-
-finally:
-    db.close()
+# Jurisdictions are filtered by ID, which leads the (jurisdiction_id, session, updated_at) index
+JURISDICTIONS = [
+    ("US Congress", "ocd-jurisdiction/country:us/government"),
+    ("California", "ocd-jurisdiction/country:us/state:ca/government"),
+]
+
+# Only the columns printed below are loaded for the samples
+SAMPLE_COLUMNS = load_only(
+    Bill.identifier, Bill.session, Bill.title, Bill.abstract, Bill.primary_sponsor_name,
+    Bill.actions, Bill.documents, Bill.votes, Bill.versions, Bill.summary,
+)
+
+
+def count_bills(db, jurisdiction_id):
+    """Count a jurisdiction's bills with a COUNT(*) query rather than loading them"""
+    return db.query(func.count(Bill.id)).filter(Bill.jurisdiction_id == jurisdiction_id).scalar()
+
+
+def sample_bills(db, jurisdiction_id, limit=5):
+    return db.query(Bill).options(SAMPLE_COLUMNS).filter(Bill.jurisdiction_id == jurisdiction_id).limit(limit).all()
+
+
+def print_bill(bill):
+    print(f"Bill ID: {bill.identifier}, Session: {bill.session}")
+    print(f"Title: {bill.title[:100]}..." if len(bill.title) > 100 else f"Title: {bill.title}")
+    print(f"Abstract: {bill.abstract[:100]}..." if len(bill.abstract) > 100 else f"Abstract: {bill.abstract}")
+    print(f"Primary Sponsor: {bill.primary_sponsor_name}")
+    print(f"Actions: {len(bill.actions) if bill.actions else 0}")
+    print(f"Documents: {len(bill.documents) if bill.documents else 0}")
+    print(f"Votes: {len(bill.votes) if bill.votes else 0}")
+    print(f"Versions: {len(bill.versions) if bill.versions else 0}")
+    print(f"Summary: {'Yes' if bill.summary else 'No'}")
+    print("---")
+
+
+if __name__ == "__main__":
+    # Create database session
+    db = SessionLocal()
+
+    try:
+        total_bills = db.query(func.count(Bill.id)).scalar()
+        print(f"Total bills in database: {total_bills}")
+
+        counts = [(name, jurisdiction_id, count_bills(db, jurisdiction_id)) for name, jurisdiction_id in JURISDICTIONS]
+        for name, _, count in counts:
+            print(f"{name} bills: {count}")
+
+        # Show a sample of each jurisdiction's bills, if any
+        for name, jurisdiction_id, count in counts:
+            if count > 0:
+                print(f"\nSample of {name} bills:")
+                for bill in sample_bills(db, jurisdiction_id):
+                    print_bill(bill)
+
+    finally:
+        db.close()
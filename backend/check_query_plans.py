@@ -0,0 +1,165 @@
+"""Check that the API's hot queries are answered from indexes
+
+Runs each hot query through the code that issues it, captures the SQL it
+emits, and asks SQLite for the plan with EXPLAIN QUERY PLAN. A query fails if
+its plan scans a table row by row, or sorts a page that an index should
+already return in order. Exits non-zero on a failure, so it can gate a
+migration or CI run.
+
+    python check_query_plans.py
+    python check_query_plans.py --verbose
+"""
+import argparse
+import os
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to the path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.database.connection import SessionLocal, engine
+from app.database.init_db import check_database, SchemaOutOfDate
+from app.database.models import Bill, Sponsorship
+
+# A full pass over a table, as opposed to "SCAN bills USING INDEX ..." which walks an index in order
+TABLE_SCAN = re.compile(r"^SCAN (\w+)$")
+TEMP_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def sample_values(db: Session) -> Dict[str, Any]:
+    """Parameters for the hot queries, taken from stored data where there is any"""
+    bill = db.query(Bill).order_by(Bill.updated_at.desc()).first()
+    person_id = db.query(Sponsorship.person_id).limit(1).scalar()
+    if bill is None:
+        return {"bill": None, "bill_id": "missing", "identifier": "HB1", "session": "2025",
+                "jurisdiction_id": "ocd-jurisdiction/country:us/state:ca/government",
+                "person_id": person_id or "missing"}
+    return {"bill": bill, "bill_id": bill.id, "identifier": bill.identifier or "HB1",
+            "session": bill.session, "jurisdiction_id": bill.jurisdiction_id, "person_id": person_id or "missing"}
+
+
+def hot_queries() -> List[Tuple[str, Callable[[Session, Dict[str, Any]], Any], bool]]:
+    """(name, call, whether the page must come back in index order) for each hot query"""
+    from app.routers.bills import _stored_bills, _identifier_lookup
+    from app.services.sponsors import legislator_bills, top_collaborators
+    from app.services.batch_analysis import batch_analysis_service
+    from app.services.suggest import SuggestIndex
+    from app.services.popularity import cache_warmer
+    from app.services.watchlist import change_feed, list_watches
+    from check_db import count_bills, sample_bills
+
+    def bill_detail(db, sample):
+        bill = db.get(Bill, sample["bill_id"])
+        return bill.to_dict() if bill else None
+
+    def suggest_refresh(db, sample):
+        index = SuggestIndex()
+        if sample["bill"] is not None:
+            index.add_bill(sample["bill"])
+        # Seed the watermark so the incremental query is checked even on an empty database,
+        # where refresh would otherwise do the full build
+        if index._watermark is None:
+            index._watermark = datetime.utcnow()
+        index.refresh(db, force=True)
+
+    return [
+        ("stored bills", lambda db, s: _stored_bills(db, None, None, 1, 20), True),
+        ("stored bills by session", lambda db, s: _stored_bills(db, None, s["session"], 1, 20), True),
+        ("stored bills by jurisdiction and session",
+         lambda db, s: _stored_bills(db, s["jurisdiction_id"], s["session"], 1, 20), False),
+        ("identifier lookup",
+         lambda db, s: _identifier_lookup(db, s["identifier"], s["jurisdiction_id"], s["session"]), False),
+        ("bill detail", bill_detail, False),
+        ("legislator bills", lambda db, s: legislator_bills(db, s["person_id"]), False),
+        ("top collaborators", lambda db, s: top_collaborators(db, s["person_id"]), False),
+        ("pending analysis", lambda db, s: batch_analysis_service.pending_bills(db, 100), True),
+        ("suggest refresh", suggest_refresh, False),
+        ("cache warmer candidates", lambda db, s: cache_warmer.candidates(), True),
+        ("change feed", lambda db, s: change_feed(db, 0, 100), True),
+        ("watched change feed", lambda db, s: change_feed(db, 0, 100, "owner"), True),
+        ("watches", lambda db, s: list_watches(db, "owner"), True),
+        ("check_db bill count", lambda db, s: count_bills(db, s["jurisdiction_id"]), False),
+        ("check_db bill samples", lambda db, s: sample_bills(db, s["jurisdiction_id"]), False),
+    ]
+
+
+@contextmanager
+def capture_statements():
+    """Collect (statement, parameters) for every SELECT run on the engine"""
+    statements = []
+
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_execute)
+
+
+def explain(statement: str, parameters) -> List[str]:
+    """SQLite's query plan for a statement, one line per step"""
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[-1] for row in rows]
+
+
+def check_plans(db: Session, verbose: bool = False) -> List[str]:
+    """Run every hot query and describe each plan step that doesn't use an index"""
+    sample = sample_values(db)
+    failures = []
+    for name, call, ordered in hot_queries():
+        with capture_statements() as statements:
+            call(db, sample)
+        db.rollback()
+
+        for statement, parameters in statements:
+            plan = explain(statement, parameters)
+            if verbose:
+                print(f"{name}: {' '.join(statement.split())[:120]}")
+                for step in plan:
+                    print(f"    {step}")
+            for step in plan:
+                scan = TABLE_SCAN.match(step)
+                if scan:
+                    failures.append(f"{name}: full scan of {scan.group(1)}")
+                elif ordered and step == TEMP_SORT and " LIMIT " in statement:
+                    failures.append(f"{name}: page sorted in a temporary b-tree instead of read in index order")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the hot queries use indexes")
+    parser.add_argument("--verbose", action="store_true", help="Print every statement and its plan")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "sqlite":
+        print(f"Query plan checks run on SQLite; {engine.dialect.name} is not supported.")
+        sys.exit(0)
+    try:
+        check_database()
+    except SchemaOutOfDate as e:
+        print(e)
+        sys.exit(1)
+
+    db = SessionLocal()
+    try:
+        failures = check_plans(db, verbose=args.verbose)
+    finally:
+        db.close()
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"{len(hot_queries())} hot queries checked, {len(failures)} problems found.")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,66 @@
+"""Export stored bills, with keywords and summaries, as gzip JSONL or Parquet
+
+Bills are streamed from the database in batches and written as they are
+read, so memory use stays flat however many bills are exported.
+
+    python export_bills.py                                   # bills.jsonl.gz
+    python export_bills.py --format parquet --session 2025   # bills.parquet (needs pyarrow)
+    python export_bills.py --output - | gunzip | head
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add the current directory to the path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.export import EXPORT_BATCH_SIZE, FORMATS, ExportUnavailable, encode, iter_bill_batches
+
+
+class Counted:
+    """Passes batches through, counting the bills in them"""
+
+    def __init__(self, batches):
+        self.batches = batches
+        self.count = 0
+
+    def __iter__(self):
+        for rows in self.batches:
+            self.count += len(rows)
+            yield rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export stored bills as gzip JSONL or Parquet")
+    parser.add_argument("--format", choices=list(FORMATS), default="jsonl")
+    parser.add_argument("--output", type=str, help="File to write, or - for stdout (default bills.jsonl.gz or bills.parquet)")
+    parser.add_argument("--jurisdiction", type=str, help="Only bills with this jurisdiction ID")
+    parser.add_argument("--session", type=str, help="Only bills from this session")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only bills updated at or after this ISO time")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="Bills read and written at a time")
+    args = parser.parse_args()
+
+    bills = Counted(iter_bill_batches(args.jurisdiction, args.session, args.since, args.batch_size))
+    try:
+        # Fails here, before any file is created, if the format's library is missing
+        body = encode(args.format, bills)
+    except ExportUnavailable as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    path = args.output or FORMATS[args.format][1]
+    started = time.perf_counter()
+    if path == "-":
+        for chunk in body:
+            sys.stdout.buffer.write(chunk)
+    else:
+        with open(path, "wb") as f:
+            for chunk in body:
+                f.write(chunk)
+    print(f"Exported {bills.count} bills to {path} in {time.perf_counter() - started:.1f}s", file=sys.stderr)
@@ -1,6 +1,8 @@
 import os
 import sys
 import time
+from datetime import datetime
+from typing import List, Optional
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
@@ -16,6 +18,20 @@ from app.services.claude import claude_service
 from app.database.connection import SessionLocal
 from app.database.models import Bill, Keyword
 from app.models.bill import BillSearchParams
+from app.services.identifiers import normalize_identifier
+from app.services.similarity import store_signature
+from app.services.sponsors import update_sponsorships
+from app.services.watchlist import record_changes, match_pending
+from app.services.jurisdictions import jurisdiction_metadata
+
+# Pauses between bills and pages to stay under the OpenStates rate limit
+BILL_DELAY = float(os.getenv("FETCH_BILL_DELAY", "2"))
+PAGE_DELAY = float(os.getenv("FETCH_PAGE_DELAY", "5"))
+
+
+def _plain(items):
+    """Convert nested pydantic models to dicts so they can be stored in JSON columns"""
+    return [item.dict() if hasattr(item, "dict") else item for item in items]
 
 
 def get_or_create_keyword(db: Session, name: str):
@@ -29,7 +45,8 @@ def get_or_create_keyword(db: Session, name: str):
     return keyword
 
 
-def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: int = 0, max_retries: int = 3):
+def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: int = 0, max_retries: int = 3,
+                 index_text: bool = False):
     """Fetch a bill from OpenStates, analyze it with Claude, and store in database
     
     Args:
@@ -38,6 +55,7 @@ def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: i
         analyze: Whether to analyze the bill with Claude
         retry_count: Current retry attempt
         max_retries: Maximum number of retry attempts
+        index_text: Fetch the bill text for similarity indexing even when not analyzing
     """
     try:
         print(f"Processing bill {bill_id}...")
@@ -57,16 +75,24 @@ def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: i
                 wait_time = 2 ** retry_count * 5  # 5, 10, 20 seconds
                 print(f"Rate limit hit. Waiting {wait_time} seconds before retry {retry_count + 1}/{max_retries}...")
                 time.sleep(wait_time)
-                return process_bill(db, bill_id, analyze, retry_count + 1, max_retries)
+                return process_bill(db, bill_id, analyze, retry_count + 1, max_retries, index_text=index_text)
             else:
                 raise
         
+        # Log new actions, votes and versions for the change feed, committed with the bill
+        record_changes(db, bill_model.id, existing_bill, {
+            "actions": _plain(bill_model.actions),
+            "votes": _plain(bill_model.votes),
+            "versions": _plain(bill_model.versions),
+        })
+        
         # Create or update bill record
         if not existing_bill:
             existing_bill = Bill(
                 id=bill_model.id,
                 title=bill_model.title,
                 identifier=bill_model.identifier,
+                identifier_normalized=normalize_identifier(bill_model.identifier),
                 classification=bill_model.classification,
                 subject=bill_model.subject,
                 abstract=bill_model.abstract,
@@ -75,16 +101,17 @@ def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: i
                 jurisdiction_id=bill_model.jurisdiction.id,
                 primary_sponsor_name=bill_model.primary_sponsor.name if bill_model.primary_sponsor else None,
                 primary_sponsor_id=bill_model.primary_sponsor.id if bill_model.primary_sponsor else None,
-                actions=bill_model.actions,
-                documents=bill_model.documents,
-                votes=bill_model.votes,
-                versions=bill_model.versions,
+                actions=_plain(bill_model.actions),
+                documents=_plain(bill_model.documents),
+                votes=_plain(bill_model.votes),
+                versions=_plain(bill_model.versions),
             )
             db.add(existing_bill)
         else:
             # Update existing bill
             existing_bill.title = bill_model.title
             existing_bill.identifier = bill_model.identifier
+            existing_bill.identifier_normalized = normalize_identifier(bill_model.identifier)
             existing_bill.classification = bill_model.classification
             existing_bill.subject = bill_model.subject
             existing_bill.abstract = bill_model.abstract
@@ -93,27 +120,44 @@ def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: i
             existing_bill.jurisdiction_id = bill_model.jurisdiction.id
             existing_bill.primary_sponsor_name = bill_model.primary_sponsor.name if bill_model.primary_sponsor else None
             existing_bill.primary_sponsor_id = bill_model.primary_sponsor.id if bill_model.primary_sponsor else None
-            existing_bill.actions = bill_model.actions
-            existing_bill.documents = bill_model.documents
-            existing_bill.votes = bill_model.votes
-            existing_bill.versions = bill_model.versions
+            existing_bill.actions = _plain(bill_model.actions)
+            existing_bill.documents = _plain(bill_model.documents)
+            existing_bill.votes = _plain(bill_model.votes)
+            existing_bill.versions = _plain(bill_model.versions)
+            existing_bill.updated_at = datetime.utcnow()
         
         # Generate abstract if not available
         if existing_bill.abstract == "No abstract available" and len(existing_bill.title) > 10:
             # Use the title as a simple abstract if it's substantial
             existing_bill.abstract = existing_bill.title
         
+        # Record every sponsor and update the co-sponsorship graph
+        update_sponsorships(db, bill_model.id, bill_model.sponsors)
+        
         # Commit changes to database
         db.commit()
         db.refresh(existing_bill)
         
+        # Fetch the bill text once if it is needed for analysis or similarity indexing
+        bill_text = None
+        if analyze or index_text:
+            try:
+                bill_text = openstates_service.get_bill_text(bill_id)
+            except Exception as e:
+                print(f"Error fetching text for bill {bill_id}: {str(e)}")
+        has_text = bool(bill_text) and bill_text not in ("Bill text not available", "Bill text URL not available")
+        
+        # Index the text for similar-bill detection whenever we have it
+        if has_text:
+            try:
+                store_signature(db, bill_id, bill_text)
+            except Exception as e:
+                print(f"Error indexing text for bill {bill_id}: {str(e)}")
+        
         # If analyze flag is set, perform AI analysis with Claude
         if analyze:
             try:
-                # Get bill text
-                bill_text = openstates_service.get_bill_text(bill_id)
-                
-                if bill_text and bill_text != "Bill text not available":
+                if has_text:
                     print(f"Analyzing bill {bill_id} with Claude...")
                     
                     # Generate summary and keywords
@@ -141,17 +185,55 @@ def process_bill(db: Session, bill_id: str, analyze: bool = True, retry_count: i
         return existing_bill
     except Exception as e:
         print(f"Error processing bill {bill_id}: {str(e)}")
+        # Discard the failed flush so the session can process the next bill
+        db.rollback()
         return None
 
 
-def fetch_bills(jurisdiction: str = "us", session: str = "118", limit: int = None, analyze: bool = False):
+def match_watches(db: Session):
+    """Match newly logged changes against watched bills and saved searches"""
+    try:
+        matched = match_pending(db)
+        if matched:
+            print(f"Matched {matched} changes to watchers.")
+    except Exception as e:
+        print(f"Error matching changes to watches: {str(e)}")
+        db.rollback()
+
+
+def sessions_to_fetch(db: Session, jurisdiction: Optional[str], session: Optional[str]) -> List[Optional[str]]:
+    """The given session, or else every active session of the jurisdiction from the metadata cache
+    
+    The metadata is only fetched from OpenStates when it is missing or older
+    than JURISDICTION_TTL. Without a jurisdiction, or if its sessions can't be
+    found, bills are fetched without a session filter.
+    """
+    if session or not jurisdiction:
+        return [session]
+    try:
+        jurisdiction_metadata.ensure(db, background=False)
+    except Exception as e:
+        print(f"Error refreshing jurisdiction metadata, using what is stored: {str(e)}")
+        db.rollback()
+    sessions = jurisdiction_metadata.active_sessions(jurisdiction)
+    if not sessions:
+        print(f"No active sessions found for {jurisdiction}; fetching bills from every session.")
+        return [None]
+    print(f"Active sessions for {jurisdiction}: {', '.join(sessions)}")
+    return sessions
+
+
+def fetch_bills(jurisdiction: str = "us", session: Optional[str] = None, limit: int = None, analyze: bool = False,
+                index_text: bool = False):
     """Fetch bills from OpenStates and process them
     
     Args:
         jurisdiction: Jurisdiction code (e.g., 'us' for federal, 'ca' for California)
-        session: Legislative session (e.g., '118' for 118th Congress, '20232024' for CA 2023-2024)
+        session: Legislative session (e.g., '118' for 118th Congress, '20232024' for CA 2023-2024);
+            every active session of the jurisdiction if omitted
         limit: Maximum number of bills to fetch (None for all bills)
         analyze: Whether to analyze bills with Claude AI
+        index_text: Whether to fetch bill text for similar-bill detection
     """
     try:
         # Create database session
@@ -160,70 +242,76 @@ def fetch_bills(jurisdiction: str = "us", session: str = "118", limit: int = Non
         try:
             # Initialize counters and pagination
             bills_processed = 0
-            page = 1
             per_page = 20  # OpenStates API typically uses 20 items per page
-            more_results = True
             retry_count = 0
             max_retries = 3
             
-            print(f"Fetching bills from {jurisdiction} for session {session}...")
+            for session in sessions_to_fetch(db, jurisdiction, session):
+                print(f"Fetching bills from {jurisdiction} for session {session}...")
             
-            # Continue fetching until we've processed all bills or reached the limit
-            while more_results and (limit is None or bills_processed < limit):
-                try:
-                    # Create search parameters for current page
-                    search_params = BillSearchParams(
-                        jurisdiction=jurisdiction,
-                        session=session,
-                        page=page,
-                        per_page=per_page
-                    )
+                page = 1
+                more_results = True
+                
+                # Continue fetching until we've processed all bills or reached the limit
+                while more_results and (limit is None or bills_processed < limit):
+                    try:
+                        # Create search parameters for current page
+                        search_params = BillSearchParams(
+                            jurisdiction=jurisdiction,
+                            session=session,
+                            page=page,
+                            per_page=per_page
+                        )
                     
-                    # Fetch bills from OpenStates
-                    print(f"Fetching page {page}...")
-                    result = openstates_service.search_bills(search_params)
+                        # Fetch bills from OpenStates
+                        print(f"Fetching page {page}...")
+                        result = openstates_service.search_bills(search_params)
                     
-                    # Reset retry counter on successful request
-                    retry_count = 0
+                        # Reset retry counter on successful request
+                        retry_count = 0
                     
-                    # Process each bill on the current page
-                    results = result.get("results", [])
-                    if not results:
-                        more_results = False
-                        break
+                        # Process each bill on the current page
+                        results = result.get("results", [])
+                        if not results:
+                            more_results = False
+                            break
                         
-                    print(f"Found {len(results)} bills on page {page}")
+                        print(f"Found {len(results)} bills on page {page}")
                     
-                    for bill_data in results:
-                        bill_id = bill_data.get("id")
-                        if bill_id:
-                            process_bill(db, bill_id, analyze)
-                            bills_processed += 1
+                        for bill_data in results:
+                            bill_id = bill_data.get("id")
+                            if bill_id:
+                                process_bill(db, bill_id, analyze, index_text=index_text)
+                                bills_processed += 1
                             
-                            # Check if we've reached the limit
-                            if limit is not None and bills_processed >= limit:
-                                break
+                                # Check if we've reached the limit
+                                if limit is not None and bills_processed >= limit:
+                                    break
                             
-                            # Add a small delay to avoid rate limiting
-                            time.sleep(2)  # Increased delay to reduce rate limiting
+                                # Add a small delay to avoid rate limiting
+                                time.sleep(BILL_DELAY)
+                    
+                        # Match this page's changes against every watch in one pass
+                        match_watches(db)
                     
-                    # Move to next page
-                    page += 1
-                    print(f"Processed {bills_processed} bills so far...")
+                        # Move to next page
+                        page += 1
+                        print(f"Processed {bills_processed} bills so far...")
                     
-                    # Add a delay between pages to avoid rate limiting
-                    time.sleep(5)
+                        # Add a delay between pages to avoid rate limiting
+                        time.sleep(PAGE_DELAY)
                     
-                except Exception as e:
-                    if "429" in str(e) and retry_count < max_retries:
-                        # Rate limit hit, wait and retry with exponential backoff
-                        retry_count += 1
-                        wait_time = 2 ** retry_count * 10  # 20, 40, 80 seconds
-                        print(f"Rate limit hit. Waiting {wait_time} seconds before retry {retry_count}/{max_retries}...")
-                        time.sleep(wait_time)
-                    else:
-                        raise
+                    except Exception as e:
+                        if "429" in str(e) and retry_count < max_retries:
+                            # Rate limit hit, wait and retry with exponential backoff
+                            retry_count += 1
+                            wait_time = 2 ** retry_count * 10  # 20, 40, 80 seconds
+                            print(f"Rate limit hit. Waiting {wait_time} seconds before retry {retry_count}/{max_retries}...")
+                            time.sleep(wait_time)
+                        else:
+                            raise
             
+            match_watches(db)
             print(f"Completed processing {bills_processed} bills.")
         finally:
             db.close()
@@ -238,15 +326,18 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fetch and process bills from OpenStates")
     parser.add_argument("--jurisdiction", type=str, default="us", 
                       help="Jurisdiction ID (e.g., 'us' for federal Congress, 'ca' for California)")
-    parser.add_argument("--session", type=str, default="118", 
-                      help="Legislative session (e.g., '118' for 118th Congress, '20232024' for CA 2023-2024)")
+    parser.add_argument("--session", type=str, default=None, 
+                      help="Legislative session (e.g., '118' for 118th Congress, '20232024' for CA 2023-2024); "
+                           "every active session of the jurisdiction if omitted")
     parser.add_argument("--limit", type=int, default=10, 
                       help="Maximum number of bills to fetch (use 0 for all bills)")
     parser.add_argument("--analyze", action="store_true", 
                       help="Analyze bills with Claude AI (requires ANTHROPIC_API_KEY)")
+    parser.add_argument("--similarity", action="store_true",
+                      help="Fetch bill text and index it for similar-bill detection")
     
     args = parser.parse_args()
     
     # Fetch bills (convert limit=0 to None for fetching all bills)
     limit = None if args.limit == 0 else args.limit
-    fetch_bills(args.jurisdiction, args.session, limit, args.analyze)
+    fetch_bills(args.jurisdiction, args.session, limit, args.analyze, args.similarity)
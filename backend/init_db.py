@@ -8,15 +8,12 @@ load_dotenv()
 # Add the current directory to the path so we can import our app modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import database models and connection
-from app.database.connection import Base, engine
-from app.database.models import Bill, Keyword  # Import all models
+from app.database.init_db import init_database
 
-# Create all tables
+# Create the database, or upgrade it to the latest migration
 def init_db():
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("Database tables created successfully")
+    print("Migrating database...")
+    init_database()
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,48 @@
+from logging.config import fileConfig
+from alembic import context
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.database.connection import engine, Base, DATABASE_URL
+from app.database import models  # noqa: F401 - registers every table on Base.metadata
+
+config = context.config
+
+# The app configures its own logging when it runs migrations at startup
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Emit the migration SQL instead of running it (alembic upgrade head --sql)"""
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True,
+                      render_as_batch=DATABASE_URL.startswith("sqlite"))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Run migrations on the app's engine, so SQLite connections get the same pragmas"""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+    with engine.connect() as connection:
+        _run(connection)
+
+
+def _run(connection):
+    # SQLite can't alter most table definitions in place; batch mode copies the table instead
+    context.configure(connection=connection, target_metadata=target_metadata,
+                      render_as_batch=connection.dialect.name == "sqlite")
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,175 @@
+"""Baseline schema, as created by create_all before migrations
+
+Databases created before migrations existed have some or all of these tables
+with no alembic_version, so every table, column and index is only created if
+it is missing. That adopts such a database instead of failing on it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tables(metadata: sa.MetaData):
+    """The tables as of this revision, independent of later changes to the models"""
+    sa.Table(
+        "bills", metadata,
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("title", sa.String),
+        sa.Column("identifier", sa.String),
+        sa.Column("identifier_normalized", sa.String, nullable=True),
+        sa.Column("classification", sa.JSON),
+        sa.Column("subject", sa.JSON),
+        sa.Column("abstract", sa.Text),
+        sa.Column("session", sa.String),
+        sa.Column("jurisdiction_name", sa.String),
+        sa.Column("jurisdiction_id", sa.String),
+        sa.Column("primary_sponsor_name", sa.String, nullable=True),
+        sa.Column("primary_sponsor_id", sa.String, nullable=True),
+        sa.Column("actions", sa.JSON),
+        sa.Column("documents", sa.JSON),
+        sa.Column("votes", sa.JSON),
+        sa.Column("versions", sa.JSON),
+        sa.Column("updated_at", sa.DateTime),
+        sa.Column("summary", sa.Text, nullable=True),
+        sa.Column("ai_analysis", sa.Text, nullable=True),
+        sa.Index("ix_bills_id", "id"),
+        sa.Index("ix_bills_title", "title"),
+        sa.Index("ix_bills_identifier", "identifier"),
+        sa.Index("ix_bills_session", "session"),
+        sa.Index("ix_bills_jurisdiction_name", "jurisdiction_name"),
+        sa.Index("ix_bills_jurisdiction_id", "jurisdiction_id"),
+        sa.Index("ix_bills_primary_sponsor_id", "primary_sponsor_id"),
+        sa.Index("ix_bills_identifier_lookup", "identifier_normalized", "jurisdiction_id", "session"),
+    )
+    sa.Table(
+        "keywords", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String),
+        sa.Index("ix_keywords_id", "id"),
+        sa.Index("ix_keywords_name", "name", unique=True),
+    )
+    sa.Table(
+        "bill_keyword", metadata,
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id")),
+        sa.Column("keyword_id", sa.Integer, sa.ForeignKey("keywords.id")),
+    )
+    sa.Table(
+        "chat_history", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id")),
+        sa.Column("question", sa.Text),
+        sa.Column("answer", sa.Text),
+        sa.Column("created_at", sa.DateTime),
+        sa.Index("ix_chat_history_id", "id"),
+        sa.Index("ix_chat_history_bill_id", "bill_id"),
+    )
+    sa.Table(
+        "bill_signatures", metadata,
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id"), primary_key=True),
+        sa.Column("signature", sa.LargeBinary),
+        sa.Column("shingle_count", sa.Integer),
+        sa.Column("updated_at", sa.DateTime),
+        sa.Index("ix_bill_signatures_updated_at", "updated_at"),
+    )
+    sa.Table(
+        "sponsorships", metadata,
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id")),
+        sa.Column("person_id", sa.String),
+        sa.Column("name", sa.String),
+        sa.Column("classification", sa.String, nullable=True),
+        sa.Column("primary", sa.Boolean),
+        sa.Index("ix_sponsorships_bill_id", "bill_id"),
+        sa.Index("ix_sponsorships_person_bill", "person_id", "bill_id"),
+    )
+    sa.Table(
+        "cosponsorships", metadata,
+        sa.Column("person_id", sa.String, primary_key=True),
+        sa.Column("collaborator_id", sa.String, primary_key=True),
+        sa.Column("bill_count", sa.Integer),
+        sa.Index("ix_cosponsorships_person_count", "person_id", "bill_count"),
+    )
+    sa.Table(
+        "analysis_batches", metadata,
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("remote_id", sa.String, nullable=True, unique=True),
+        sa.Column("status", sa.String),
+        sa.Column("request_count", sa.Integer),
+        sa.Column("created_at", sa.DateTime),
+        sa.Column("applied_at", sa.DateTime, nullable=True),
+        sa.Index("ix_analysis_batches_status", "status"),
+    )
+    sa.Table(
+        "analysis_requests", metadata,
+        sa.Column("batch_id", sa.String, sa.ForeignKey("analysis_batches.id"), primary_key=True),
+        sa.Column("custom_id", sa.String, primary_key=True),
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id")),
+        sa.Column("kind", sa.String),
+        sa.Column("status", sa.String),
+        sa.Index("ix_analysis_requests_bill_id", "bill_id"),
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    metadata = sa.MetaData()
+    _tables(metadata)
+
+    inspector = sa.inspect(bind)
+    existing = set(inspector.get_table_names())
+    if "bills" in existing:
+        columns = {column["name"] for column in inspector.get_columns("bills")}
+        if "identifier_normalized" not in columns:
+            op.add_column("bills", sa.Column("identifier_normalized", sa.String, nullable=True))
+            _backfill_identifiers(bind)
+
+    # Creates missing tables, and missing indexes on tables that already exist
+    metadata.create_all(bind=bind, checkfirst=True)
+    for table in metadata.sorted_tables:
+        if table.name in existing:
+            for index in table.indexes:
+                index.create(bind=bind, checkfirst=True)
+
+    _backfill_sponsorships(bind)
+
+
+def _backfill_identifiers(bind):
+    """Populate identifier_normalized for bills stored before the column existed"""
+    from app.services.identifiers import normalize_identifier
+
+    rows = bind.execute(sa.text("SELECT id, identifier FROM bills")).all()
+    if rows:
+        bind.execute(
+            sa.text("UPDATE bills SET identifier_normalized = :normalized WHERE id = :id"),
+            [{"id": bill_id, "normalized": normalize_identifier(identifier)} for bill_id, identifier in rows],
+        )
+    print(f"Backfilled normalized identifiers for {len(rows)} bills.")
+
+
+def _backfill_sponsorships(bind):
+    """Sponsorship rows for bills stored before every sponsor was kept"""
+    from app.services.sponsors import backfill_primary_sponsors
+
+    # The session joins the migration's transaction, so its commit doesn't end it
+    db = Session(bind=bind)
+    try:
+        backfilled = backfill_primary_sponsors(db)
+    finally:
+        db.close()
+    if backfilled:
+        print(f"Backfilled primary sponsorships for {backfilled} bills.")
+
+
+def downgrade():
+    metadata = sa.MetaData()
+    _tables(metadata)
+    metadata.drop_all(bind=op.get_bind())
@@ -0,0 +1,73 @@
+"""Composite and covering indexes for the queries the app actually runs
+
+Replaces single-column indexes that no query uses on its own (title,
+identifier, jurisdiction_name, primary_sponsor_id, and duplicates of primary
+keys) with indexes shaped like the hot queries:
+
+- stored bill listings: jurisdiction and session filters, newest first
+- index refreshes and unfiltered listings: updated_at ranges and order
+- pending batch analysis: bills with no summary, newest first
+- a legislator's bills with their role, and a bill's keywords, from the index alone
+- failed and open analysis requests per bill
+
+`python check_query_plans.py` checks that these queries use them.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+UNSUMMARIZED = sa.text("summary IS NULL")
+
+# (index, table, columns) dropped by this revision and restored by its downgrade
+REPLACED = [
+    ("ix_bills_id", "bills", ["id"]),
+    ("ix_bills_title", "bills", ["title"]),
+    ("ix_bills_identifier", "bills", ["identifier"]),
+    ("ix_bills_session", "bills", ["session"]),
+    ("ix_bills_jurisdiction_name", "bills", ["jurisdiction_name"]),
+    ("ix_bills_jurisdiction_id", "bills", ["jurisdiction_id"]),
+    ("ix_bills_primary_sponsor_id", "bills", ["primary_sponsor_id"]),
+    ("ix_keywords_id", "keywords", ["id"]),
+    ("ix_chat_history_id", "chat_history", ["id"]),
+    ("ix_sponsorships_person_bill", "sponsorships", ["person_id", "bill_id"]),
+    ("ix_analysis_requests_bill_id", "analysis_requests", ["bill_id"]),
+]
+
+
+def upgrade():
+    for name, table, _ in REPLACED:
+        op.drop_index(name, table_name=table)
+
+    op.create_index("ix_bills_jurisdiction_session_updated", "bills", ["jurisdiction_id", "session", "updated_at"])
+    op.create_index("ix_bills_session_updated", "bills", ["session", "updated_at"])
+    op.create_index("ix_bills_updated_at", "bills", ["updated_at"])
+    op.create_index("ix_bills_unsummarized", "bills", ["updated_at"],
+                    sqlite_where=UNSUMMARIZED, postgresql_where=UNSUMMARIZED)
+    op.create_index("ix_bill_keyword_bill", "bill_keyword", ["bill_id", "keyword_id"])
+    op.create_index("ix_bill_keyword_keyword", "bill_keyword", ["keyword_id", "bill_id"])
+    op.create_index("ix_sponsorships_person_bill", "sponsorships", ["person_id", "bill_id", "primary", "classification"])
+    op.create_index("ix_analysis_requests_kind_bill", "analysis_requests", ["kind", "bill_id", "status"])
+    op.create_index("ix_analysis_requests_batch_bill", "analysis_requests", ["batch_id", "bill_id"])
+
+
+def downgrade():
+    op.drop_index("ix_analysis_requests_batch_bill", table_name="analysis_requests")
+    op.drop_index("ix_analysis_requests_kind_bill", table_name="analysis_requests")
+    op.drop_index("ix_sponsorships_person_bill", table_name="sponsorships")
+    op.drop_index("ix_bill_keyword_keyword", table_name="bill_keyword")
+    op.drop_index("ix_bill_keyword_bill", table_name="bill_keyword")
+    op.drop_index("ix_bills_unsummarized", table_name="bills")
+    op.drop_index("ix_bills_updated_at", table_name="bills")
+    op.drop_index("ix_bills_session_updated", table_name="bills")
+    op.drop_index("ix_bills_jurisdiction_session_updated", table_name="bills")
+
+    for name, table, columns in REPLACED:
+        op.create_index(name, table, columns)
@@ -0,0 +1,68 @@
+"""Change log, watches and watch matches for the change feed
+
+- bill_changes: append-only log of new bills, actions, votes and versions
+  found at ingest; its ID is the feed cursor
+- watches: bills and saved searches registered per API key
+- watch_matches: changes that matched each owner's watches, keyed for the
+  owner's feed
+- change_watermarks: the last change the watch matcher has read
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "bill_changes",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("bill_id", sa.String, sa.ForeignKey("bills.id")),
+        sa.Column("kind", sa.String),
+        sa.Column("detail", sa.JSON),
+        sa.Column("created_at", sa.DateTime),
+    )
+    op.create_index("ix_bill_changes_bill", "bill_changes", ["bill_id", "id"])
+
+    op.create_table(
+        "watches",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("owner", sa.String),
+        sa.Column("bill_id", sa.String, nullable=True),
+        sa.Column("query", sa.String, nullable=True),
+        sa.Column("jurisdiction_id", sa.String, nullable=True),
+        sa.Column("session", sa.String, nullable=True),
+        sa.Column("created_at", sa.DateTime),
+    )
+    op.create_index("ix_watches_owner", "watches", ["owner", "id"])
+    op.create_index("ix_watches_bill", "watches", ["bill_id", "owner"])
+
+    op.create_table(
+        "watch_matches",
+        sa.Column("owner", sa.String, primary_key=True),
+        sa.Column("change_id", sa.Integer, sa.ForeignKey("bill_changes.id"), primary_key=True),
+        sa.Column("watch_id", sa.Integer),
+    )
+
+    op.create_table(
+        "change_watermarks",
+        sa.Column("name", sa.String, primary_key=True),
+        sa.Column("change_id", sa.Integer),
+    )
+
+
+def downgrade():
+    op.drop_table("change_watermarks")
+    op.drop_table("watch_matches")
+    op.drop_index("ix_watches_bill", table_name="watches")
+    op.drop_index("ix_watches_owner", table_name="watches")
+    op.drop_table("watches")
+    op.drop_index("ix_bill_changes_bill", table_name="bill_changes")
+    op.drop_table("bill_changes")
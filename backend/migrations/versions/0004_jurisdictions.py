@@ -0,0 +1,32 @@
+"""Stored jurisdiction and legislative session metadata
+
+Fetched from OpenStates once per JURISDICTION_TTL and served from memory, so
+ingest and /api/jurisdictions don't call /jurisdictions on every use.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "jurisdictions",
+        sa.Column("id", sa.String, primary_key=True),
+        sa.Column("name", sa.String),
+        sa.Column("classification", sa.String),
+        sa.Column("url", sa.String, nullable=True),
+        sa.Column("sessions", sa.JSON),
+        sa.Column("fetched_at", sa.DateTime),
+    )
+
+
+def downgrade():
+    op.drop_table("jurisdictions")
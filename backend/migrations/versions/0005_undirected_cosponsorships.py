@@ -0,0 +1,43 @@
+"""Store each co-sponsorship pair once, and skip bills with very many sponsors
+
+Pairs were stored in both directions, so a bill with n sponsors wrote
+n(n-1) rows. The graph is rebuilt from the sponsorships table with one row
+per pair, smaller key first, leaving out bills with more than
+COSPONSOR_MAX_SPONSORS sponsors, and top collaborators are read from both
+ends through a second index.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.services.sponsors import COSPONSOR_MAX_SPONSORS
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+SPONSORS = "(SELECT DISTINCT bill_id, person_id FROM sponsorships)"
+GRAPHED_BILLS = f"(SELECT bill_id FROM {SPONSORS} GROUP BY bill_id HAVING COUNT(*) <= :max_sponsors)"
+
+
+def upgrade():
+    op.execute("DELETE FROM cosponsorships")
+    op.get_bind().execute(sa.text(
+        "INSERT INTO cosponsorships (person_id, collaborator_id, bill_count) "
+        f"SELECT a.person_id, b.person_id, COUNT(*) FROM {SPONSORS} a JOIN {SPONSORS} b "
+        "ON a.bill_id = b.bill_id AND a.person_id < b.person_id "
+        f"WHERE a.bill_id IN {GRAPHED_BILLS} GROUP BY a.person_id, b.person_id"
+    ), {"max_sponsors": COSPONSOR_MAX_SPONSORS})
+    op.create_index("ix_cosponsorships_collaborator_count", "cosponsorships", ["collaborator_id", "bill_count"])
+
+
+def downgrade():
+    op.drop_index("ix_cosponsorships_collaborator_count", table_name="cosponsorships")
+    # Add the reverse direction of every pair back
+    op.execute(
+        "INSERT INTO cosponsorships (person_id, collaborator_id, bill_count) "
+        "SELECT collaborator_id, person_id, bill_count FROM cosponsorships"
+    )
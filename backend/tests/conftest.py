@@ -0,0 +1,36 @@
+"""Test settings, applied before any app module reads its configuration"""
+import os
+import sys
+import tempfile
+import pytest
+
+# Keep the tests off the development database and cache
+_workdir = tempfile.mkdtemp(prefix="legispal-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'legispal.db')}")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("OPENSTATES_API_KEY", "test")
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+
+# Add the backend directory to the path so we can import our app modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def schema():
+    """The test database, migrated to the latest revision once per run"""
+    from app.database.init_db import init_database
+    init_database()
+
+
+@pytest.fixture
+def db(schema):
+    """A session on the migrated database, emptied after the test"""
+    from app.database.connection import Base, SessionLocal, engine
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        with engine.begin() as conn:
+            for table in reversed(Base.metadata.sorted_tables):
+                conn.execute(table.delete())
@@ -0,0 +1,42 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database.connection import get_db
+from app.database.models import Bill
+from app.routers import analytics as analytics_router
+from app.services.analytics import VoteAnalytics
+
+
+def _vote(date, result="pass"):
+    return {"date": date, "chamber": "upper", "result": result, "counts": {"yes": 30, "no": 10}}
+
+
+def _add_votes(db):
+    db.add(Bill(id="b1", title="b1", jurisdiction_name="California", session="2025",
+                votes=[_vote("2025-02-03"), _vote("2023-13-45"), _vote("2023-02-30", "fail"), _vote("")]))
+    db.add(Bill(id="b2", title="b2", jurisdiction_name="Texas", session="2025", votes=[_vote("2025-04-01T12:00:00")]))
+    db.commit()
+
+
+def test_malformed_dates_are_kept_without_a_date(db):
+    _add_votes(db)
+    analytics = VoteAnalytics(cache_path="")
+    analytics.refresh(db, force=True)
+
+    totals = analytics.aggregate(["session"])
+    assert totals[0]["votes"] == 5
+    dated = analytics.aggregate(["jurisdiction"], since="2025-01-01")
+    assert {group["jurisdiction"]: group["votes"] for group in dated} == {"California": 1, "Texas": 1}
+
+
+def test_invalid_filter_is_a_400_and_valid_ones_are_not(db, monkeypatch):
+    _add_votes(db)
+    monkeypatch.setattr(analytics_router, "vote_analytics", VoteAnalytics(cache_path=""))
+    app = FastAPI()
+    app.include_router(analytics_router.router)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    assert client.get("/analytics/votes", params={"since": "2025-02-30"}).status_code == 400
+    response = client.get("/analytics/votes", params={"since": "2025-01-01", "group_by": "chamber"})
+    assert response.status_code == 200
+    assert response.json()["groups"][0]["votes"] == 2
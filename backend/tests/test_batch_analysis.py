@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+from app.database.models import AnalysisBatch, Bill
+from app.services.batch_analysis import BatchAnalysisService
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from fakes import FakeAnthropic  # noqa: E402
+
+
+class Crash(Exception):
+    """Stands in for the process dying at a given point"""
+
+
+@pytest.fixture
+def bills(db):
+    for n in range(3):
+        db.add(Bill(id=f"bill-{n}", title=f"Water bill {n}"))
+    db.commit()
+    return db
+
+
+def _entries(service, db):
+    return [(bill_id, service._requests_for(bill_id, title, f"Text of {title}"))
+            for bill_id, title in service.pending_bills(db)]
+
+
+def _crash_on_create(claude, after: bool):
+    create = claude.batches.create
+
+    def crashing(**kwargs):
+        if after:
+            create(**kwargs)
+        raise Crash()
+    claude.batches.create = crashing
+    return create
+
+
+def test_batch_accepted_before_a_crash_is_adopted(bills):
+    db = bills
+    claude = FakeAnthropic()
+    service = BatchAnalysisService(claude)
+    create = _crash_on_create(claude, after=True)
+    with pytest.raises(Crash):
+        service.submit(db, _entries(service, db))
+    claude.batches.create = create
+
+    assert service.recover(db) == (1, 0)
+    [batch] = db.query(AnalysisBatch).all()
+    assert batch.status == "in_progress" and batch.remote_id == "msgbatch_fake_1"
+    assert service.pending_bills(db) == []
+
+    assert service.poll(db, wait=False) == 1
+    assert db.query(Bill).filter(Bill.summary.is_(None)).count() == 0
+    assert len(claude.batches.batches) == 1
+
+
+def test_batch_never_received_is_dropped(bills):
+    db = bills
+    claude = FakeAnthropic()
+    service = BatchAnalysisService(claude)
+    create = _crash_on_create(claude, after=False)
+    with pytest.raises(Crash):
+        service.submit(db, _entries(service, db))
+    claude.batches.create = create
+
+    # Another client's batch of the same size is not mistaken for it
+    claude.batches.create(requests=[{"custom_id": f"other-{n}", "params": {"model": "fail"}} for n in range(6)])
+    assert service.recover(db) == (0, 1)
+    assert db.query(AnalysisBatch).count() == 0
+    assert len(service.pending_bills(db)) == 3
@@ -0,0 +1,44 @@
+import pytest
+import requests
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database.models import Bill
+from app.routers import bills as bills_router
+
+
+def _upstream(bill_id):
+    if bill_id == "ocd-bill/remote":
+        return {"id": bill_id, "title": "Remote bill", "identifier": "SB 7", "session": "2025"}
+    response = requests.Response()
+    response.status_code = 404 if bill_id == "ocd-bill/gone" else 500
+    raise requests.HTTPError(f"{response.status_code} for {bill_id}", response=response)
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    db.add(Bill(id="ocd-bill/stored", title="Stored bill", identifier="HB 1", session="2025"))
+    db.commit()
+    monkeypatch.setattr(bills_router.bill_content, "get_bill_data", _upstream)
+    app = FastAPI()
+    app.include_router(bills_router.router)
+    with TestClient(app) as client:
+        yield client
+
+
+def test_results_follow_the_request_order_with_missing_and_errors_split(client):
+    ids = ["ocd-bill/gone", "ocd-bill/stored", "ocd-bill/remote", "ocd-bill/broken", "ocd-bill/stored"]
+    response = client.post("/bills/batch", json={"ids": ids, "fields": ["title"]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["results"] == [
+        None, {"id": "ocd-bill/stored", "title": "Stored bill"}, {"id": "ocd-bill/remote", "title": "Remote bill"},
+        None, {"id": "ocd-bill/stored", "title": "Stored bill"},
+    ]
+    assert body["missing"] == ["ocd-bill/gone"]
+    assert list(body["errors"]) == ["ocd-bill/broken"]
+
+
+def test_unknown_fields_are_rejected(client):
+    response = client.post("/bills/batch", json={"ids": ["ocd-bill/stored"], "fields": ["title", "nope"]})
+    assert response.status_code == 400
+    assert "nope" in response.json()["detail"]
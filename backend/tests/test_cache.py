@@ -0,0 +1,99 @@
+import threading
+import pytest
+from app.services import cache
+from app.services.cache import MemoryBackend, SQLiteBackend, TTLCache
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    return SQLiteBackend(str(tmp_path / "cache.db"))
+
+
+class BrokenBackend(MemoryBackend):
+    """A shared backend whose every call fails, like an unreachable server"""
+
+    shared = True
+
+    def _fail(self, *args, **kwargs):
+        raise ConnectionError("cache down")
+
+    get = contains = set = acquire = release = held = _fail
+
+
+def test_least_recently_used_entry_is_evicted(backend):
+    for key in ("a", "b", "c"):
+        backend.set("ns", key, key.upper(), ttl=60, max_entries=3)
+    # Reading "a" makes "b" the least recently used
+    if isinstance(backend, SQLiteBackend):
+        backend.TOUCH_INTERVAL = -1
+    assert backend.get("ns", "a") == (True, "A")
+    backend.set("ns", "d", "D", ttl=60, max_entries=3)
+
+    assert backend.count("ns") == 3
+    assert not backend.contains("ns", "b")
+    assert all(backend.contains("ns", key) for key in ("a", "c", "d"))
+
+
+def test_expired_entries_are_not_returned(backend):
+    backend.set("ns", "old", 1, ttl=-1, max_entries=10)
+    assert backend.get("ns", "old") == (False, None)
+    assert not backend.contains("ns", "old")
+
+
+def test_sqlite_lease_is_exclusive_until_released_or_expired(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+    assert first.acquire("load:x", 60)
+    assert second.held("load:x")
+    assert not second.acquire("load:x", 60)
+    # Only the holder can release its lease
+    second.release("load:x")
+    assert second.held("load:x")
+    first.release("load:x")
+    assert not second.held("load:x")
+
+    assert first.acquire("load:y", -1)
+    assert second.acquire("load:y", 60)
+
+
+def test_waiting_worker_uses_the_value_another_worker_loads(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_POLL_INTERVAL", 0.01)
+    path = str(tmp_path / "cache.db")
+    loading, waiting = (TTLCache("bills", 10, 60, SQLiteBackend(path)) for _ in range(2))
+    assert loading.backend.acquire("load:bills:k", 60)
+
+    def finish_load():
+        loading.set("k", "loaded elsewhere")
+        loading.backend.release("load:bills:k")
+
+    timer = threading.Timer(0.05, finish_load)
+    timer.start()
+    calls = []
+    assert waiting.get_or_load("k", lambda: calls.append(1) or "loaded here") == "loaded elsewhere"
+    timer.join()
+    assert calls == []
+
+
+def test_waiting_worker_loads_itself_when_the_lease_is_dropped(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_POLL_INTERVAL", 0.01)
+    path = str(tmp_path / "cache.db")
+    other, waiting = SQLiteBackend(path), TTLCache("bills", 10, 60, SQLiteBackend(path))
+    assert other.acquire("load:bills:k", 60)
+    threading.Timer(0.05, other.release, ["load:bills:k"]).start()
+
+    assert waiting.get_or_load("k", lambda: "loaded here") == "loaded here"
+    assert waiting.get("k") == "loaded here"
+
+
+def test_broken_backend_costs_a_load_not_the_request():
+    broken = TTLCache("bills", 10, 60, BrokenBackend())
+    calls = []
+
+    assert broken.get_or_load("k", lambda: calls.append(1) or "value") == "value"
+    assert "k" not in broken
+    assert broken.get("k") is None
+    broken.set("k", "value")
+    assert calls == [1]
@@ -0,0 +1,31 @@
+import pytest
+from app.services import openstates
+from app.services.cassette import Cassette, CassetteMiss
+from app.services.resilience import CircuitBreaker, UPSTREAM_UNAVAILABLE
+
+
+@pytest.fixture
+def replay(monkeypatch, tmp_path):
+    breaker = CircuitBreaker("openstates", failure_threshold=1, recovery_seconds=0)
+    monkeypatch.setattr(openstates, "openstates_breaker", breaker)
+    monkeypatch.setattr(openstates, "openstates_cassette", Cassette(str(tmp_path / "cassette.db"), "replay"))
+    return breaker
+
+
+def test_replay_miss_is_not_an_upstream_failure(replay):
+    with pytest.raises(CassetteMiss) as miss:
+        openstates.openstates_service.get_bill("ocd-bill/unrecorded")
+    assert not isinstance(miss.value, UPSTREAM_UNAVAILABLE)
+    assert replay.state == "closed"
+    assert replay.failures == 0
+
+
+def test_replay_miss_releases_the_half_open_trial(replay):
+    replay.record_failure()
+    assert replay.state == "open"
+    with pytest.raises(CassetteMiss):
+        openstates.openstates_service.get_bill("ocd-bill/unrecorded")
+    assert replay.state == "half_open"
+
+    # The trial slot is free again, so the next call is let through
+    replay.before_call()
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+import pytest
+from app.services import claude
+from app.services.admission import AdmissionController
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Overloaded
+
+
+class FakeMessages:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+        return SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=usage, stop_reason="end_turn")
+
+
+@pytest.fixture
+def service(monkeypatch):
+    breaker = CircuitBreaker("claude", failure_threshold=1, recovery_seconds=0)
+    admission = AdmissionController("claude", max_concurrency=1, tokens_per_minute=0, max_queue=0)
+    monkeypatch.setattr(claude, "claude_breaker", breaker)
+    monkeypatch.setattr(claude, "claude_admission", admission)
+    service = claude.ClaudeService()
+    service.client = SimpleNamespace(messages=FakeMessages())
+    return service, breaker, admission
+
+
+def test_shed_during_half_open_releases_trial(service):
+    service, breaker, admission = service
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    # The only slot is taken, so the half-open trial call is shed by admission control
+    with admission.admit():
+        with pytest.raises(Overloaded):
+            service._create_message("test", max_tokens=10, messages=[])
+    assert breaker.state == "half_open"
+
+    # The next call is let through as the trial, and its success closes the breaker
+    service._create_message("test", max_tokens=10, messages=[])
+    assert breaker.state == "closed"
+    assert service.client.messages.calls == 1
+
+
+def test_open_breaker_rejects_before_admission(service):
+    service, breaker, admission = service
+    breaker.recovery_seconds = 60
+    breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        service._create_message("test", max_tokens=10, messages=[])
+    assert admission.in_flight == 0
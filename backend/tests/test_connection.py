@@ -0,0 +1,41 @@
+import asyncio
+import os
+import subprocess
+import sys
+from sqlalchemy import text
+from app.database import connection
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_does_not_create_the_async_engine():
+    check = "import app.main, app.database.connection as c; assert c.async_engine is None"
+    subprocess.run([sys.executable, "-c", check], cwd=BACKEND, env=os.environ.copy(), check=True)
+
+
+def test_hooks_run_when_the_async_engine_is_created(monkeypatch, schema):
+    monkeypatch.setattr(connection, "async_engine", None)
+    monkeypatch.setattr(connection, "AsyncSessionLocal", None)
+    monkeypatch.setattr(connection, "_async_engine_hooks", [])
+    statements = []
+
+    def hook(sync_engine):
+        from sqlalchemy import event
+        event.listen(sync_engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    connection.on_async_engine(hook)
+    assert connection.async_engine is None
+
+    async def query():
+        engine = connection.get_async_engine()
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        await engine.dispose()
+
+    asyncio.run(query())
+    assert "SELECT 1" in statements
+
+    # A hook registered after creation is applied straight away
+    late = []
+    connection.on_async_engine(late.append)
+    assert late == [connection.async_engine.sync_engine]
@@ -0,0 +1,83 @@
+from app.services import diff
+from app.services.diff import diff_versions, extract_text, split_sections
+
+OLD = """AN ACT relating to water.
+SECTION 1. Short title.
+This act is the Clean Water Act.
+Sec. 2. Definitions.
+"Water" means water.
+§ 3. Penalties.
+A fine of $100.
+"""
+
+NEW = """AN ACT relating to water.
+SECTION 1. Short title.
+This act is the Clean Water Act.
+Sec. 2. Definitions.
+"Water" means fresh water.
+SECTION 4. Effective date.
+This act takes effect July 1.
+"""
+
+
+def test_headings_are_normalized_into_labels():
+    labels = [label for label, _ in split_sections(OLD)]
+    assert labels == ["preamble", "SECTION 1", "SECTION 2", "§ 3"]
+
+    text = "TITLE iv\nArticle 5: Scope\nPART 2-1.\nchapter 7A."
+    assert [label for label, _ in split_sections(text)] == ["TITLE IV", "ARTICLE 5", "PART 2-1", "CHAPTER 7A"]
+
+
+def test_section_text_keeps_its_heading_and_body():
+    sections = dict(split_sections(OLD))
+    assert sections["preamble"] == "AN ACT relating to water."
+    assert sections["SECTION 2"] == 'Sec. 2. Definitions.\n"Water" means water.'
+
+
+def test_no_preamble_when_text_starts_with_a_heading():
+    assert split_sections("SECTION 1.\nText.") == [("SECTION 1", "SECTION 1.\nText.")]
+
+
+def test_prose_mentioning_a_section_is_not_a_heading():
+    text = "SECTION 1.\nSection 5 of title 10 is amended.\nSec 12 applies here too."
+    assert [label for label, _ in split_sections(text)] == ["SECTION 1"]
+
+
+def test_repeated_labels_get_their_occurrence():
+    text = "TITLE I\nSECTION 1.\na\nTITLE II\nSECTION 1.\nb\nSECTION 1.\nc"
+    labels = [label for label, _ in split_sections(text)]
+    assert labels == ["TITLE I", "SECTION 1", "TITLE II", "SECTION 1 (2)", "SECTION 1 (3)"]
+
+
+def test_html_versions_are_reduced_to_text():
+    html = "<html><head><style>p {}</style></head><body><p>SECTION 1.</p><p>Some   text</p></body></html>"
+    assert extract_text(html) == "SECTION 1.\nSome text"
+
+
+def test_diff_lists_changed_added_and_removed_sections():
+    result = diff_versions(OLD, NEW)
+
+    assert result["sections"] == {"added": 1, "removed": 1, "changed": 1, "unchanged": 2}
+    changes = {change["section"]: change for change in result["changes"]}
+    assert [change["section"] for change in result["changes"]] == ["SECTION 2", "SECTION 4", "§ 3"]
+    assert changes["SECTION 2"]["status"] == "changed"
+    assert '-"Water" means water.' in changes["SECTION 2"]["lines"]
+    assert '+"Water" means fresh water.' in changes["SECTION 2"]["lines"]
+    assert changes["SECTION 4"]["lines"] == ["+SECTION 4. Effective date.", "+This act takes effect July 1."]
+    assert changes["§ 3"]["status"] == "removed"
+    assert result["lines_added"] == 3
+    assert result["lines_removed"] == 3
+
+
+def test_parallel_diff_matches_in_place_diff(monkeypatch):
+    old = "\n".join(f"SECTION {n}.\nline {n}" for n in range(1, 20))
+    new = "\n".join(f"SECTION {n}.\nline {n} amended" for n in range(1, 20))
+    expected = diff_versions(old, new)
+
+    monkeypatch.setattr(diff, "DIFF_PARALLEL_MIN_CHARS", 0)
+    monkeypatch.setattr(diff, "DIFF_WORKERS", 2)
+    try:
+        assert diff_versions(old, new) == expected
+        assert diff._pool is not None
+    finally:
+        diff.shutdown_pool()
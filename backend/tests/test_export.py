@@ -0,0 +1,82 @@
+import gzip
+import io
+import json
+import sys
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database.models import Bill, Keyword
+from app.routers import bills as bills_router
+from app.services import export
+
+
+def _add_bills(db, count):
+    keyword = Keyword(name="water")
+    db.add(keyword)
+    for n in range(count):
+        bill = Bill(id=f"bill-{n:02d}", title=f"Bill {n}", session="2025" if n % 2 else "2024",
+                    jurisdiction_id="ocd-jurisdiction/country:us/state:ca/government",
+                    votes=[{"date": "2025-01-02", "result": "pass"}], updated_at=datetime(2025, 1, 1 + n))
+        if n == 0:
+            bill.keywords.append(keyword)
+        db.add(bill)
+    db.commit()
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(bills_router.router)
+    return TestClient(app)
+
+
+def test_windows_and_batches_cover_every_bill_once(db, monkeypatch):
+    _add_bills(db, 7)
+    sessions = []
+    session_local = export.SessionLocal
+    monkeypatch.setattr(export, "SessionLocal", lambda: sessions.append(1) or session_local())
+
+    batches = list(export.iter_bill_batches(batch_size=2, window=3))
+    assert [row["id"] for rows in batches for row in rows] == [f"bill-{n:02d}" for n in range(7)]
+    assert max(len(rows) for rows in batches) == 2
+    assert len(sessions) == 3  # Windows of 3, 3 and 1 bills, each in its own transaction
+    assert batches[0][0]["keywords"] == ["water"]
+
+    filtered = export.iter_bill_batches(session="2025", since=datetime(2025, 1, 3), batch_size=2, window=1)
+    assert [row["id"] for rows in filtered for row in rows] == ["bill-03", "bill-05"]
+
+
+def test_jsonl_round_trip(db):
+    _add_bills(db, 3)
+    data = b"".join(export.jsonl_gzip(export.iter_bill_batches(batch_size=2)))
+    rows = [json.loads(line) for line in gzip.decompress(data).decode().splitlines()]
+    assert [row["id"] for row in rows] == ["bill-00", "bill-01", "bill-02"]
+    assert rows[0]["votes"] == [{"date": "2025-01-02", "result": "pass"}]
+    assert rows[0]["updated_at"] == "2025-01-01T00:00:00"
+
+
+def test_empty_export_is_a_valid_gzip_file(schema):
+    data = b"".join(export.jsonl_gzip(export.iter_bill_batches()))
+    assert gzip.decompress(data) == b""
+    response = _client().get("/bills/export")
+    assert response.status_code == 200
+    assert gzip.decompress(response.content) == b""
+
+
+def test_parquet_round_trip(db):
+    pq = pytest.importorskip("pyarrow.parquet")
+    _add_bills(db, 5)
+    response = _client().get("/bills/export", params={"format": "parquet"})
+    assert response.status_code == 200
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.column("id").to_pylist() == [f"bill-{n:02d}" for n in range(5)]
+    assert json.loads(table.column("votes")[0].as_py()) == [{"date": "2025-01-02", "result": "pass"}]
+
+
+def test_parquet_without_pyarrow_is_a_501(schema, monkeypatch):
+    # A None entry makes the import fail as if pyarrow weren't installed
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+    response = _client().get("/bills/export", params={"format": "parquet"})
+    assert response.status_code == 501
+    assert "pyarrow" in response.json()["detail"]
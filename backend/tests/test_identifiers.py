@@ -0,0 +1,63 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.database.models import Bill
+from app.routers import bills as bills_router
+from app.services.identifiers import looks_like_identifier, normalize_identifier
+
+
+@pytest.mark.parametrize("spelling", ["HB 123", "H.B. 123", "hb123", "HB0123", " h. b. 0123 ", "HB-123", "hb - 123"])
+def test_common_spellings_share_one_key(spelling):
+    assert normalize_identifier(spelling) == "HB123"
+
+
+@pytest.mark.parametrize("identifier, expected", [
+    ("H.R. 1", "HR1"),
+    ("SJR 4", "SJR4"),
+    ("AB 1234", "AB1234"),
+    ("S 5", "S5"),
+    ("HB 000", "HB0"),
+    ("HCONRES 12", "HCONRES12"),
+])
+def test_prefix_and_number_are_kept(identifier, expected):
+    assert normalize_identifier(identifier) == expected
+
+
+@pytest.mark.parametrize("identifier, expected", [
+    # Suffixes, long prefixes and numbers too long for an identifier fall back to stripping punctuation
+    ("SB 1-A", "SB1A"),
+    ("Assembly 12", "ASSEMBLY12"),
+    ("HB 1234567", "HB1234567"),
+    ("123", "123"),
+])
+def test_other_identifiers_still_compare_exactly(identifier, expected):
+    assert normalize_identifier(identifier) == expected
+
+
+@pytest.mark.parametrize("identifier", [None, "", " - "])
+def test_empty_identifiers_have_no_key(identifier):
+    assert normalize_identifier(identifier) is None
+
+
+def test_only_identifier_shaped_queries_use_the_lookup():
+    assert looks_like_identifier("h.b. 12")
+    assert looks_like_identifier("SJR4")
+    assert not looks_like_identifier("")
+    assert not looks_like_identifier("water rights")
+    assert not looks_like_identifier("Section 5")
+    assert not looks_like_identifier("123")
+
+
+def test_search_finds_any_spelling_in_the_requested_jurisdiction(db):
+    for bill_id, jurisdiction in (("ocd-bill/tx", "ocd-jurisdiction/tx"), ("ocd-bill/ca", "ocd-jurisdiction/ca")):
+        db.add(Bill(id=bill_id, title="Water rights", identifier="HB 123", session="2025",
+                    identifier_normalized=normalize_identifier("HB 123"), jurisdiction_id=jurisdiction))
+    db.commit()
+    app = FastAPI()
+    app.include_router(bills_router.router)
+
+    with TestClient(app) as client:
+        # "h.b. 0123" is not a substring of "HB 123", so only the exact lookup can find it
+        response = client.get("/bills/search", params={"query": "h.b. 0123", "jurisdiction": "ocd-jurisdiction/tx"})
+    assert response.status_code == 200
+    assert [result["id"] for result in response.json()["results"]] == ["ocd-bill/tx"]
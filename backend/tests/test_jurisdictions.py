@@ -0,0 +1,21 @@
+from app.services.jurisdictions import active_session_ids, session_active
+
+
+def test_session_dates():
+    assert session_active({"start_date": "2025-01-06", "end_date": ""}, today="2025-03-01")
+    assert session_active({"start_date": "2025-01-06", "end_date": "2025-12-31"}, today="2025-03-01")
+    assert not session_active({"start_date": "2023-01-02", "end_date": "2024-11-30"}, today="2025-03-01")
+    assert not session_active({"start_date": "2026-01-05"}, today="2025-03-01")
+    assert session_active({"active": True, "start_date": ""})
+
+
+def test_undated_sessions_are_not_active():
+    assert not session_active({"start_date": "", "end_date": ""})
+    assert not session_active({"identifier": "special"})
+
+
+def test_latest_session_when_none_is_dated():
+    sessions = [{"identifier": "2023"}, {"identifier": "2025", "start_date": ""}]
+    assert active_session_ids(sessions) == ["2025"]
+    dated = [{"identifier": "2021", "start_date": "2021-01-04", "end_date": "2022-12-31"}, {"identifier": "special"}]
+    assert active_session_ids(dated) == ["2021"]
@@ -0,0 +1,41 @@
+import random
+from app.services.popularity import PopularityTracker
+
+
+def _reference(accesses, capacity):
+    """Space-Saving with a full scan for the least popular bill"""
+    counts = {}
+    for bill_id, weight in accesses:
+        if bill_id in counts:
+            counts[bill_id] += weight
+        elif len(counts) < capacity:
+            counts[bill_id] = weight
+        else:
+            victim = min(counts, key=counts.get)
+            counts[bill_id] = counts.pop(victim) + weight
+    return counts
+
+
+def test_evicts_the_least_popular_bill(monkeypatch):
+    rng = random.Random(7)
+    accesses = [(f"bill-{int(rng.paretovariate(1.1)) % 300}", rng.random()) for _ in range(20000)]
+    tracker = PopularityTracker(capacity=50, half_life=3600)
+    monkeypatch.setattr(tracker, "_scale", lambda now: 1.0)
+    for bill_id, weight in accesses:
+        tracker.record(bill_id, weight)
+
+    expected = _reference(accesses, 50)
+    assert tracker._counts == expected
+    assert len(tracker._heap) == len(expected)
+    assert [bill_id for bill_id, _ in tracker.top(10)] == sorted(expected, key=expected.get, reverse=True)[:10]
+
+
+def test_rebase_keeps_evicting_correctly(monkeypatch):
+    tracker = PopularityTracker(capacity=2, half_life=1)
+    scales = iter([1.0, 1.0, 2.0 ** 40, 1.0])
+    monkeypatch.setattr(tracker, "_scale", lambda now: next(scales))
+    tracker.record("a", 5)
+    tracker.record("b", 1)
+    tracker.record("a", 1)  # Rebased first, leaving b near zero
+    tracker.record("c", 1)
+    assert set(tracker._counts) == {"a", "c"}
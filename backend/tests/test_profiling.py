@@ -0,0 +1,96 @@
+import asyncio
+import logging
+import pstats
+import threading
+import time
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.services import profiling
+from app.services.profiling import ProfiledRoute, ProfilingMiddleware, RequestProfiler
+
+
+def _sync_work():
+    time.sleep(0.01)
+    return sum(range(1000))
+
+
+async def _other_request_work():
+    await asyncio.sleep(0)
+    return sum(range(1000))
+
+
+def _app(profiler):
+    app = FastAPI()
+    app.router.route_class = ProfiledRoute
+
+    @app.get("/sync")
+    def sync_route():
+        return {"total": _sync_work()}
+
+    @app.get("/async")
+    async def async_route():
+        await asyncio.sleep(0.02)
+        return {"ok": True}
+
+    @app.get("/other")
+    async def other_route():
+        return {"total": await _other_request_work()}
+
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+def _functions(profiler):
+    [saved] = profiler.list_profiles()
+    stats = pstats.Stats(profiler.profile_path(saved["name"]))
+    return {name for _, _, name in stats.stats}
+
+
+def test_cprofile_covers_sync_endpoint_in_worker_thread(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    profiler.arm(1, "/sync")
+    with TestClient(_app(profiler)) as client:
+        assert client.get("/sync").status_code == 200
+    assert "_sync_work" in _functions(profiler)
+
+
+def test_cprofile_leaves_out_concurrent_requests(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    profiler.arm(1, "/async")
+    with TestClient(_app(profiler)) as client:
+        profiled = threading.Thread(target=client.get, args=("/async",))
+        profiled.start()
+        time.sleep(0.005)
+        for _ in range(5):
+            client.get("/other")
+        profiled.join()
+    functions = _functions(profiler)
+    assert "async_route" in functions
+    assert "_other_request_work" not in functions
+
+
+def test_armed_slots_are_taken_once():
+    profiler = RequestProfiler()
+    profiler.arm(50, "/api/")
+    taken = []
+    threads = [threading.Thread(target=lambda: taken.extend(
+        mode for mode in (profiler.take_armed("/api/bills") for _ in range(20)) if mode)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(taken) == 50 and profiler.armed_remaining == 0
+
+
+def test_profile_header_needs_the_admin_token(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    profiler = RequestProfiler(str(tmp_path))
+    with TestClient(_app(profiler)) as client, caplog.at_level(logging.INFO, logger=profiling.__name__):
+        client.get("/other", headers={"X-Profile": "sample", "X-Admin-Token": "wrong"})
+        client.get("/other", headers={"X-Profile": "sample"})
+        assert profiler.list_profiles() == []
+        client.get("/other", headers={"X-Profile": "sample", "X-Admin-Token": "secret"})
+    assert len(profiler.list_profiles()) == 1
+    assert [record.getMessage().split(" seconds=")[0] for record in caplog.records] == [
+        "request_profiled method=GET path=/other mode=sample"
+    ]
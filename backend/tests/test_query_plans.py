@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from sqlalchemy import text
+from app.database.connection import engine
+from app.database.models import Bill, BillChange, Sponsorship, Watch
+from check_query_plans import check_plans, explain, hot_queries
+
+
+def _add_bills(db, count=30):
+    jurisdiction = "ocd-jurisdiction/country:us/state:ca/government"
+    for n in range(count):
+        bill_id = f"ocd-bill/{n}"
+        db.add(Bill(id=bill_id, title=f"Water bill {n}", identifier=f"HB {n}", identifier_normalized=f"HB{n}",
+                    session="2025", jurisdiction_id=jurisdiction, jurisdiction_name="California",
+                    primary_sponsor_name="Ann Lee", updated_at=datetime(2025, 1, 1) + timedelta(hours=n)))
+        db.add(Sponsorship(bill_id=bill_id, person_id="ocd-person/1", name="Ann Lee", primary=True))
+        db.add(BillChange(bill_id=bill_id, kind="new_bill", detail={}))
+    db.add(Watch(owner="owner", bill_id="ocd-bill/1"))
+    db.commit()
+
+
+def test_hot_queries_use_indexes_on_empty_database(db):
+    assert check_plans(db) == []
+
+
+def test_hot_queries_use_indexes_with_data(db):
+    _add_bills(db)
+    assert check_plans(db) == []
+
+
+def test_missing_index_is_reported(db):
+    _add_bills(db)
+    db.close()
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX ix_watches_owner"))
+    # Pooled connections cache prepared EXPLAIN statements, whose plans don't follow schema changes
+    engine.dispose()
+    try:
+        assert "watches: full scan of watches" in check_plans(db)
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text("CREATE INDEX ix_watches_owner ON watches (owner, id)"))
+        engine.dispose()
+
+
+def test_every_hot_query_issues_sql(db):
+    # A hot query that stops reaching the database would pass the checks without testing anything
+    from check_query_plans import capture_statements, sample_values
+    sample = sample_values(db)
+    for name, call, _ in hot_queries():
+        with capture_statements() as statements:
+            call(db, sample)
+        db.rollback()
+        assert statements, name
+        assert explain(*statements[0])
@@ -0,0 +1,37 @@
+import pytest
+import requests
+from app.services import openstates
+from app.services.resilience import CircuitBreaker, CircuitOpenError, HostBreakers
+
+
+@pytest.fixture
+def breakers(monkeypatch):
+    breaker = CircuitBreaker("openstates", failure_threshold=1, recovery_seconds=60)
+    hosts = HostBreakers("documents")
+    monkeypatch.setattr(openstates, "openstates_breaker", breaker)
+    monkeypatch.setattr(openstates, "document_breakers", hosts)
+    return breaker, hosts
+
+
+def test_failing_document_host_only_opens_its_own_breaker(monkeypatch, breakers):
+    breaker, hosts = breakers
+    timeouts = []
+
+    def fake_get(url, **kwargs):
+        timeouts.append(kwargs["timeout"])
+        raise requests.Timeout("slow state site")
+
+    monkeypatch.setattr(openstates.requests, "get", fake_get)
+    for _ in range(hosts.get("leginfo.example.gov").failure_threshold):
+        with pytest.raises(requests.Timeout):
+            openstates.openstates_service.get_document("https://leginfo.example.gov/bill.html")
+    assert timeouts[0] == (openstates.DOCUMENT_CONNECT_TIMEOUT, openstates.DOCUMENT_READ_TIMEOUT)
+
+    with pytest.raises(CircuitOpenError):
+        openstates.openstates_service.get_document("https://leginfo.example.gov/other.html")
+    assert [status["service"] for status in hosts.status()] == ["documents:leginfo.example.gov"]
+
+    # OpenStates and other legislature sites are still called
+    assert breaker.state == "closed"
+    hosts.get("www.example-legislature.gov").before_call()
+    breaker.before_call()
@@ -0,0 +1,49 @@
+import os
+from app.services.semantic import SemanticIndex, build_semantic_index, current_version
+
+DOCUMENTS = [
+    ("water-1", "Drinking water quality standards for public water systems"),
+    ("water-2", "Water rights and groundwater management for farms"),
+    ("school-1", "School funding formula for public schools and teachers"),
+    ("school-2", "Teachers pay raise and school construction funding"),
+]
+
+
+def _build(path, documents):
+    return build_semantic_index(lambda: iter(documents), path, dim=2, min_df=1)
+
+
+def test_rebuild_is_picked_up_by_a_running_index(tmp_path):
+    path = str(tmp_path / "semantic_index")
+    _build(path, DOCUMENTS)
+    first = current_version(path)
+    index = SemanticIndex(path, refresh_interval=0)
+    assert index.load()
+    assert index.search("groundwater farms", 1)[0][0] == "water-2"
+
+    _build(path, DOCUMENTS + [("farm-1", "Groundwater pumping limits for farms and farm wells")])
+    second = current_version(path)
+    assert second != first
+    index.refresh()
+    assert "farm-1" in [bill_id for bill_id, _ in index.search("groundwater farms", 5)]
+
+    # The previous version stays for servers still mapping it; older ones are removed
+    _build(path, DOCUMENTS)
+    assert sorted(os.listdir(path)) == sorted(["CURRENT", second, current_version(path)])
+
+
+def test_unversioned_index_is_still_loaded_and_replaced(tmp_path):
+    path = str(tmp_path / "semantic_index")
+    _build(path, DOCUMENTS)
+    version = os.path.join(path, current_version(path))
+    for name in os.listdir(version):
+        os.rename(os.path.join(version, name), os.path.join(path, name))
+    os.rmdir(version)
+    os.remove(os.path.join(path, "CURRENT"))
+
+    index = SemanticIndex(path)
+    assert index.load()
+    _build(path, DOCUMENTS)
+    assert sorted(os.listdir(path)) == sorted(["CURRENT", current_version(path)])
+    index.refresh(force=True)
+    assert index.search("school teachers", 1)[0][0] in ("school-1", "school-2")
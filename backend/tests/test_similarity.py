@@ -0,0 +1,62 @@
+import random
+import numpy as np
+import pytest
+from app.services.similarity import SimilarityIndex, compute_signature, store_signature
+
+_rng = random.Random(11)
+VOCABULARY = [f"word{n}" for n in range(2000)]
+
+
+def _text(length=400):
+    return " ".join(_rng.choice(VOCABULARY) for _ in range(length))
+
+
+@pytest.fixture
+def texts():
+    base = _text()
+    words = base.split()
+    words[200:205] = ["amended"] * 5
+    return {"base": base, "variant": " ".join(words), "other": _text()}
+
+
+def test_signatures_ignore_markup_and_case():
+    text = _text(50)
+    signature, shingles = compute_signature(text)
+    assert shingles == 46
+    marked_up, _ = compute_signature(f"<p>{text.upper()}</p>")
+    assert np.array_equal(signature, marked_up)
+    assert compute_signature("too short to shingle") is None
+
+
+@pytest.mark.parametrize("merge_threshold", [1, 1000])
+def test_finds_near_duplicates_merged_or_pending(texts, merge_threshold):
+    index = SimilarityIndex(merge_threshold=merge_threshold)
+    for bill_id, text in texts.items():
+        index.add(bill_id, compute_signature(text)[0])
+    assert bool(index._pending) == (merge_threshold > 1)
+
+    similar = index.similar("base")
+    assert [bill_id for bill_id, _ in similar] == ["variant"]
+    assert similar[0][1] > 0.8
+    assert index.similar("missing") == []
+
+
+def test_replaced_signature_is_rescored(texts):
+    index = SimilarityIndex(merge_threshold=1)
+    for bill_id, text in texts.items():
+        index.add(bill_id, compute_signature(text)[0])
+    # The variant's old band entries stay until the next merge, but it no longer scores as similar
+    index._signatures[index._slots["variant"]] = compute_signature(_text())[0]
+    assert index.similar("base") == []
+    assert len(index) == 3
+
+
+def test_build_and_refresh_from_stored_signatures(db, texts):
+    store_signature(db, "base", texts["base"])
+    index = SimilarityIndex()
+    index.build(db)
+    assert index.has("base") and not index.has("variant")
+
+    store_signature(db, "variant", texts["variant"])
+    index.refresh(db, force=True)
+    assert [bill_id for bill_id, _ in index.similar("variant")] == ["base"]
@@ -0,0 +1,62 @@
+from app.database.models import Bill, CoSponsorship, Sponsorship
+from app.services import sponsors
+from app.services.openstates import openstates_service
+from app.services.sponsors import top_collaborators, update_sponsorships
+
+
+def _bill(bill_id, sponsorships):
+    return openstates_service.transform_bill_data({"id": bill_id, "title": bill_id, "sponsorships": sponsorships})
+
+
+def _ingest(db, bill):
+    if db.get(Bill, bill.id) is None:
+        db.add(Bill(id=bill.id, title=bill.title))
+    update_sponsorships(db, bill.id, bill.sponsors)
+    db.commit()
+
+
+def _edges(db):
+    return {(e.person_id, e.collaborator_id): e.bill_count for e in db.query(CoSponsorship)}
+
+
+def _person(person_id):
+    return {"name": person_id, "person": {"id": person_id, "name": person_id}}
+
+
+def test_graph_follows_changed_sponsors(db):
+    _ingest(db, _bill("b1", [_person("a"), _person("b"), _person("c")]))
+    _ingest(db, _bill("b2", [_person("a"), _person("b")]))
+    assert _edges(db)[("a", "b")] == 2
+    assert _edges(db)[("a", "c")] == 1
+
+    # c leaves b1 and d joins it
+    _ingest(db, _bill("b1", [_person("a"), _person("b"), _person("d")]))
+    edges = _edges(db)
+    assert edges[("a", "b")] == 2 and ("b", "a") not in edges
+    assert edges[("b", "d")] == 1
+    assert not any("c" in pair for pair in edges)
+
+
+def test_unlinked_sponsors_are_keyed_by_name(db):
+    # The sponsorship IDs differ per bill; only the name identifies an unlinked sponsor
+    _ingest(db, _bill("b1", [_person("a"), {"id": "sponsorship-1", "name": "Jane Roe"}]))
+    _ingest(db, _bill("b2", [_person("a"), {"id": "sponsorship-2", "name": "Jane Roe"}]))
+    assert _edges(db) == {("a", "name:Jane Roe"): 2}
+
+
+def test_collaborators_are_read_from_both_ends_of_a_pair(db):
+    _ingest(db, _bill("b1", [_person("a"), _person("b"), _person("c")]))
+    _ingest(db, _bill("b2", [_person("b"), _person("c")]))
+    assert [(c["id"], c["shared_bills"]) for c in top_collaborators(db, "b")] == [("c", 2), ("a", 1)]
+    assert [(c["id"], c["shared_bills"]) for c in top_collaborators(db, "c", limit=1)] == [("b", 2)]
+
+
+def test_bills_with_too_many_sponsors_add_no_edges(db, monkeypatch):
+    monkeypatch.setattr(sponsors, "COSPONSOR_MAX_SPONSORS", 3)
+    _ingest(db, _bill("b1", [_person("a"), _person("b"), _person("c")]))
+    assert len(_edges(db)) == 3
+
+    # Growing past the cap removes the bill's edges; its sponsorships are still stored
+    _ingest(db, _bill("b1", [_person(key) for key in "abcd"]))
+    assert _edges(db) == {}
+    assert db.query(Sponsorship).filter(Sponsorship.bill_id == "b1").count() == 4
@@ -0,0 +1,92 @@
+from datetime import datetime
+from app.database.models import Bill
+from app.services.suggest import SuggestIndex
+
+
+def _row(number, title, sponsor=None, day=1):
+    return (f"bill-{number}", f"HB {number}", title, sponsor, datetime(2025, 1, day))
+
+
+def _apply(index, rows):
+    with index._lock:
+        index._apply(rows)
+
+
+def _ids(index, prefix):
+    return [suggestion["id"] for suggestion in index.suggest(prefix)]
+
+
+def test_refresh_replaces_old_keys():
+    index = SuggestIndex()
+    _apply(index, [_row(1, "Water quality standards", "Ann Lee"), _row(2, "School water fountains")])
+    assert _ids(index, "water") == ["bill-1", "bill-2"]
+
+    # Bill 1 is retitled and bill 3 is new; bill 2 is listed twice and only its last version counts
+    _apply(index, [
+        _row(1, "Energy efficiency standards", "Ann Lee", day=2),
+        _row(2, "School lunches", day=2),
+        _row(3, "Water rights", day=3),
+        _row(2, "School buses", day=4),
+    ])
+    assert _ids(index, "water") == ["bill-3"]
+    assert _ids(index, "lunch") == []
+    assert _ids(index, "bus") == ["bill-2"]
+    assert _ids(index, "energy") == ["bill-1"]
+    assert _ids(index, "hb 1") == ["bill-1"]
+    assert len(index) == 3
+    assert index._watermark == datetime(2025, 1, 4)
+
+
+def test_keys_stay_sorted_by_key_and_ref():
+    index = SuggestIndex()
+    for day in range(1, 6):
+        _apply(index, [_row(n, f"Tax relief part {n * day}", "Bo Diaz", day) for n in range(day, 20, 2)])
+    snapshot = index._snapshot
+
+    # The same keys as indexing every bill's current version from scratch
+    expected = [[] for _ in snapshot.keys]
+    for slot, (_, identifier, title, sponsor) in enumerate(snapshot.bills):
+        for key, kind in index._bill_keys(identifier, title, sponsor):
+            expected[kind].append((key, slot))
+    for kind, kind_keys in enumerate(snapshot.keys):
+        assert list(zip(kind_keys, snapshot.refs[kind])) == sorted(expected[kind])
+
+
+def test_identifier_matches_rank_ahead_of_many_title_words():
+    index = SuggestIndex()
+    # 200 bills with title words starting "h", sorting before the identifier "hz..."
+    rows = [(f"word-{n}", f"SB {n}", f"Habitat{n:03d} protection", None, datetime(2025, 1, 1)) for n in range(200)]
+    rows.append(("bill-hz", "HZ 9", "Unrelated", None, datetime(2025, 1, 1)))
+    rows.append(("bill-sponsor", "SB 900", "Unrelated", "Hal Zorn", datetime(2025, 1, 1)))
+    _apply(index, rows)
+    suggestions = index.suggest("h", 3)
+    assert [s["id"] for s in suggestions[:2]] == ["bill-hz", "bill-sponsor"]
+    assert [s["match"] for s in suggestions] == ["identifier", "sponsor", "title"]
+
+
+def test_refresh_drops_deleted_bills(db):
+    for number in (1, 2, 3):
+        db.add(Bill(id=f"bill-{number}", identifier=f"HB {number}", title=f"Water bill {number}",
+                    updated_at=datetime(2025, 1, number)))
+    db.commit()
+    index = SuggestIndex()
+    index.build(db)
+    assert len(_ids(index, "water")) == 3
+
+    db.delete(db.get(Bill, "bill-2"))
+    db.commit()
+    index.refresh(db, force=True)
+    assert _ids(index, "water") == ["bill-1", "bill-3"]
+    assert _ids(index, "hb 2") == []
+    assert len(index) == 2
+
+    # A deletion and a bill stored with an older timestamp than the watermark leave the
+    # count unchanged, so they are found by the periodic ID comparison
+    db.delete(db.get(Bill, "bill-3"))
+    db.add(Bill(id="bill-4", identifier="HB 4", title="Water bill 4", updated_at=datetime(2024, 1, 1)))
+    db.commit()
+    index.refresh(db, force=True)
+    assert _ids(index, "water") == ["bill-1", "bill-3"]
+    index.reconcile_interval = 0
+    index.refresh(db, force=True)
+    assert _ids(index, "water") == ["bill-1", "bill-4"]
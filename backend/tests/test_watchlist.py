@@ -0,0 +1,88 @@
+import pytest
+from app.database.models import Bill, BillChange, ChangeWatermark, WatchMatch
+from app.services import watchlist
+from app.services.watchlist import SavedSearchIndex, add_watch, change_feed, match_pending, record_changes
+
+
+def _bill(db, bill_id, title, jurisdiction_id="ca", session="2025"):
+    bill = Bill(id=bill_id, title=title, identifier=bill_id.upper(), jurisdiction_id=jurisdiction_id, session=session,
+                actions=[], votes=[], versions=[])
+    db.add(bill)
+    return bill
+
+
+def test_record_changes_logs_only_new_entries(db):
+    bill = _bill(db, "b1", "Water rights")
+    assert record_changes(db, "b1", None, {"actions": [{"date": "2025-01-01", "description": "Introduced"}]}) == 1
+    bill.actions = [{"date": "2025-01-01", "description": "Introduced"}]
+    db.commit()
+
+    current = {
+        "actions": [{"date": "2025-01-01", "description": "Introduced"}, {"date": "2025-02-01", "description": "Passed"}],
+        "votes": [{"date": "2025-02-01", "result": "pass"}],
+    }
+    assert record_changes(db, "b1", bill, current) == 2
+    db.commit()
+    kinds = [change.kind for change in db.query(BillChange).order_by(BillChange.id)]
+    assert kinds == ["new_bill", "action", "vote"]
+
+
+def test_saved_searches_need_every_word_and_matching_filters():
+    index = SavedSearchIndex([
+        (1, "ann", "water rights", None, None),
+        (2, "bo", "water", "tx", None),
+        (3, "cy", "rights", None, "2023"),
+    ])
+    # Each search is filed once, under its longest word
+    assert len(index) == 3 and set(index.by_word) == {"rights", "water"}
+    words = {"water", "rights", "act"}
+    assert sorted(index.matches(words, "ca", "2025")) == [(1, "ann")]
+    assert sorted(index.matches(words, "tx", "2023")) == [(1, "ann"), (2, "bo"), (3, "cy")]
+    assert index.matches({"water"}, "ca", "2025") == []
+
+
+def test_match_pending_dedupes_owners_and_resumes_after_an_interrupt(db, monkeypatch):
+    for n in range(5):
+        _bill(db, f"b{n}", "Water rights" if n % 2 else "School buses")
+        db.add(BillChange(bill_id=f"b{n}", kind="new_bill", detail={}))
+    db.commit()
+    # ann watches bill b1 and also searches for it; bo searches for water bills
+    add_watch(db, watchlist.owner_key("ann"), bill_id="b1")
+    add_watch(db, watchlist.owner_key("ann"), query="water rights")
+    add_watch(db, watchlist.owner_key("bo"), query="water", jurisdiction_id="ca")
+
+    # The process dies while matching the second batch
+    bill_words = watchlist._bill_words
+    calls = []
+
+    def failing(db, bill_ids):
+        calls.append(bill_ids)
+        if len(calls) == 2:
+            raise RuntimeError("interrupted")
+        return bill_words(db, bill_ids)
+
+    monkeypatch.setattr(watchlist, "_bill_words", failing)
+    with pytest.raises(RuntimeError):
+        match_pending(db, batch_size=2)
+    db.rollback()
+    assert db.get(ChangeWatermark, watchlist.MATCHER).change_id == 2
+
+    # The rerun continues after the watermark, so nothing is matched twice
+    monkeypatch.setattr(watchlist, "_bill_words", bill_words)
+    assert match_pending(db, batch_size=2) == 2
+    assert match_pending(db, batch_size=2) == 0
+    matches = sorted((match.owner, match.change_id) for match in db.query(WatchMatch))
+    ann, bo = watchlist.owner_key("ann"), watchlist.owner_key("bo")
+    assert matches == sorted([(ann, 2), (bo, 2), (ann, 4), (bo, 4)])
+
+    feed = change_feed(db, since=0, limit=1, owner=ann)
+    assert [change["bill_id"] for change in feed["changes"]] == ["b1"] and feed["more"]
+    feed = change_feed(db, since=feed["cursor"], limit=10, owner=ann)
+    assert [change["bill_id"] for change in feed["changes"]] == ["b3"] and not feed["more"]
+
+
+def test_add_watch_validates_its_arguments(db):
+    owner = watchlist.owner_key("ann")
+    for kwargs in ({}, {"bill_id": "b1", "query": "water"}, {"query": "!!"}):
+        with pytest.raises(ValueError):
+            add_watch(db, owner, **kwargs)